@@ -26,24 +26,81 @@ TECHNICAL FEATURES:
 import os                    # File system operations
 import re                   # Regular expressions for validation
 import datetime             # Date and time handling
+import difflib              # Incremental listbox updates
+import json                 # Research query parameters
+import threading            # Per-thread Neo4j session reuse
+import time                 # Monotonic clock for short-lived result caches
+from contextlib import contextmanager  # Batched widget construction
+from functools import lru_cache  # One-time lazy imports
+from concurrent.futures import ThreadPoolExecutor  # Background database I/O
+from types import SimpleNamespace  # Attribute-style config constants
+from typing import Optional       # Annotations for lookups that may find nothing
 import tkinter as tk        # Main GUI framework
-from tkinter import ttk, filedialog, messagebox, Text  # GUI components
+from tkinter import ttk, messagebox  # GUI components (filedialog is loaded on use)
+from tkinter import font as tkfont  # Shared named fonts
 from clinic_v2_withoutgui import ClinicDatabaseNotebook  # Database operations
-from mongodb_messaging import MongoMessagingSystem
-messaging = MongoMessagingSystem()
-messaging.connect()
+from file_metadata_cache import MetadataCache  # Local copy of the file listing
+from neo4j import READ_ACCESS
+from neo4j.exceptions import ClientError, ServiceUnavailable, SessionExpired
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 # =============================================================================
 # CONFIGURATION SETTINGS
 # =============================================================================
 # Database connection parameters for Neo4j
-DB_CONFIG = {
-    "host": "bolt://localhost:7687",   # Neo4j Bolt URI
-    "user": "neo4j",                   # Neo4j username
-    "password": "clinicdatabase",            # Neo4j password
-    "database": "neo4j"                # Neo4j database name
+DB_CONFIG = SimpleNamespace(
+    host="bolt://localhost:7687",   # Neo4j Bolt URI
+    user="neo4j",                   # Neo4j username
+    password="clinicdatabase",            # Neo4j password
+    database="neo4j"                # Neo4j database name
+)
+
+# Number of chat messages fetched per page (initial view and each scroll-back)
+CHAT_PAGE_SIZE = 50
+
+# Number of uploaded files fetched per page in the file management tab
+FILE_PAGE_SIZE = 100
+
+# Page size for research queries that have no explicit LIMIT
+MAX_ROWS = 1_000
+
+# Re-running an unchanged research query within this many seconds reuses its rows
+QUERY_CACHE_SECONDS = 30
+
+# Human-readable file type per extension, used when listing uploaded files
+_FILE_TYPE_MAP = {
+    # Image file types
+    '.png': 'Image (PNG)',
+    '.jpg': 'Image (JPEG)',
+    '.jpeg': 'Image (JPEG)',
+    '.bmp': 'Image (BMP)',
+    '.gif': 'Image (GIF)',
+    '.tiff': 'Image (TIFF)',
+    '.webp': 'Image (WebP)',
+
+    # Document file types
+    '.pdf': 'Document (PDF)',
+    '.doc': 'Document (Word)',
+    '.docx': 'Document (Word)',
+    '.txt': 'Text File',
+    '.rtf': 'Rich Text',
+    '.odt': 'OpenDocument Text',
 }
 
+# File dialog filters for chat images and medical file uploads
+IMAGE_FILETYPES = [("Images", "*.png *.jpg *.jpeg *.bmp *.gif *.tiff *.webp")]
+UPLOAD_FILETYPES = [
+    ("All Files", "*.*"),                                    # Allow any file type
+    ("Images", "*.png *.jpg *.jpeg *.bmp *.gif *.tiff *.webp"),  # Common image formats
+    ("Documents", "*.pdf *.doc *.docx *.txt *.rtf *.odt"),  # Document formats
+    ("Medical Files", "*.dcm *.dicom *.nii *.nii.gz"),      # Medical imaging formats
+    ("Data Files", "*.csv *.xlsx *.xls *.json *.xml"),      # Data and spreadsheet formats
+    ("Archives", "*.zip *.rar *.7z *.tar *.gz"),            # Compressed files
+    ("Videos", "*.mp4 *.avi *.mov *.mkv *.wmv"),            # Video formats
+    ("Audio", "*.mp3 *.wav *.flac *.aac *.ogg")             # Audio formats
+]
+
 # File upload configuration - files will be stored directly in database
 # No need for local file system storage
 
@@ -51,32 +108,99 @@ DB_CONFIG = {
 # UI COLOR SCHEME
 # =============================================================================
 # Modern color palette for consistent theming throughout the application
-COLORS = {
-    'primary': '#2E86AB',        # Medical blue - main brand color
-    'secondary': '#A23B72',      # Accent pink - highlights and accents
-    'success': '#06A77D',        # Success green - positive actions
-    'warning': '#F18F01',        # Warning orange - caution messages
-    'danger': '#C73E1D',         # Error red - error states
-    'light': '#F5F5F5',          # Light gray - subtle backgrounds
-    'dark': '#2C3E50',           # Dark blue-gray - text and headers
-    'white': '#FFFFFF',          # Pure white
-    'text': '#2C3E50',           # Primary text color
-    'bg_main': '#F8F9FA',        # Main background color
-    'bg_card': '#FFFFFF',        # Card/panel background
-    'border': '#DEE2E6'          # Border color for separation
-}
+COLORS = SimpleNamespace(
+    primary='#2E86AB',        # Medical blue - main brand color
+    secondary='#A23B72',      # Accent pink - highlights and accents
+    success='#06A77D',        # Success green - positive actions
+    warning='#F18F01',        # Warning orange - caution messages
+    danger='#C73E1D',         # Error red - error states
+    light='#F5F5F5',          # Light gray - subtle backgrounds
+    dark='#2C3E50',           # Dark blue-gray - text and headers
+    white='#FFFFFF',          # Pure white
+    text='#2C3E50',           # Primary text color
+    bg_main='#F8F9FA',        # Main background color
+    bg_card='#FFFFFF',        # Card/panel background
+    border='#DEE2E6'          # Border color for separation
+)
 
 # =============================================================================
 # DATABASE INITIALIZATION
 # =============================================================================
 # Create database connection object with configuration parameters
 db = ClinicDatabaseNotebook(
-    host=DB_CONFIG["host"],
-    user=DB_CONFIG["user"],
-    password=DB_CONFIG["password"],
-    database=DB_CONFIG["database"]
+    host=DB_CONFIG.host,
+    user=DB_CONFIG.user,
+    password=DB_CONFIG.password,
+    database=DB_CONFIG.database
 )
 
+# =============================================================================
+# MONGODB MESSAGING (LAZY INITIALIZATION)
+# =============================================================================
+# Messaging connects on first use instead of at import, so GUI startup is not
+# blocked on MongoDB and the app still opens when MongoDB is down.
+_messaging = None
+_messaging_lock = threading.Lock()
+
+def get_messaging():
+    """
+    Return the connected MongoMessagingSystem, connecting on first use.
+    
+    Returns:
+        MongoMessagingSystem: Connected messaging system, or None if MongoDB is
+        unreachable (the next call retries the connection)
+    """
+    global _messaging
+    if _messaging is not None:
+        return _messaging
+    with _messaging_lock:
+        if _messaging is None:
+            from mongodb_messaging import MongoMessagingSystem
+            candidate = MongoMessagingSystem()
+            if not candidate.connect():
+                candidate.disconnect()
+                return None
+            # Cached user ids may belong to a previous connection
+            clear_mongo_user_cache()
+            _messaging = candidate
+    return _messaging
+
+def require_messaging():
+    """
+    Return the connected messaging system or raise if MongoDB is unreachable.
+    
+    Raises:
+        RuntimeError: If MongoDB messaging could not be initialized
+    """
+    msg = get_messaging()
+    if msg is None:
+        raise RuntimeError("MongoDB messaging is unavailable. Please check that MongoDB is running.")
+    return msg
+
+# =============================================================================
+# LOCAL FILE LISTING CACHE
+# =============================================================================
+# SQLite copy of the uploaded-file listing, painted before Neo4j answers.
+# Only used from the Tk thread.
+_file_cache = None
+
+def get_file_cache():
+    """
+    Return the local file metadata cache, opening it on first use.
+    
+    Returns:
+        MetadataCache: The cache, or None if it could not be opened (the file
+        tab then simply waits for Neo4j)
+    """
+    global _file_cache
+    if _file_cache is None:
+        try:
+            _file_cache = MetadataCache()
+        except Exception as e:
+            print(f"Warning: file metadata cache unavailable: {e}")
+            return None
+    return _file_cache
+
 # =============================================================================
 # DATABASE SETUP FUNCTIONS
 # =============================================================================
@@ -109,7 +233,8 @@ def setup_database_if_needed():
             db.create_all_tables()
             db.insert_all_sample_data()
         else:
-            print(f"Found departments: {[name for (_id, name) in departments]}")
+            names = ", ".join(name for _id, name in departments)
+            print(f"Found departments: {names}")
 
     except Exception as e:
         # Re-raise any exceptions for proper error handling
@@ -128,27 +253,261 @@ def validate_date_yyyy_mm_dd(date_str: str) -> bool:
     Returns:
         bool: True if valid date format, False otherwise
     """
-    # Check if string matches YYYY-MM-DD pattern using regex
-    if not re.match(r"^\d{4}-\d{2}-\d{2}$", date_str):
+    # Cheap shape check: exactly YYYY-MM-DD with dashes in place
+    if len(date_str) != 10 or date_str[4] != '-' or date_str[7] != '-':
         return False
     try:
-        # Try to parse the date to ensure it's a valid date
-        datetime.datetime.strptime(date_str, "%Y-%m-%d")
+        # Single C-level parse that also rejects invalid dates (e.g., 2024-02-30)
+        datetime.date.fromisoformat(date_str)
         return True
     except ValueError:
-        # Invalid date (e.g., 2024-02-30)
         return False
 
-def safe_select(query, params=()):
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+_SIZE_DIVISORS = tuple(1 << (10 * i) for i in range(len(_SIZE_UNITS)))
+
+def format_size(size_bytes) -> str:
+    """Format a byte count as a human-readable size (e.g., "1.5 MB")."""
+    # Each unit is 2**10 larger, so the unit index falls out of the bit length
+    # directly instead of dividing in a loop
+    i = min((max(int(size_bytes), 1).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / _SIZE_DIVISORS[i]:.1f} {_SIZE_UNITS[i]}"
+
+def format_sizes(sizes) -> list:
+    """Format many byte counts at once (see format_size)."""
+    units, divisors, last = _SIZE_UNITS, _SIZE_DIVISORS, len(_SIZE_UNITS) - 1
+    out = []
+    for n in sizes:
+        i = min((max(n, 1).bit_length() - 1) // 10, last)
+        out.append(f"{n / divisors[i]:.1f} {units[i]}")
+    return out
+
+# Long-lived Neo4j session per thread for safe_select (sessions are not thread-safe;
+# the driver's pool still owns the underlying connections)
+_select_local = threading.local()
+
+def _get_select_session():
+    """Return this thread's reusable read session, creating it on first use."""
+    session = getattr(_select_local, "session", None)
+    if session is None:
+        # Read access mode: routed to readers and rejected by the server if it writes
+        session = db.driver.session(database=db.database, default_access_mode=READ_ACCESS)
+        _select_local.session = session
+    return session
+
+def _reset_select_session():
+    """Close and forget this thread's reusable session (rebuilt lazily on next use)."""
+    session = getattr(_select_local, "session", None)
+    _select_local.session = None
+    if session is not None:
+        try:
+            session.close()
+        except Exception:
+            pass
+
+def _check_read_only(query):
+    """Return the stripped query, or raise ValueError if it is not MATCH/RETURN Cypher."""
+    q = query.strip()
+    if not q[:6].casefold().startswith(("match", "return")):
+        raise ValueError("Only read-only Cypher starting with MATCH/RETURN is allowed.")
+    return q
+
+# String literals and backquoted names are kept verbatim; any run of whitespace,
+# // comments and /* */ comments becomes one space (a block comment is its own
+# token, so a // inside it can't swallow the closing */)
+_CYPHER_TOKEN_RE = re.compile(
+    r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)|(?:/\*.*?\*/|//[^\n]*|\s)+""", re.DOTALL)
+
+def _normalize_cypher(q):
+    """Canonical spacing so equivalent query texts share one Neo4j plan cache entry."""
+    return _CYPHER_TOKEN_RE.sub(lambda m: m.group(1) or " ", q).strip()
+
+# String/backtick tokens (skipped over) or a standalone numeric literal; numbers
+# next to '*' or '..' are variable-length bounds, which cannot be parameters
+_CYPHER_LITERAL_RE = re.compile(
+    r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")|`[^`]*`|(?<![\w.$*])(\d+(?:\.\d+)?)(?![\w.])""")
+_CYPHER_ESCAPE_RE = re.compile(r"\\(u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|.)", re.DOTALL)
+# RETURN projections name the result columns, so their literals stay as written
+_RETURN_ITEMS_RE = re.compile(r"\bRETURN\b.*?(?=\b(?:ORDER\s+BY|SKIP|LIMIT|UNION)\b|$)",
+                              re.IGNORECASE | re.DOTALL)
+_CYPHER_ESCAPES = {"t": "\t", "b": "\b", "n": "\n", "r": "\r", "f": "\f"}
+
+def _unescape_cypher_string(token):
+    """Value of a quoted Cypher string literal token."""
+    def _char(m):
+        esc = m.group(1)
+        if len(esc) > 1:
+            return chr(int(esc[1:], 16))
+        return _CYPHER_ESCAPES.get(esc, esc)
+    return _CYPHER_ESCAPE_RE.sub(_char, token[1:-1])
+
+@lru_cache(maxsize=128)
+def _parameterize_cypher(q):
+    """
+    Replace string and number literals in q with $_litN parameters.
+    
+    Neo4j caches query plans by query text, so re-running a query with only a
+    value changed reuses the cached plan instead of being parsed and planned
+    again. Literals in RETURN items are left alone since they name the result
+    columns. Results are memoized per query text.
+    
+    Returns:
+        tuple: (template, ((name, value), ...))
+    """
+    literals = []
+    projections = [m.span() for m in _RETURN_ITEMS_RE.finditer(q)]
+    def _replace(m):
+        if any(start <= m.start() < end for start, end in projections):
+            return m.group(0)
+        if m.group(1):
+            value = _unescape_cypher_string(m.group(1))
+        elif m.group(2):
+            value = float(m.group(2)) if "." in m.group(2) else int(m.group(2))
+        else:
+            return m.group(0)
+        name = f"_lit{len(literals)}"
+        literals.append((name, value))
+        return "$" + name
+    return _CYPHER_LITERAL_RE.sub(_replace, q), tuple(literals)
+
+# Trailing LIMIT clause (literal or $parameter), optionally followed by a semicolon
+_LIMIT_RE = re.compile(r"\blimit\s+(\d+|\$\w+)\s*;?\s*$", re.IGNORECASE)
+# Trailing SKIP clause: appending another SKIP/LIMIT after it is a syntax error
+_SKIP_RE = re.compile(r"\bskip\s+(\d+|\$\w+)\s*;?\s*$", re.IGNORECASE)
+# A trailing SKIP/LIMIT after UNION would only page the last branch
+_UNION_RE = re.compile(r"\bunion\b", re.IGNORECASE)
+
+# (label, property) pairs backed by a single-property index or uniqueness
+# constraint (see ClinicDatabaseNotebook._ensure_constraints_and_counters and
+# ensure_indexes)
+INDEXED_PROPERTIES = frozenset(
+    [(label, "id") for label in ("Clinic", "Department", "Doctor", "Patient", "Appointment",
+                                 "Observation", "Diagnosis", "MedicalFile")]
+    + [("Appointment", "date"), ("MedicalFile", "upload_date")]
+)
+
+_NODE_PATTERN_RE = re.compile(r"\(\s*(\w+)\s*:\s*(\w+)")
+_WHERE_RE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+_WHERE_END_RE = re.compile(r"\b(?:RETURN|WITH|ORDER)\b", re.IGNORECASE)
+_NON_CONJUNCTIVE_RE = re.compile(r"\b(?:OR|XOR|NOT)\b", re.IGNORECASE)
+_IS_NOT_NULL_RE = re.compile(r"\bIS\s+NOT\s+NULL\b", re.IGNORECASE)
+
+def _add_index_hint(q):
+    """
+    Add USING INDEX to a single-MATCH query that filters a node on an indexed property.
+    
+    Only equality, range, IN and STARTS WITH predicates are considered, since
+    those are the ones an index seek can serve. Queries that already carry a
+    hint, have several MATCH clauses, or combine predicates with OR, XOR or
+    NOT (where a forced index may not apply) are returned unchanged.
+    """
+    if re.search(r"\bUSING\b", q, re.IGNORECASE) or len(re.findall(r"\bMATCH\b", q, re.IGNORECASE)) != 1:
+        return q
+    where = _WHERE_RE.search(q)
+    if not where:
+        return q
+    predicates = _WHERE_END_RE.split(q[where.end():], 1)[0]
+    # Only plain AND-ed predicates; IS NOT NULL is a harmless use of NOT
+    if _NON_CONJUNCTIVE_RE.search(_IS_NOT_NULL_RE.sub(" ", predicates)):
+        return q
+    for var, label in _NODE_PATTERN_RE.findall(q[:where.start()]):
+        for prop in re.findall(rf"\b{var}\.(\w+)\s*(?:=(?!~)|<(?!>)|>|\bIN\b|\bSTARTS\s+WITH\b)",
+                               predicates, re.IGNORECASE):
+            if (label, prop) in INDEXED_PROPERTIES:
+                return f"{q[:where.start()]}USING INDEX {var}:{label}({prop}) {q[where.start():]}"
+    return q
+
+def _is_paged(q):
+    """
+    True if research query q is fetched page by page.
+    
+    Queries that end in their own LIMIT or SKIP, and UNION queries, run as-is.
+    q is the parameterized template, so words inside string literals don't count.
+    """
+    return not (_LIMIT_RE.search(q) or _SKIP_RE.search(q) or _UNION_RE.search(q))
+
+def _apply_page(q, page):
+    """
+    Return (query, params) fetching page `page` (MAX_ROWS rows) of q.
+    
+    Queries that aren't paged (see _is_paged) run unchanged as a single page. Skip and
+    limit are bound parameters so every page shares one cached query plan.
+    """
+    if not _is_paged(q):
+        return q, {}
+    return (q.rstrip("; \n\t") + "\nSKIP $_page_skip LIMIT $_page_limit",
+            {"_page_skip": page * MAX_ROWS, "_page_limit": MAX_ROWS})
+
+def safe_select_iter(query, params=None, page=0):
+    """
+    Stream a read-only Cypher query as (column_names, row) pairs.
+    
+    Records are yielded as the driver receives them instead of being buffered,
+    so callers can start rendering before the query has finished.
+    
+    Args:
+        query (str): Cypher query string (read-only)
+        params (dict, optional): Values for $placeholders in the query
+        page (int): Page of MAX_ROWS rows to fetch when the query has no LIMIT
+        
+    Yields:
+        tuple: (column_names, row) for each result record
+        
+    Raises:
+        ValueError: If query is not a read-only Cypher (MATCH/RETURN)
+    """
+    q, literals = _parameterize_cypher(_normalize_cypher(_check_read_only(query)))
+    q, page_params = _apply_page(q, page)
+    params = {**(params or {}), **dict(literals), **page_params}
+    hinted = _add_index_hint(q)
+    if hinted != q:
+        started = False
+        try:
+            for item in _stream_select(hinted, params):
+                started = True
+                yield item
+            return
+        except ClientError as e:
+            # Hints are checked while planning, before any row; a rejected
+            # hint just means the planner gets to choose on its own
+            if started:
+                raise
+            print(f"Warning: index hint not usable ({e.message}); running query without it.")
+    yield from _stream_select(q, params)
+
+def _stream_select(q, params):
+    """Run q on this thread's read session, retrying once on a stale connection."""
+    for attempt in (1, 2):
+        session = _get_select_session()
+        started = False
+        try:
+            colnames = None
+            for rec in session.run(q, params):
+                if colnames is None:
+                    colnames = list(rec.keys())
+                started = True
+                yield colnames, tuple(rec.values())
+            return
+        except (SessionExpired, ServiceUnavailable):
+            # Stale session/connection: rebuild the session and retry once,
+            # unless rows were already handed to the caller
+            _reset_select_session()
+            if attempt == 2 or started:
+                raise
+
+def safe_select(query, params=None, page=0):
     """
     Execute a SELECT query safely and return results.
     
     This function executes read-only Cypher queries for Neo4j. For safety, only
-    queries starting with MATCH or RETURN (case-insensitive) are allowed.
+    queries starting with MATCH or RETURN (case-insensitive) are allowed, and
+    queries without a trailing LIMIT are fetched one MAX_ROWS page at a time.
     
     Args:
         query (str): Cypher query string (read-only)
-        params (tuple): Not used (kept for signature compatibility)
+        params (dict, optional): Values for $placeholders in the query; passing
+            values as parameters lets Neo4j reuse its cached query plan
+        page (int): Page of MAX_ROWS rows to fetch when the query has no LIMIT
         
     Returns:
         tuple: (column_names, rows) - Query results
@@ -156,98 +515,174 @@ def safe_select(query, params=()):
     Raises:
         ValueError: If query is not a read-only Cypher (MATCH/RETURN)
     """
-    q = query.strip()
-    if not (q.lower().startswith("match") or q.lower().startswith("return")):
-        raise ValueError("Only read-only Cypher starting with MATCH/RETURN is allowed.")
-    
-    # Run Cypher and format results
-    records = []
-    with db.driver.session(database=db.database) as session:
-        for rec in session.run(q):
-            records.append(rec)
-    colnames = list(records[0].keys()) if records else []
-    rows = [tuple(rec.get(k) for k in colnames) for rec in records]
+    colnames = []
+    rows = []
+    for colnames, row in safe_select_iter(query, params, page):
+        rows.append(row)
     return colnames, rows
 
 # =============================================================================
 # MONGODB USER SYNC HELPERS
 # =============================================================================
-def ensure_mongo_user_for_doctor(doctor_id: int, first_name: str, last_name: str) -> str:
+# Process-local cache of resolved Mongo user ids, keyed by (kind, sql_id)
+_MONGO_USER_CACHE = {}
+
+# Pre-bound timestamp helpers for the user upsert path
+_UTC = datetime.timezone.utc
+_utcnow = datetime.datetime.now
+
+# Constant part of the $setOnInsert document per user kind (auth is not used here)
+_USER_TEMPLATES = {
+    kind: {"password_hash": b"", "user_type": kind, "is_active": True, "profile_image": None}
+    for kind in ("doctor", "patient")
+}
+
+def _user_insert_fields(kind: str, uid: int, first_name: str, last_name: str) -> dict:
+    """Fields written only when a Mongo user is first created."""
+    return {
+        **_USER_TEMPLATES[kind],
+        "first_name": first_name,
+        "last_name": last_name,
+        "user_id": uid,
+        "created_at": _utcnow(_UTC)
+    }
+
+def _resolve_mongo_user(kind: str, uid: int, first_name: str, last_name: str) -> Optional[str]:
     """
-    Ensure a MongoDB user exists for a given MySQL doctor and return the user ObjectId (string).
+    Ensure a MongoDB user of the given kind ('doctor' or 'patient') exists and return
+    the user ObjectId (string), or None when messaging is unavailable. Resolved ids
+    are cached per (kind, uid) so repeated calls for the same doctor/patient skip
+    the MongoDB round-trips. Other MongoDB errors propagate to the caller.
     """
+    key = (kind, uid)
+    cached = _MONGO_USER_CACHE.get(key)
+    if cached is not None:
+        return cached
+    msg = get_messaging()
+    if msg is None:
+        return None
+    query = {"username": f"{kind}.{uid}"}
     try:
-        username = f"doctor.{doctor_id}"
-        # Prefer lookup by username to avoid mismatched user_id cases
-        existing_by_username = messaging.users.find_one({"username": username})
-        if existing_by_username:
-            return str(existing_by_username["_id"])
-        existing = messaging.users.find_one({"user_id": doctor_id, "user_type": "doctor"})
-        if existing:
-            return str(existing["_id"])
-        # Direct upsert without relying on password hashing (auth not used here)
-        result = messaging.users.update_one(
-            {"username": username},
-            {
-                "$setOnInsert": {
-                    "password_hash": b"",
-                    "user_type": "doctor",
-                    "first_name": first_name,
-                    "last_name": last_name,
-                    "user_id": doctor_id,
-                    "created_at": datetime.datetime.now(datetime.timezone.utc),
-                    "is_active": True,
-                    "profile_image": None
-                }
-            },
-            upsert=True
+        # One round-trip: upsert by username and return only the _id
+        # (relies on the unique index on users.username)
+        doc = msg.users.find_one_and_update(
+            query,
+            {"$setOnInsert": _user_insert_fields(kind, uid, first_name, last_name)},
+            upsert=True,
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER
         )
-        if result.upserted_id:
-            return str(result.upserted_id)
-        # Fallback fetch
-        fallback = messaging.users.find_one({"username": username})
-        return str(fallback["_id"]) if fallback else None
-    except Exception:
-        return None
+    except DuplicateKeyError:
+        # A concurrent upsert of the same username won the race: the user exists
+        doc = msg.users.find_one(query, {"_id": 1})
+    user_oid = str(doc["_id"]) if doc else None
+    if user_oid:
+        _MONGO_USER_CACHE[key] = user_oid
+    return user_oid
+
+def ensure_mongo_users_bulk(kind: str, records) -> dict:
+    """
+    Ensure MongoDB users exist for many doctors/patients in one batch.
+    
+    Uncached users are upserted with a single unordered bulk_write and their ids
+    fetched with a single find, instead of one round-trip per user.
+    
+    Args:
+        kind (str): 'doctor' or 'patient'
+        records (iterable): (sql_id, first_name, last_name) tuples
+        
+    Returns:
+        dict: sql_id -> user ObjectId (string); unresolved ids are omitted
+
+    MongoDB errors other than duplicate-key races propagate to the caller.
+    """
+    resolved = {}
+    pending = {}
+    for uid, first_name, last_name in records:
+        cached = _MONGO_USER_CACHE.get((kind, uid))
+        if cached is not None:
+            resolved[uid] = cached
+        else:
+            pending[f"{kind}.{uid}"] = (uid, first_name, last_name)
+    if not pending:
+        return resolved
+    msg = get_messaging()
+    if msg is None:
+        return resolved
+    ops = [
+        UpdateOne({"username": username},
+                  {"$setOnInsert": _user_insert_fields(kind, uid, first_name, last_name)},
+                  upsert=True)
+        for username, (uid, first_name, last_name) in pending.items()
+    ]
+    try:
+        msg.users.bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        # Duplicate-key races on username: those users exist, fetch them below.
+        # Any other write error is real
+        details = e.details or {}
+        if details.get("writeConcernErrors") or any(
+                err.get("code") != 11000 for err in details.get("writeErrors", ())):
+            raise
+    for doc in msg.users.find({"username": {"$in": list(pending)}}, {"_id": 1, "username": 1}):
+        uid = pending[doc["username"]][0]
+        user_oid = str(doc["_id"])
+        _MONGO_USER_CACHE[(kind, uid)] = user_oid
+        resolved[uid] = user_oid
+    return resolved
+
+def clear_mongo_user_cache():
+    """Forget all cached Mongo user ids (call after reconnecting to MongoDB)."""
+    _MONGO_USER_CACHE.clear()
+
+def ensure_mongo_user_for_doctor(doctor_id: int, first_name: str, last_name: str) -> Optional[str]:
+    """
+    Ensure a MongoDB user exists for a given MySQL doctor and return the user ObjectId (string).
+    """
+    return _resolve_mongo_user("doctor", doctor_id, first_name, last_name)
 
-def ensure_mongo_user_for_patient(patient_id: int, first_name: str, last_name: str) -> str:
+def ensure_mongo_user_for_patient(patient_id: int, first_name: str, last_name: str) -> Optional[str]:
     """
     Ensure a MongoDB user exists for a given MySQL patient and return the user ObjectId (string).
     """
-    try:
-        username = f"patient.{patient_id}"
-        existing_by_username = messaging.users.find_one({"username": username})
-        if existing_by_username:
-            return str(existing_by_username["_id"])
-        existing = messaging.users.find_one({"user_id": patient_id, "user_type": "patient"})
-        if existing:
-            return str(existing["_id"])
-        result = messaging.users.update_one(
-            {"username": username},
-            {
-                "$setOnInsert": {
-                    "password_hash": b"",
-                    "user_type": "patient",
-                    "first_name": first_name,
-                    "last_name": last_name,
-                    "user_id": patient_id,
-                    "created_at": datetime.datetime.now(datetime.timezone.utc),
-                    "is_active": True,
-                    "profile_image": None
-                }
-            },
-            upsert=True
-        )
-        if result.upserted_id:
-            return str(result.upserted_id)
-        fallback = messaging.users.find_one({"username": username})
-        return str(fallback["_id"]) if fallback else None
-    except Exception:
-        return None
+    return _resolve_mongo_user("patient", patient_id, first_name, last_name)
 
 # =============================================================================
 # UI STYLING FUNCTIONS
 # =============================================================================
+# Style table applied by configure_modern_style: (style name, configure options)
+_STYLE_SPECS = [
+    # ===== BUTTON STYLES =====
+    # Primary button style - main action buttons
+    ('Modern.TButton', dict(background=COLORS.primary, foreground='white', borderwidth=0,
+                            focuscolor='none', relief='flat', padding=(20, 10))),
+    # Success button style - for positive actions (save, confirm)
+    ('Success.TButton', dict(background=COLORS.success, foreground='white', borderwidth=0,
+                             focuscolor='none', relief='flat', padding=(15, 8))),
+    # Warning button style - for caution actions (upload, delete)
+    ('Warning.TButton', dict(background=COLORS.warning, foreground='white', borderwidth=0,
+                             focuscolor='none', relief='flat', padding=(15, 8))),
+    # ===== FRAME STYLES =====
+    # Card frame style - for content panels
+    ('Card.TFrame', dict(background=COLORS.bg_card, relief='flat', borderwidth=1)),
+    # ===== LABEL STYLES =====
+    # Heading label style - for section titles
+    ('Heading.TLabel', dict(background=COLORS.bg_card, foreground=COLORS.text,
+                            font=('Segoe UI', 12, 'bold'))),
+    # Modern label style - for regular text
+    ('Modern.TLabel', dict(background=COLORS.bg_card, foreground=COLORS.text,
+                           font=('Segoe UI', 10))),
+    # ===== INPUT STYLES =====
+    ('Modern.TEntry', dict(relief='flat', borderwidth=1, padding=8)),
+    ('Modern.TCombobox', dict(relief='flat', borderwidth=1, padding=8)),
+]
+
+# Shared named fonts for the most common widget text, created with the styles
+FONTS = SimpleNamespace()
+
+# Set once the styles have been applied; they persist for the Tk interpreter
+_styled = False
+
 def configure_modern_style():
     """
     Configure modern Tkinter TTK styles for a professional appearance.
@@ -258,75 +693,222 @@ def configure_modern_style():
     - Labels with consistent typography
     - Entry fields and comboboxes with modern styling
     
-    The styles use the predefined color scheme for consistency.
+    The styles use the predefined color scheme for consistency, and the shared
+    FONTS are created here, so it must run after the Tk root exists. Repeat
+    calls are no-ops.
     """
+    global _styled
+    if _styled:
+        return
     style = ttk.Style()
-    
-    # ===== BUTTON STYLES =====
-    # Primary button style - main action buttons
-    style.configure('Modern.TButton',
-                   background=COLORS['primary'],
-                   foreground='white',
-                   borderwidth=0,
-                   focuscolor='none',
-                   relief='flat',
-                   padding=(20, 10))
+    for name, options in _STYLE_SPECS:
+        style.configure(name, **options)
     
     # Button state mappings - different colors for hover/press states
     style.map('Modern.TButton',
-              background=[('active', COLORS['secondary']),
-                         ('pressed', COLORS['dark'])])
+              background=[('active', COLORS.secondary),
+                         ('pressed', COLORS.dark)])
     
-    # Success button style - for positive actions (save, confirm)
-    style.configure('Success.TButton',
-                   background=COLORS['success'],
-                   foreground='white',
-                   borderwidth=0,
-                   focuscolor='none',
-                   relief='flat',
-                   padding=(15, 8))
+    # Font objects are parsed by Tk once and shared by every widget using them
+    FONTS.body = tkfont.Font(family='Segoe UI', size=11)
+    FONTS.label = tkfont.Font(family='Segoe UI', size=11, weight='bold')
+    FONTS.heading = tkfont.Font(family='Segoe UI', size=14, weight='bold')
+    FONTS.text = tkfont.Font(family='Segoe UI', size=10)
+    _styled = True
+
+# =============================================================================
+# BACKGROUND I/O
+# =============================================================================
+# Shared worker pool for database/messaging calls made from the GUI; created on
+# first use and shut down when the application closes
+_io_pool = None
+_io_pool_lock = threading.Lock()
+
+def _get_io_pool() -> ThreadPoolExecutor:
+    global _io_pool
+    with _io_pool_lock:
+        if _io_pool is None:
+            _io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="clinic-io")
+        return _io_pool
+
+def shutdown_io_pool():
+    """Stop the background I/O pool without waiting for queued work."""
+    global _io_pool
+    with _io_pool_lock:
+        if _io_pool is not None:
+            _io_pool.shutdown(wait=False, cancel_futures=True)
+            _io_pool = None
+
+def run_async(widget, fn, on_done, *args, poll_ms: int = 20):
+    """
+    Run fn(*args) on the I/O pool and deliver the outcome on the Tk thread.
     
-    # Warning button style - for caution actions (upload, delete)
-    style.configure('Warning.TButton',
-                   background=COLORS['warning'],
-                   foreground='white',
-                   borderwidth=0,
-                   focuscolor='none',
-                   relief='flat',
-                   padding=(15, 8))
+    Tk is not thread-safe, so the worker never touches widgets: the Tk thread
+    polls the future with widget.after() and calls on_done(result, error) once
+    it completes (error is None on success, result is None on failure). The
+    callback is dropped if the widget has been destroyed in the meantime.
+    """
+    future = _get_io_pool().submit(fn, *args)
+
+    def poll():
+        if not widget.winfo_exists():
+            return
+        if not future.done():
+            widget.after(poll_ms, poll)
+            return
+        try:
+            result, error = future.result(), None
+        except Exception as e:
+            result, error = None, e
+        on_done(result, error)
+
+    widget.after(poll_ms, poll)
+    return future
+
+# =============================================================================
+# UI HELPERS
+# =============================================================================
+@contextmanager
+def batch_ui(window):
+    """
+    Build a window's widgets while it is hidden, then lay it out once.
     
-    # ===== FRAME STYLES =====
-    # Card frame style - for content panels
-    style.configure('Card.TFrame',
-                   background=COLORS['bg_card'],
-                   relief='flat',
-                   borderwidth=1)
+    The window is withdrawn on entry; on exit a single update_idletasks pass
+    computes geometry for all children before the window is shown again.
+    """
+    window.withdraw()
+    try:
+        yield window
+    finally:
+        window.update_idletasks()
+        window.deiconify()
+
+def _tree_append_rows(tree, rows, iids=None):
+    """Append value tuples (optionally with item ids) to a Treeview via direct Tcl calls."""
+    # Treeview.insert re-formats its options on every call; rows here are
+    # already tuples of strings, which Tcl takes as a list unchanged
+    call, path = tree.tk.call, tree._w
+    if iids is None:
+        for r in rows:
+            call(path, 'insert', '', 'end', '-values', r)
+    else:
+        for iid, r in zip(iids, rows):
+            call(path, 'insert', '', 'end', '-id', iid, '-values', r)
+
+class VirtualTreeRows:
+    """
+    Show a long list of row tuples in a Treeview by materialising only the rows
+    that fit in the viewport.
     
-    # ===== LABEL STYLES =====
-    # Heading label style - for section titles
-    style.configure('Heading.TLabel',
-                   background=COLORS['bg_card'],
-                   foreground=COLORS['text'],
-                   font=('Segoe UI', 12, 'bold'))
+    The scrollbar is driven from the full row count; scrolling swaps the window
+    of rows held by the tree, so its item count stays O(visible rows).
+    """
     
-    # Modern label style - for regular text
-    style.configure('Modern.TLabel',
-                   background=COLORS['bg_card'],
-                   foreground=COLORS['text'],
-                   font=('Segoe UI', 10))
+    def __init__(self, tree, scrollbar, rows):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.rows = rows
+        self.top = 0
+        self.visible = int(str(tree.cget('height')))
+        self._rowheight = int(ttk.Style(tree).lookup('Treeview', 'rowheight') or 20)
+        scrollbar.configure(command=self._on_scrollbar)
+        tree.bind('<Configure>', self._on_resize, add='+')
+        for seq in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            tree.bind(seq, self._on_wheel)
+        self._show(0)
     
-    # ===== INPUT STYLES =====
-    # Modern entry field style
-    style.configure('Modern.TEntry',
-                   relief='flat',
-                   borderwidth=1,
-                   padding=8)
-    
-    # Modern combobox style
-    style.configure('Modern.TCombobox',
-                   relief='flat',
-                   borderwidth=1,
-                   padding=8)
+    def set_rows(self, rows):
+        """Show a new list of rows (same columns) from the top."""
+        self.rows = rows
+        self._show(0)
+    
+    def _show(self, top):
+        n = len(self.rows)
+        top = max(0, min(top, n - self.visible))
+        self.top = top
+        self.tree.delete(*self.tree.get_children())
+        _tree_append_rows(self.tree, self.rows[top:top + self.visible])
+        if n:
+            self.scrollbar.set(top / n, min(top + self.visible, n) / n)
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self._show(int(float(amount) * len(self.rows)))
+        elif action == 'scroll':
+            step = 1 if unit == 'units' else self.visible
+            self._show(self.top + int(amount) * step)
+    
+    def _on_wheel(self, event):
+        down = event.num == 5 or getattr(event, 'delta', 0) < 0
+        self._show(self.top + (3 if down else -3))
+        return 'break'
+    
+    def _on_resize(self, event):
+        # One row's height goes to the headings
+        visible = max(1, event.height // self._rowheight - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self._show(self.top)
+
+@lru_cache(maxsize=None)
+def _get_filedialog():
+    """Import tkinter.filedialog on first use; only upload/download paths need it."""
+    from tkinter import filedialog
+    return filedialog
+
+def _labeled_entry(parent, row, text, width=25, column=0, pady=8, padx=(10, 0)):
+    """Grid a form label and its entry side by side on a card; returns the entry."""
+    tk.Label(parent, text=text, font=FONTS.label,
+             fg=COLORS.text, bg=COLORS.bg_card).grid(row=row, column=column, sticky='w', pady=pady)
+    entry = ttk.Entry(parent, style='Modern.TEntry', font=FONTS.body, width=width)
+    entry.grid(row=row, column=column + 1, sticky='ew', pady=pady, padx=padx)
+    return entry
+
+def _sync_listbox(listbox, old, new):
+    """Update a listbox showing `old` to show `new`, touching only the changed rows."""
+    ops = difflib.SequenceMatcher(a=old, b=new, autojunk=False).get_opcodes()
+    # Apply from the end so earlier indices stay valid
+    for tag, i1, i2, j1, j2 in reversed(ops):
+        if tag == 'equal':
+            continue
+        if i2 > i1:
+            listbox.delete(i1, i2 - 1)
+        if j2 > j1:
+            listbox.insert(i1, *new[j1:j2])
+
+class LazyNotebookTabs:
+    """
+    Notebook whose tab contents are built the first time each tab is shown.
+    
+    Each tab starts as an empty placeholder frame; its builder(parent) is called
+    on the first <<NotebookTabChanged>> selecting it (or on ensure_built) and
+    the frame it returns is packed into the placeholder.
+    """
+    
+    def __init__(self, notebook):
+        self.notebook = notebook
+        self._builders = {}  # placeholder widget path -> builder
+        notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed, add='+')
+    
+    def add(self, builder, text, eager=False):
+        placeholder = ttk.Frame(self.notebook)
+        self.notebook.add(placeholder, text=text)
+        self._builders[str(placeholder)] = builder
+        if eager:
+            self.ensure_built(placeholder)
+        return placeholder
+    
+    def ensure_built(self, placeholder):
+        builder = self._builders.pop(str(placeholder), None)
+        if builder is not None:
+            builder(placeholder).pack(fill='both', expand=True)
+    
+    def _on_tab_changed(self, event=None):
+        selected = self.notebook.select()
+        if selected:
+            self.ensure_built(self.notebook.nametowidget(selected))
 
 # =============================================================================
 # MAIN APPLICATION CLASS
@@ -345,98 +927,99 @@ class ClinicApp(tk.Tk):
     def __init__(self):
         """Initialize the main application window."""
         super().__init__()
-        self.title("Advanced Clinic Management System")
-        self.geometry("800x600")
-        self.configure(bg=COLORS['bg_main'])
-        
-        # Apply modern styling to all components
-        configure_modern_style()
-        
-        # Create main container with padding for better visual spacing
-        main_container = tk.Frame(self, bg=COLORS['bg_main'])
-        main_container.pack(fill='both', expand=True, padx=40, pady=40)
-        
-        # Header section
-        header_frame = tk.Frame(main_container, bg=COLORS['bg_main'])
-        header_frame.pack(fill='x', pady=(0, 30))
-        
-        # Title with medical symbol
-        title_label = tk.Label(header_frame, 
-                              text="🏥 Advanced Clinic Management System",
-                              font=('Segoe UI', 24, 'bold'),
-                              fg=COLORS['primary'],
-                              bg=COLORS['bg_main'])
-        title_label.pack()
-        
-        subtitle_label = tk.Label(header_frame,
-                                 text="Modern Healthcare Management Solution",
-                                 font=('Segoe UI', 12),
-                                 fg=COLORS['text'],
-                                 bg=COLORS['bg_main'])
-        subtitle_label.pack(pady=(5, 0))
-        
-        # Main buttons container
-        buttons_frame = tk.Frame(main_container, bg=COLORS['bg_main'])
-        buttons_frame.pack(expand=True)
-        
-        # Patient interface button
-        patient_frame = tk.Frame(buttons_frame, bg=COLORS['bg_card'], relief='solid', bd=1)
-        patient_frame.pack(pady=15, padx=20, fill='x')
-        
-        patient_icon = tk.Label(patient_frame, text="👤", font=('Segoe UI', 32), 
-                               bg=COLORS['bg_card'])
-        patient_icon.pack(pady=(20, 10))
-        
-        patient_title = tk.Label(patient_frame, text="Patient Portal",
-                                font=('Segoe UI', 16, 'bold'),
-                                fg=COLORS['text'], bg=COLORS['bg_card'])
-        patient_title.pack()
-        
-        patient_desc = tk.Label(patient_frame, 
-                               text="Book appointments and view your medical history",
-                               font=('Segoe UI', 10),
-                               fg=COLORS['text'], bg=COLORS['bg_card'])
-        patient_desc.pack(pady=(5, 15))
-        
-        patient_btn = ttk.Button(patient_frame, text="Enter Patient Portal", 
-                                style='Modern.TButton',
-                                command=self.open_patient)
-        patient_btn.pack(pady=(0, 20))
-        
-        # Doctor interface button
-        doctor_frame = tk.Frame(buttons_frame, bg=COLORS['bg_card'], relief='solid', bd=1)
-        doctor_frame.pack(pady=15, padx=20, fill='x')
-        
-        doctor_icon = tk.Label(doctor_frame, text="👩‍⚕️", font=('Segoe UI', 32), 
-                              bg=COLORS['bg_card'])
-        doctor_icon.pack(pady=(20, 10))
-        
-        doctor_title = tk.Label(doctor_frame, text="Doctor Dashboard",
-                               font=('Segoe UI', 16, 'bold'),
-                               fg=COLORS['text'], bg=COLORS['bg_card'])
-        doctor_title.pack()
-        
-        doctor_desc = tk.Label(doctor_frame, 
-                              text="Manage appointments, patients and medical observations",
-                              font=('Segoe UI', 10),
-                              fg=COLORS['text'], bg=COLORS['bg_card'])
-        doctor_desc.pack(pady=(5, 15))
-        
-        doctor_btn = ttk.Button(doctor_frame, text="Enter Doctor Dashboard", 
-                               style='Modern.TButton',
-                               command=self.open_doctor)
-        doctor_btn.pack(pady=(0, 20))
-        
-        # Footer
-        footer_frame = tk.Frame(main_container, bg=COLORS['bg_main'])
-        footer_frame.pack(side='bottom', fill='x', pady=(30, 0))
-        
-        status_label = tk.Label(footer_frame,
-                               text="💡 Ensure Neo4j server is running with correct credentials",
-                               font=('Segoe UI', 9),
-                               fg=COLORS['warning'],
-                               bg=COLORS['bg_main'])
-        status_label.pack()
+        with batch_ui(self):
+            self.title("Advanced Clinic Management System")
+            self.geometry("800x600")
+            self.configure(bg=COLORS.bg_main)
+        
+            # Apply modern styling to all components
+            configure_modern_style()
+        
+            # Create main container with padding for better visual spacing
+            main_container = tk.Frame(self, bg=COLORS.bg_main)
+            main_container.pack(fill='both', expand=True, padx=40, pady=40)
+        
+            # Header section
+            header_frame = tk.Frame(main_container, bg=COLORS.bg_main)
+            header_frame.pack(fill='x', pady=(0, 30))
+        
+            # Title with medical symbol
+            title_label = tk.Label(header_frame, 
+                                  text="🏥 Advanced Clinic Management System",
+                                  font=('Segoe UI', 24, 'bold'),
+                                  fg=COLORS.primary,
+                                  bg=COLORS.bg_main)
+            title_label.pack()
+        
+            subtitle_label = tk.Label(header_frame,
+                                     text="Modern Healthcare Management Solution",
+                                     font=('Segoe UI', 12),
+                                     fg=COLORS.text,
+                                     bg=COLORS.bg_main)
+            subtitle_label.pack(pady=(5, 0))
+        
+            # Main buttons container
+            buttons_frame = tk.Frame(main_container, bg=COLORS.bg_main)
+            buttons_frame.pack(expand=True)
+        
+            # Patient interface button
+            patient_frame = tk.Frame(buttons_frame, bg=COLORS.bg_card, relief='solid', bd=1)
+            patient_frame.pack(pady=15, padx=20, fill='x')
+        
+            patient_icon = tk.Label(patient_frame, text="👤", font=('Segoe UI', 32), 
+                                   bg=COLORS.bg_card)
+            patient_icon.pack(pady=(20, 10))
+        
+            patient_title = tk.Label(patient_frame, text="Patient Portal",
+                                    font=('Segoe UI', 16, 'bold'),
+                                    fg=COLORS.text, bg=COLORS.bg_card)
+            patient_title.pack()
+        
+            patient_desc = tk.Label(patient_frame, 
+                                   text="Book appointments and view your medical history",
+                                   font=FONTS.text,
+                                   fg=COLORS.text, bg=COLORS.bg_card)
+            patient_desc.pack(pady=(5, 15))
+        
+            patient_btn = ttk.Button(patient_frame, text="Enter Patient Portal", 
+                                    style='Modern.TButton',
+                                    command=self.open_patient)
+            patient_btn.pack(pady=(0, 20))
+        
+            # Doctor interface button
+            doctor_frame = tk.Frame(buttons_frame, bg=COLORS.bg_card, relief='solid', bd=1)
+            doctor_frame.pack(pady=15, padx=20, fill='x')
+        
+            doctor_icon = tk.Label(doctor_frame, text="👩‍⚕️", font=('Segoe UI', 32), 
+                                  bg=COLORS.bg_card)
+            doctor_icon.pack(pady=(20, 10))
+        
+            doctor_title = tk.Label(doctor_frame, text="Doctor Dashboard",
+                                   font=('Segoe UI', 16, 'bold'),
+                                   fg=COLORS.text, bg=COLORS.bg_card)
+            doctor_title.pack()
+        
+            doctor_desc = tk.Label(doctor_frame, 
+                                  text="Manage appointments, patients and medical observations",
+                                  font=FONTS.text,
+                                  fg=COLORS.text, bg=COLORS.bg_card)
+            doctor_desc.pack(pady=(5, 15))
+        
+            doctor_btn = ttk.Button(doctor_frame, text="Enter Doctor Dashboard", 
+                                   style='Modern.TButton',
+                                   command=self.open_doctor)
+            doctor_btn.pack(pady=(0, 20))
+        
+            # Footer
+            footer_frame = tk.Frame(main_container, bg=COLORS.bg_main)
+            footer_frame.pack(side='bottom', fill='x', pady=(30, 0))
+        
+            status_label = tk.Label(footer_frame,
+                                   text="💡 Ensure Neo4j server is running with correct credentials",
+                                   font=('Segoe UI', 9),
+                                   fg=COLORS.warning,
+                                   bg=COLORS.bg_main)
+            status_label.pack()
 
     def open_patient(self):
         PatientWindow(self)
@@ -447,109 +1030,116 @@ class ClinicApp(tk.Tk):
 class PatientWindow(tk.Toplevel):
     def __init__(self, master):
         super().__init__(master)
-        self.title("Patient Portal")
-        self.geometry("900x700")
-        self.configure(bg=COLORS['bg_main'])
+        with batch_ui(self):
+            self.title("Patient Portal")
+            self.geometry("900x700")
+            self.configure(bg=COLORS.bg_main)
+        
+            # Header
+            header = tk.Frame(self, bg=COLORS.primary, height=80)
+            header.pack(fill='x')
+            header.pack_propagate(False)
         
-        # Header
-        header = tk.Frame(self, bg=COLORS['primary'], height=80)
-        header.pack(fill='x')
-        header.pack_propagate(False)
+            title = tk.Label(header, text="👤 Patient Portal", 
+                            font=('Segoe UI', 18, 'bold'),
+                            fg='white', bg=COLORS.primary)
+            title.pack(expand=True)
         
-        title = tk.Label(header, text="👤 Patient Portal", 
-                        font=('Segoe UI', 18, 'bold'),
-                        fg='white', bg=COLORS['primary'])
-        title.pack(expand=True)
+            # Main content with notebook
+            notebook = ttk.Notebook(self)
+            notebook.pack(expand=True, fill="both", padx=20, pady=20)
         
-        # Main content with notebook
-        notebook = ttk.Notebook(self)
-        notebook.pack(expand=True, fill="both", padx=20, pady=20)
+            # Only the first tab is built up front; the rest on first selection
+            self._tabs = LazyNotebookTabs(notebook)
         
-        # Tab 1: Book Appointment
-        tab1 = self.create_booking_tab(notebook)
-        notebook.add(tab1, text="📅 Book Appointment")
+            # Tab 1: Book Appointment
+            self._tabs.add(self.create_booking_tab, "📅 Book Appointment", eager=True)
         
-        # Tab 2: View Appointments
-        tab2 = self.create_appointments_tab(notebook)
-        notebook.add(tab2, text="📋 My Appointments")
+            # Tab 2: View Appointments
+            self._tabs.add(self.create_appointments_tab, "📋 My Appointments")
+
+            # Tab 3: Chat
+            self._tabs.add(self.create_chat_tab_patient, "💬 Chat")
 
-        # Tab 3: Chat
-        tab3 = self.create_chat_tab_patient(notebook)
-        notebook.add(tab3, text="💬 Chat")
+            # Chat state
+            self._chat_p_doctor_map = {}
+            self._chat_p_patient_mysql_id = None
+            self._chat_p_patient_mongo_id = None
+            self._chat_p_doctor_mongo_id = None
+            self._chat_p_conversation_id = None
+            self._chat_p_refresh_after = None
+            self._chat_p_last_msg_id = None
+            self._chat_p_first_msg_id = None
+            self._chat_p_has_older = False
+            self._chat_p_loading_older = False
         
         # Load initial data
         self._dept_map = {}
+        self._dept_doctors = {}
         self._doctor_map = {}
+        # (patient_mongo_id, doctor_mongo_id) -> conversation id
+        self._conv_id_cache = {}
         self.load_departments()
     
     def create_booking_tab(self, parent):
         tab = ttk.Frame(parent)
         
         # Main container
-        container = tk.Frame(tab, bg=COLORS['bg_main'])
+        container = tk.Frame(tab, bg=COLORS.bg_main)
         container.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Patient Information Card
-        info_card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        info_card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         info_card.pack(fill='x', pady=(0, 20))
         
         info_title = tk.Label(info_card, text="📝 Patient Information",
-                             font=('Segoe UI', 14, 'bold'),
-                             fg=COLORS['text'], bg=COLORS['bg_card'])
+                             font=FONTS.heading,
+                             fg=COLORS.text, bg=COLORS.bg_card)
         info_title.pack(pady=(15, 10))
         
         # Form grid
-        form_frame = tk.Frame(info_card, bg=COLORS['bg_card'])
+        form_frame = tk.Frame(info_card, bg=COLORS.bg_card)
         form_frame.pack(padx=30, pady=(0, 20))
         
         # First Name
-        tk.Label(form_frame, text="First Name:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=0, column=0, sticky='w', pady=8)
-        self.fname_entry = ttk.Entry(form_frame, style='Modern.TEntry', font=('Segoe UI', 11), width=25)
-        self.fname_entry.grid(row=0, column=1, sticky='ew', pady=8, padx=(10, 0))
+        self.fname_entry = _labeled_entry(form_frame, 0, "First Name:")
         
         # Last Name
-        tk.Label(form_frame, text="Last Name:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=1, column=0, sticky='w', pady=8)
-        self.lname_entry = ttk.Entry(form_frame, style='Modern.TEntry', font=('Segoe UI', 11), width=25)
-        self.lname_entry.grid(row=1, column=1, sticky='ew', pady=8, padx=(10, 0))
+        self.lname_entry = _labeled_entry(form_frame, 1, "Last Name:")
         
         form_frame.grid_columnconfigure(1, weight=1)
         
         # Appointment Details Card
-        appt_card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        appt_card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         appt_card.pack(fill='x', pady=(0, 20))
         
         appt_title = tk.Label(appt_card, text="🏥 Appointment Details",
-                             font=('Segoe UI', 14, 'bold'),
-                             fg=COLORS['text'], bg=COLORS['bg_card'])
+                             font=FONTS.heading,
+                             fg=COLORS.text, bg=COLORS.bg_card)
         appt_title.pack(pady=(15, 10))
         
         # Appointment form
-        appt_form = tk.Frame(appt_card, bg=COLORS['bg_card'])
+        appt_form = tk.Frame(appt_card, bg=COLORS.bg_card)
         appt_form.pack(padx=30, pady=(0, 20))
         
         # Department
-        tk.Label(appt_form, text="Department:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=0, column=0, sticky='w', pady=8)
+        tk.Label(appt_form, text="Department:", font=FONTS.label,
+                fg=COLORS.text, bg=COLORS.bg_card).grid(row=0, column=0, sticky='w', pady=8)
         self.dept_combo = ttk.Combobox(appt_form, state="readonly", style='Modern.TCombobox',
-                                      font=('Segoe UI', 11), width=23)
+                                      font=FONTS.body, width=23)
         self.dept_combo.grid(row=0, column=1, sticky='ew', pady=8, padx=(10, 0))
         self.dept_combo.bind("<<ComboboxSelected>>", self.on_dept_selected)
         
         # Doctor
-        tk.Label(appt_form, text="Doctor:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=1, column=0, sticky='w', pady=8)
+        tk.Label(appt_form, text="Doctor:", font=FONTS.label,
+                fg=COLORS.text, bg=COLORS.bg_card).grid(row=1, column=0, sticky='w', pady=8)
         self.doctor_combo = ttk.Combobox(appt_form, state="readonly", style='Modern.TCombobox',
-                                        font=('Segoe UI', 11), width=23)
+                                        font=FONTS.body, width=23)
         self.doctor_combo.grid(row=1, column=1, sticky='ew', pady=8, padx=(10, 0))
         
         # Date
-        tk.Label(appt_form, text="Preferred Date:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=2, column=0, sticky='w', pady=8)
-        self.date_entry = ttk.Entry(appt_form, style='Modern.TEntry', font=('Segoe UI', 11), width=25)
-        self.date_entry.grid(row=2, column=1, sticky='ew', pady=8, padx=(10, 0))
-        self.date_entry.insert(0, datetime.date.today().strftime("%Y-%m-%d"))
+        self.date_entry = _labeled_entry(appt_form, 2, "Preferred Date:")
+        self.date_entry.insert(0, datetime.date.today().isoformat())
         
         appt_form.grid_columnconfigure(1, weight=1)
         
@@ -563,37 +1153,31 @@ class PatientWindow(tk.Toplevel):
 
     def create_chat_tab_patient(self, parent):
         tab = ttk.Frame(parent)
-        container = tk.Frame(tab, bg=COLORS['bg_main'])
+        container = tk.Frame(tab, bg=COLORS.bg_main)
         container.pack(fill='both', expand=True, padx=20, pady=20)
 
-        card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         card.pack(fill='both', expand=True)
 
-        title = tk.Label(card, text="💬 Patient-Doctor Chat", font=('Segoe UI', 14, 'bold'),
-                         fg=COLORS['text'], bg=COLORS['bg_card'])
+        title = tk.Label(card, text="💬 Patient-Doctor Chat", font=FONTS.heading,
+                         fg=COLORS.text, bg=COLORS.bg_card)
         title.pack(pady=(15, 10))
 
-        form = tk.Frame(card, bg=COLORS['bg_card'])
+        form = tk.Frame(card, bg=COLORS.bg_card)
         form.pack(fill='x', padx=20, pady=(0, 10))
 
-        tk.Label(form, text="First Name:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=0, column=0, sticky='w', pady=5)
-        self.chat_p_fname = ttk.Entry(form, style='Modern.TEntry', font=('Segoe UI', 11), width=18)
-        self.chat_p_fname.grid(row=0, column=1, sticky='ew', pady=5, padx=(10, 20))
+        self.chat_p_fname = _labeled_entry(form, 0, "First Name:", width=18, pady=5, padx=(10, 20))
 
-        tk.Label(form, text="Last Name:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=0, column=2, sticky='w', pady=5)
-        self.chat_p_lname = ttk.Entry(form, style='Modern.TEntry', font=('Segoe UI', 11), width=18)
-        self.chat_p_lname.grid(row=0, column=3, sticky='ew', pady=5, padx=(10, 20))
+        self.chat_p_lname = _labeled_entry(form, 0, "Last Name:", width=18, column=2, pady=5, padx=(10, 20))
 
         load_btn = ttk.Button(form, text="👨‍⚕️ Load My Doctors", style='Modern.TButton',
                               command=self.patient_chat_load_doctors)
         load_btn.grid(row=0, column=4, padx=(0, 0))
 
-        tk.Label(form, text="Doctor:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=1, column=0, sticky='w', pady=5)
+        tk.Label(form, text="Doctor:", font=FONTS.label,
+                fg=COLORS.text, bg=COLORS.bg_card).grid(row=1, column=0, sticky='w', pady=5)
         self.chat_p_doctor_combo = ttk.Combobox(form, state='readonly', style='Modern.TCombobox',
-                                                font=('Segoe UI', 11), width=40)
+                                                font=FONTS.body, width=40)
         self.chat_p_doctor_combo.grid(row=1, column=1, columnspan=3, sticky='ew', pady=5, padx=(10, 20))
 
         open_btn = ttk.Button(form, text="📂 Open Chat", style='Success.TButton',
@@ -604,21 +1188,23 @@ class PatientWindow(tk.Toplevel):
         form.grid_columnconfigure(3, weight=1)
 
         # Messages area
-        msg_frame = tk.Frame(card, bg=COLORS['bg_card'])
+        msg_frame = tk.Frame(card, bg=COLORS.bg_card)
         msg_frame.pack(fill='both', expand=True, padx=20, pady=(0, 10))
 
-        self.chat_p_text = Text(msg_frame, height=16, width=80, font=('Segoe UI', 10),
-                                relief='flat', bg=COLORS['light'], fg=COLORS['text'])
+        self.chat_p_text = tk.Text(msg_frame, height=16, width=80, font=FONTS.text,
+                                   relief='flat', bg=COLORS.light, fg=COLORS.text)
         msg_scroll = ttk.Scrollbar(msg_frame, orient='vertical', command=self.chat_p_text.yview)
-        self.chat_p_text.configure(yscrollcommand=msg_scroll.set)
+        # Scrolling to the top pages in older messages
+        self.chat_p_text.configure(
+            yscrollcommand=lambda first, last: self._on_patient_chat_scroll(msg_scroll, first, last))
         self.chat_p_text.pack(side='left', fill='both', expand=True)
         msg_scroll.pack(side='right', fill='y')
 
         # Composer
-        composer = tk.Frame(card, bg=COLORS['bg_card'])
+        composer = tk.Frame(card, bg=COLORS.bg_card)
         composer.pack(fill='x', padx=20, pady=(0, 15))
 
-        self.chat_p_entry = ttk.Entry(composer, style='Modern.TEntry', font=('Segoe UI', 11))
+        self.chat_p_entry = ttk.Entry(composer, style='Modern.TEntry', font=FONTS.body)
         self.chat_p_entry.pack(side='left', fill='x', expand=True, padx=(0, 10))
 
         img_btn = ttk.Button(composer, text="🖼️ Image", style='Warning.TButton',
@@ -633,152 +1219,269 @@ class PatientWindow(tk.Toplevel):
                                  command=self.patient_chat_refresh_messages)
         refresh_btn.pack(pady=(0, 12))
 
-        # State
-        self._chat_p_doctor_map = {}
-        self._chat_p_patient_mysql_id = None
-        self._chat_p_patient_mongo_id = None
-        self._chat_p_doctor_mongo_id = None
-        self._chat_p_conversation_id = None
-
         return tab
 
-    def _find_patient_by_name(self, first_name: str, last_name: str):
-        return db.get_patient_by_name(first_name, last_name)
-
     def patient_chat_load_doctors(self):
         fname = self.chat_p_fname.get().strip()
         lname = self.chat_p_lname.get().strip()
         if not (fname and lname):
             messagebox.showerror("Input Error", "Enter your first and last name.")
             return
-        try:
-            row = self._find_patient_by_name(fname, lname)
-            if not row:
-                messagebox.showerror("Not Found", "Patient not found.")
-                return
-            self._chat_p_patient_mysql_id = row[0]
-            # ensure mongo patient user
-            self._chat_p_patient_mongo_id = ensure_mongo_user_for_patient(row[0], row[1], row[2])
-            # load distinct doctors for this patient (via appointments)
-            doctors = db.get_doctors_for_patient(row[0])
-            labels = []
-            self._chat_p_doctor_map = {}
-            for d in doctors:
-                label = f"Dr. {d[1]} {d[2]} (ID: {d[0]})"
-                labels.append(label)
-                self._chat_p_doctor_map[label] = d
-            self.chat_p_doctor_combo['values'] = labels
-            if labels:
-                self.chat_p_doctor_combo.current(0)
-                messagebox.showinfo("Loaded", f"Loaded {len(labels)} doctor(s) for chat.")
-            else:
-                messagebox.showinfo("No Doctors", "No assigned doctors via appointments.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load doctors: {e}")
+        run_async(self, self._load_patient_chat_doctors, self._on_patient_chat_doctors_loaded,
+                  fname, lname)
+
+    @staticmethod
+    def _load_patient_chat_doctors(first_name, last_name):
+        # Runs on the I/O pool: find the patient, ensure their mongo user and load
+        # the distinct doctors for this patient (via appointments)
+        row = db.get_patient_by_name(first_name, last_name)
+        if not row:
+            return None
+        patient_mongo_id = ensure_mongo_user_for_patient(row[0], row[1], row[2])
+        return row, patient_mongo_id, db.get_doctors_for_patient(row[0])
+
+    def _on_patient_chat_doctors_loaded(self, result, error):
+        if error is not None:
+            messagebox.showerror("Error", f"Could not load doctors: {error}")
+            return
+        if result is None:
+            messagebox.showerror("Not Found", "Patient not found.")
+            return
+        row, patient_mongo_id, doctors = result
+        self._chat_p_patient_mysql_id = row[0]
+        self._chat_p_patient_mongo_id = patient_mongo_id
+        labels = []
+        self._chat_p_doctor_map = {}
+        for d in doctors:
+            label = f"Dr. {d[1]} {d[2]} (ID: {d[0]})"
+            labels.append(label)
+            self._chat_p_doctor_map[label] = d
+        self.chat_p_doctor_combo['values'] = labels
+        if labels:
+            self.chat_p_doctor_combo.current(0)
+            # Warm the Mongo user/conversation caches so opening a chat needs no I/O
+            if patient_mongo_id:
+                run_async(self, self._warm_patient_chats, self._on_patient_chats_warmed,
+                          patient_mongo_id, doctors)
+            messagebox.showinfo("Loaded", f"Loaded {len(labels)} doctor(s) for chat.")
+        else:
+            messagebox.showinfo("No Doctors", "No assigned doctors via appointments.")
+
+    @staticmethod
+    def _warm_patient_chats(patient_mongo_id, doctors):
+        # Runs on the I/O pool: resolve all doctor users in one bulk upsert, then
+        # their conversations with this patient
+        mongo_ids = ensure_mongo_users_bulk("doctor", doctors)
+        messaging = require_messaging()
+        conv_ids = {}
+        for doctor_mongo_id in mongo_ids.values():
+            key = (patient_mongo_id, doctor_mongo_id)
+            conv_ids[key] = messaging.get_or_create_conversation(*key)
+        return conv_ids
+
+    def _on_patient_chats_warmed(self, conv_ids, error):
+        if error is not None:
+            print(f"Warning: could not preload chats: {error}")
+            return
+        self._conv_id_cache.update((k, v) for k, v in conv_ids.items() if v)
 
     def patient_chat_open_chat(self):
         selection = self.chat_p_doctor_combo.get()
         if not selection:
             messagebox.showerror("Input Error", "Select a doctor.")
             return
-        try:
-            d = self._chat_p_doctor_map.get(selection)
-            if not d:
-                return
-            doctor_id, dfn, dln = d[0], d[1], d[2]
-            self._chat_p_doctor_mongo_id = ensure_mongo_user_for_doctor(doctor_id, dfn, dln)
-            if not (self._chat_p_patient_mongo_id and self._chat_p_doctor_mongo_id):
-                messagebox.showerror("Error", "Could not initialize chat users.")
-                return
-            conv_id = messaging.get_or_create_conversation(self._chat_p_patient_mongo_id, self._chat_p_doctor_mongo_id)
-            self._chat_p_conversation_id = conv_id
-            self.patient_chat_refresh_messages()
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not open chat: {e}")
-
-    def _render_messages_to_text(self, text_widget: Text, messages: list, self_user_id: str):
-        text_widget.config(state='normal')
-        text_widget.delete('1.0', tk.END)
+        d = self._chat_p_doctor_map.get(selection)
+        if not d:
+            return
+        run_async(self, self._resolve_patient_chat, self._on_patient_chat_resolved,
+                  d[:3], self._chat_p_patient_mongo_id, self._conv_id_cache)
+
+    @staticmethod
+    def _resolve_patient_chat(doctor, patient_mongo_id, conv_id_cache):
+        # Runs on the I/O pool: the doctor's mongo user (usually already warmed by
+        # patient_chat_load_doctors), then the conversation
+        doctor_mongo_id = ensure_mongo_user_for_doctor(*doctor)
+        if not (patient_mongo_id and doctor_mongo_id):
+            return doctor_mongo_id, None
+        key = (patient_mongo_id, doctor_mongo_id)
+        conv_id = conv_id_cache.get(key)
+        if conv_id is None:
+            conv_id = require_messaging().get_or_create_conversation(*key)
+        return doctor_mongo_id, conv_id
+
+    def _on_patient_chat_resolved(self, result, error):
+        if error is not None:
+            messagebox.showerror("Error", f"Could not open chat: {error}")
+            return
+        doctor_mongo_id, conv_id = result
+        self._chat_p_doctor_mongo_id = doctor_mongo_id
+        if not conv_id:
+            messagebox.showerror("Error", "Could not initialize chat users.")
+            return
+        self._conv_id_cache[(self._chat_p_patient_mongo_id, doctor_mongo_id)] = conv_id
+        if conv_id != self._chat_p_conversation_id:
+            # New conversation: next refresh does a full render
+            self._chat_p_last_msg_id = None
+            self._chat_p_first_msg_id = None
+            self._chat_p_has_older = False
+        self._chat_p_conversation_id = conv_id
+        self.patient_chat_refresh_messages()
+
+    @staticmethod
+    def _format_messages(messages: list, self_user_id: str) -> str:
+        lines = []
         for m in messages:
             ts = m.get('timestamp', '')
             sender = 'You' if m.get('sender_id') == self_user_id else 'Them'
             if m.get('message_type') == 'image':
                 filename = m.get('image_filename', 'image')
                 size = m.get('image_size', 0)
-                text_widget.insert(tk.END, f"[{ts}] {sender}: [Image] {filename} ({size} bytes)\n")
+                lines.append(f"[{ts}] {sender}: [Image] {filename} ({size} bytes)\n")
             else:
-                text_widget.insert(tk.END, f"[{ts}] {sender}: {m.get('message_text','')}\n")
+                lines.append(f"[{ts}] {sender}: {m.get('message_text','')}\n")
+        return "".join(lines)
+
+    def _render_messages_to_text(self, text_widget: tk.Text, messages: list, self_user_id: str,
+                                 append: bool = False):
+        text_widget.config(state='normal')
+        if not append:
+            text_widget.delete('1.0', tk.END)
+        text_widget.insert(tk.END, self._format_messages(messages, self_user_id))
         text_widget.see(tk.END)
         text_widget.config(state='disabled')
 
+    def _prepend_messages_to_text(self, text_widget: tk.Text, messages: list, self_user_id: str):
+        # A right-gravity mark at the old first line keeps it at the top of the view
+        text_widget.config(state='normal')
+        text_widget.mark_set('chat_top', '1.0')
+        text_widget.mark_gravity('chat_top', 'right')
+        text_widget.insert('1.0', self._format_messages(messages, self_user_id))
+        text_widget.yview('chat_top')
+        text_widget.config(state='disabled')
+
     def patient_chat_refresh_messages(self):
-        try:
-            if not self._chat_p_conversation_id:
-                return
-            msgs = messaging.get_conversation_messages(self._chat_p_conversation_id, limit=200)
-            self._render_messages_to_text(self.chat_p_text, msgs, self._chat_p_patient_mongo_id)
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load messages: {e}")
+        # Coalesce bursts of refresh requests (open, several sends) into one reload
+        if self._chat_p_refresh_after is not None:
+            self.after_cancel(self._chat_p_refresh_after)
+        self._chat_p_refresh_after = self.after(50, self._do_patient_chat_refresh)
+
+    def _do_patient_chat_refresh(self):
+        self._chat_p_refresh_after = None
+        conv_id = self._chat_p_conversation_id
+        if not conv_id:
+            return
+        # First load fetches the newest page; later ones only messages newer than
+        # the last rendered one, which are appended
+        last_id = self._chat_p_last_msg_id
+        limit = CHAT_PAGE_SIZE if last_id is None else 200
+        run_async(self, lambda: require_messaging().get_messages_since(conv_id, last_id, limit=limit,
+                                                                     include_images=False),
+                  lambda msgs, error: self._on_patient_messages_loaded(conv_id, last_id, msgs, error))
+
+    def _on_patient_messages_loaded(self, conv_id, last_id, msgs, error):
+        if error is not None:
+            messagebox.showerror("Error", f"Could not load messages: {error}")
+            return
+        if conv_id != self._chat_p_conversation_id or last_id != self._chat_p_last_msg_id:
+            return  # chat switched or another refresh already rendered these
+        if last_id is None:
+            self._chat_p_first_msg_id = msgs[0]['_id'] if msgs else None
+            self._chat_p_has_older = len(msgs) == CHAT_PAGE_SIZE
+        elif not msgs:
+            return
+        self._render_messages_to_text(self.chat_p_text, msgs, self._chat_p_patient_mongo_id,
+                                      append=last_id is not None)
+        if msgs:
+            self._chat_p_last_msg_id = msgs[-1]['_id']
+
+    def _on_patient_chat_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        if float(first) <= 0.0:
+            self._load_older_patient_messages()
+
+    def _load_older_patient_messages(self):
+        if self._chat_p_loading_older or not (self._chat_p_has_older and self._chat_p_first_msg_id):
+            return
+        self._chat_p_loading_older = True
+        conv_id, before_id = self._chat_p_conversation_id, self._chat_p_first_msg_id
+        run_async(self,
+                  lambda: require_messaging().get_conversation_messages(conv_id, limit=CHAT_PAGE_SIZE,
+                                                                        before_id=before_id,
+                                                                        include_images=False),
+                  lambda msgs, error: self._on_older_patient_messages(conv_id, msgs, error))
+
+    def _on_older_patient_messages(self, conv_id, msgs, error):
+        self._chat_p_loading_older = False
+        if error is not None:
+            print(f"Warning: could not load older messages: {error}")
+            return
+        if conv_id != self._chat_p_conversation_id:
+            return
+        self._chat_p_has_older = len(msgs) == CHAT_PAGE_SIZE
+        if msgs:
+            self._chat_p_first_msg_id = msgs[0]['_id']
+            self._prepend_messages_to_text(self.chat_p_text, msgs, self._chat_p_patient_mongo_id)
 
     def patient_chat_send_text(self):
         msg = self.chat_p_entry.get().strip()
         if not msg:
             return
-        try:
-            if not self._chat_p_conversation_id:
-                messagebox.showerror("Error", "Open a chat first.")
-                return
-            messaging.send_message(self._chat_p_patient_mongo_id, self._chat_p_conversation_id, message_text=msg)
-            self.chat_p_entry.delete(0, tk.END)
-            self.patient_chat_refresh_messages()
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not send message: {e}")
+        if not self._chat_p_conversation_id:
+            messagebox.showerror("Error", "Open a chat first.")
+            return
+        sender_id, conv_id = self._chat_p_patient_mongo_id, self._chat_p_conversation_id
+        run_async(self, lambda: require_messaging().send_message(sender_id, conv_id, message_text=msg),
+                  self._on_patient_message_sent)
+
+    def _on_patient_message_sent(self, message_id, error):
+        if error is not None or not message_id:
+            messagebox.showerror("Error", f"Could not send message: {error or 'send failed'}")
+            return
+        self.chat_p_entry.delete(0, tk.END)
+        self.patient_chat_refresh_messages()
 
     def patient_chat_send_image(self):
         try:
             if not self._chat_p_conversation_id:
                 messagebox.showerror("Error", "Open a chat first.")
                 return
-            filetypes = [("Images", "*.png *.jpg *.jpeg *.bmp *.gif *.tiff *.webp")]
-            file_path = filedialog.askopenfilename(title="Select Image", filetypes=filetypes)
+            file_path = _get_filedialog().askopenfilename(title="Select Image", filetypes=IMAGE_FILETYPES)
             if not file_path:
                 return
-            with open(file_path, 'rb') as f:
-                data = f.read()
-            basename = os.path.basename(file_path)
-            messaging.send_message(self._chat_p_patient_mongo_id, self._chat_p_conversation_id,
-                                   message_text="", image_data=data, image_filename=basename)
-            self.patient_chat_refresh_messages()
+            sender_id, conv_id = self._chat_p_patient_mongo_id, self._chat_p_conversation_id
+            # Stream the file into GridFS on the I/O pool
+            run_async(self, lambda: require_messaging().send_image_file(sender_id, conv_id, file_path),
+                      self._on_patient_image_sent)
         except Exception as e:
             messagebox.showerror("Error", f"Could not send image: {e}")
+
+    def _on_patient_image_sent(self, message_id, error):
+        if error is not None or not message_id:
+            messagebox.showerror("Error", f"Could not send image: {error or 'upload failed'}")
+            return
+        self.patient_chat_refresh_messages()
     
     def create_appointments_tab(self, parent):
         tab = ttk.Frame(parent)
         
-        container = tk.Frame(tab, bg=COLORS['bg_main'])
+        container = tk.Frame(tab, bg=COLORS.bg_main)
         container.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Search card
-        search_card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        search_card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         search_card.pack(fill='x', pady=(0, 20))
         
         search_title = tk.Label(search_card, text="🔍 Find My Appointments",
-                               font=('Segoe UI', 14, 'bold'),
-                               fg=COLORS['text'], bg=COLORS['bg_card'])
+                               font=FONTS.heading,
+                               fg=COLORS.text, bg=COLORS.bg_card)
         search_title.pack(pady=(15, 10))
         
-        search_form = tk.Frame(search_card, bg=COLORS['bg_card'])
+        search_form = tk.Frame(search_card, bg=COLORS.bg_card)
         search_form.pack(padx=30, pady=(0, 20))
         
-        tk.Label(search_form, text="First Name:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=0, column=0, sticky='w', pady=5)
-        self.view_fname = ttk.Entry(search_form, style='Modern.TEntry', font=('Segoe UI', 11), width=20)
-        self.view_fname.grid(row=0, column=1, sticky='ew', pady=5, padx=(10, 20))
+        self.view_fname = _labeled_entry(search_form, 0, "First Name:", width=20, pady=5, padx=(10, 20))
         
-        tk.Label(search_form, text="Last Name:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=0, column=2, sticky='w', pady=5)
-        self.view_lname = ttk.Entry(search_form, style='Modern.TEntry', font=('Segoe UI', 11), width=20)
-        self.view_lname.grid(row=0, column=3, sticky='ew', pady=5, padx=(10, 0))
+        self.view_lname = _labeled_entry(search_form, 0, "Last Name:", width=20, column=2, pady=5)
         
         search_btn = ttk.Button(search_form, text="🔍 Search", 
                                style='Modern.TButton',
@@ -789,20 +1492,20 @@ class PatientWindow(tk.Toplevel):
         search_form.grid_columnconfigure(3, weight=1)
         
         # Results card
-        results_card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        results_card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         results_card.pack(fill='both', expand=True)
         
         results_title = tk.Label(results_card, text="📋 Your Appointments",
-                                font=('Segoe UI', 14, 'bold'),
-                                fg=COLORS['text'], bg=COLORS['bg_card'])
+                                font=FONTS.heading,
+                                fg=COLORS.text, bg=COLORS.bg_card)
         results_title.pack(pady=(15, 10))
         
         # Text area with scrollbar
-        text_frame = tk.Frame(results_card, bg=COLORS['bg_card'])
+        text_frame = tk.Frame(results_card, bg=COLORS.bg_card)
         text_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
         
-        self.appt_text = Text(text_frame, height=15, width=80, font=('Segoe UI', 10),
-                             relief='flat', bg=COLORS['light'], fg=COLORS['text'])
+        self.appt_text = tk.Text(text_frame, height=15, width=80, font=FONTS.text,
+                                relief='flat', bg=COLORS.light, fg=COLORS.text)
         scrollbar = ttk.Scrollbar(text_frame, orient='vertical', command=self.appt_text.yview)
         self.appt_text.configure(yscrollcommand=scrollbar.set)
         
@@ -812,38 +1515,39 @@ class PatientWindow(tk.Toplevel):
         return tab
     
     def load_departments(self):
-        try:
-            rows = db.get_departments()
-            names = []
-            for dept_id, name in rows:
-                self._dept_map[name] = dept_id
-                names.append(name)
-            self.dept_combo["values"] = names
-            if names:
-                self.dept_combo.current(0)
-                self.on_dept_selected()
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Could not load departments:\n{e}")
+        run_async(self, lambda: (db.get_departments(), db.get_all_department_doctors()),
+                  self._on_departments_loaded)
+
+    def _on_departments_loaded(self, result, error):
+        if error is not None:
+            messagebox.showerror("Database Error", f"Could not load departments:\n{error}")
+            return
+        rows, self._dept_doctors = result
+        names = []
+        for dept_id, name in rows:
+            self._dept_map[name] = dept_id
+            names.append(name)
+        self.dept_combo["values"] = names
+        if names:
+            self.dept_combo.current(0)
+            self.on_dept_selected()
     
     def on_dept_selected(self, event=None):
+        # Doctors for all departments were fetched with the department list
         dept_name = self.dept_combo.get()
         dept_id = self._dept_map.get(dept_name)
         if not dept_id:
             self.doctor_combo["values"] = []
             return
-        try:
-            rows = db.get_doctors_by_department(dept_id)
-            names = []
-            self._doctor_map = {}
-            for doc_id, first_name, last_name in rows:
-                label = f"Dr. {first_name} {last_name}"
-                self._doctor_map[label] = doc_id
-                names.append(label)
-            self.doctor_combo["values"] = names
-            if names:
-                self.doctor_combo.current(0)
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Could not load doctors for department:\n{e}")
+        names = []
+        self._doctor_map = {}
+        for doc_id, first_name, last_name in self._dept_doctors.get(dept_id, ()):
+            label = f"Dr. {first_name} {last_name}"
+            self._doctor_map[label] = doc_id
+            names.append(label)
+        self.doctor_combo["values"] = names
+        if names:
+            self.doctor_combo.current(0)
     
     def book_appointment(self):
         fname = self.fname_entry.get().strip()
@@ -858,31 +1562,36 @@ class PatientWindow(tk.Toplevel):
             messagebox.showerror("Input Error", "Date must be in YYYY-MM-DD format")
             return
         
-        try:
-            doctor_id = self._doctor_map.get(doctor_label)
-            if not doctor_id:
-                messagebox.showerror("Input Error", "Please select a valid doctor.")
-                return
-            
-            # Ensure patient exists
-            found = db.get_patient_by_name(fname, lname)
-            if found:
-                patient_id = found[0]
-            else:
-                patient_id = db.create_patient(fname, lname, doctor_id)
-            # Create appointment
-            db.create_appointment(doctor_id, date, patient_id)
-            
-            messagebox.showinfo("Success", "✅ Appointment booked successfully!\n\nYou will receive a confirmation shortly.")
-            
-            # Clear form
-            self.fname_entry.delete(0, tk.END)
-            self.lname_entry.delete(0, tk.END)
-            self.date_entry.delete(0, tk.END)
-            self.date_entry.insert(0, datetime.date.today().strftime("%Y-%m-%d"))
-            
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Could not book appointment:\n{e}")
+        doctor_id = self._doctor_map.get(doctor_label)
+        if not doctor_id:
+            messagebox.showerror("Input Error", "Please select a valid doctor.")
+            return
+        run_async(self, self._book_appointment_db, self._on_appointment_booked,
+                  fname, lname, doctor_id, date)
+
+    @staticmethod
+    def _book_appointment_db(fname, lname, doctor_id, date):
+        # Runs on the I/O pool: no Tk calls here
+        # Ensure patient exists
+        found = db.get_patient_by_name(fname, lname)
+        if found:
+            patient_id = found[0]
+        else:
+            patient_id = db.create_patient(fname, lname, doctor_id)
+        # Create appointment
+        return db.create_appointment(doctor_id, date, patient_id)
+
+    def _on_appointment_booked(self, _result, error):
+        if error is not None:
+            messagebox.showerror("Database Error", f"Could not book appointment:\n{error}")
+            return
+        messagebox.showinfo("Success", "✅ Appointment booked successfully!\n\nYou will receive a confirmation shortly.")
+        
+        # Clear form
+        self.fname_entry.delete(0, tk.END)
+        self.lname_entry.delete(0, tk.END)
+        self.date_entry.delete(0, tk.END)
+        self.date_entry.insert(0, datetime.date.today().isoformat())
     
     def load_appointments_for_patient(self):
         fname = self.view_fname.get().strip()
@@ -890,97 +1599,140 @@ class PatientWindow(tk.Toplevel):
         if not (fname and lname):
             messagebox.showerror("Input Error", "Please enter both first and last name.")
             return
-        try:
-            rows = db.get_appointments_for_patient(fname, lname)
-            
-            self.appt_text.delete("1.0", tk.END)
-            if not rows:
-                self.appt_text.insert(tk.END, "No appointments found for this patient.\n\n")
-                self.appt_text.insert(tk.END, "Please check the name spelling or book a new appointment.")
-                return
-            
-            self.appt_text.insert(tk.END, f"📋 Appointments for {fname} {lname}\n")
-            self.appt_text.insert(tk.END, "="*50 + "\n\n")
-            
-            for r in rows:
-                self.appt_text.insert(tk.END, f"🏥 Appointment #{r[0]}\n")
-                self.appt_text.insert(tk.END, f"📅 Date: {r[1]}\n")
-                self.appt_text.insert(tk.END, f"👩‍⚕️ Doctor: Dr. {r[2]} {r[3]}\n")
-                self.appt_text.insert(tk.END, f"🏢 Department: {r[4]}\n")
-                self.appt_text.insert(tk.END, "-"*30 + "\n\n")
-                
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Could not retrieve appointments:\n{e}")
+        run_async(self, db.get_appointments_for_patient,
+                  lambda rows, error: self._on_patient_appointments_loaded(fname, lname, rows, error),
+                  fname, lname)
+
+    def _on_patient_appointments_loaded(self, fname, lname, rows, error):
+        if error is not None:
+            messagebox.showerror("Database Error", f"Could not retrieve appointments:\n{error}")
+            return
+        self.appt_text.delete("1.0", tk.END)
+        if not rows:
+            self.appt_text.insert(tk.END, "No appointments found for this patient.\n\n")
+            self.appt_text.insert(tk.END, "Please check the name spelling or book a new appointment.")
+            return
+        
+        # Build the whole report first so the widget gets a single insert
+        parts = [f"📋 Appointments for {fname} {lname}\n", "="*50 + "\n\n"]
+        parts.extend(
+            f"🏥 Appointment #{r[0]}\n"
+            f"📅 Date: {r[1]}\n"
+            f"👩‍⚕️ Doctor: Dr. {r[2]} {r[3]}\n"
+            f"🏢 Department: {r[4]}\n"
+            + "-"*30 + "\n\n"
+            for r in rows
+        )
+        self.appt_text.insert(tk.END, "".join(parts))
 
 class DoctorWindow(tk.Toplevel):
     def __init__(self, master):
         super().__init__(master)
-        self.title("Doctor Dashboard")
-        self.geometry("1100x800")
-        self.configure(bg=COLORS['bg_main'])
-        self.doctor_id = None
-        self.appointment_map = {}
-        
-        # Header
-        header = tk.Frame(self, bg=COLORS['secondary'], height=80)
-        header.pack(fill='x')
-        header.pack_propagate(False)
-        
-        title = tk.Label(header, text="👩‍⚕️ Doctor Dashboard", 
-                        font=('Segoe UI', 18, 'bold'),
-                        fg='white', bg=COLORS['secondary'])
-        title.pack(expand=True)
-        
-        # Main content with notebook
-        notebook = ttk.Notebook(self)
-        notebook.pack(expand=True, fill="both", padx=20, pady=20)
-        
-        # Tab 1: Login & Appointments
-        tab1 = self.create_login_tab(notebook)
-        notebook.add(tab1, text="🔐 Login & Appointments")
-        
-        # Tab 2: Medical Observations
-        tab2 = self.create_observation_tab(notebook)
-        notebook.add(tab2, text="📋 Medical Records & Files")
-        
-        # Tab 3: File Management
-        tab3 = self.create_file_management_tab(notebook)
-        notebook.add(tab3, text="📁 File Management")
-        
-        # Tab 4: Database Queries
-        tab4 = self.create_query_tab(notebook)
-        notebook.add(tab4, text="🔍 Research Queries")
-
-        # Tab 5: Chat
-        tab5 = self.create_chat_tab_doctor(notebook)
-        notebook.add(tab5, text="💬 Chat")
+        with batch_ui(self):
+            self.title("Doctor Dashboard")
+            self.geometry("1100x800")
+            self.configure(bg=COLORS.bg_main)
+            self.doctor_id = None
+            self.appointment_map = {}
+            self._appt_labels_current = []
+            # ((query, params, page), fetched_at, colnames, rows) of the last research query
+            self._last_query_result = None
+            # (query, params_text, params) being paged through, and its current page
+            self._query_current = None
+            self._query_page = 0
+            self._query_rows_view = None
+            self._query_summary = None
+            # Column names currently configured on the results tree
+            self._last_colnames = ()
+            # Incremented per run so late results from a superseded run are dropped
+            self._query_seq = 0
+        
+            # Header
+            header = tk.Frame(self, bg=COLORS.secondary, height=80)
+            header.pack(fill='x')
+            header.pack_propagate(False)
+        
+            title = tk.Label(header, text="👩‍⚕️ Doctor Dashboard", 
+                            font=('Segoe UI', 18, 'bold'),
+                            fg='white', bg=COLORS.secondary)
+            title.pack(expand=True)
+        
+            # Main content with notebook
+            notebook = ttk.Notebook(self)
+            notebook.pack(expand=True, fill="both", padx=20, pady=20)
+        
+            # Only the login tab is built up front; the rest on first selection
+            self._tabs = LazyNotebookTabs(notebook)
+        
+            # Tab 1: Login & Appointments
+            self._tabs.add(self.create_login_tab, "🔐 Login & Appointments", eager=True)
+        
+            # Tab 2: Medical Observations
+            self._obs_tab = self._tabs.add(self.create_observation_tab, "📋 Medical Records & Files")
+        
+            # Tab 3: File Management
+            self._tabs.add(self.create_file_management_tab, "📁 File Management")
+        
+            # Tab 4: Database Queries
+            self._tabs.add(self.create_query_tab, "🔍 Research Queries")
+
+            # Tab 5: Chat
+            self._chat_tab = self._tabs.add(self.create_chat_tab_doctor, "💬 Chat")
+
+            # Chat state
+            self._chat_d_patient_map = {}
+            self._chat_d_doctor_mongo_id = None
+            self._chat_d_patient_mongo_id = None
+            self._chat_d_conversation_id = None
+            self._chat_d_last_msg_id = None
+            self._chat_d_refresh_after = None
+            # conversation id -> messages rendered so far, so reopening a chat
+            # only fetches what arrived since
+            self._chat_d_history = {}
+
+            # File management paging state
+            self._files_offset = 0
+            self._files_has_more = False
+            self._files_loading = False
+            # Bumped on every reset; page callbacks from an older generation are dropped
+            self._files_gen = 0
+            self._file_rows_by_id = {}
+            # Last row of the previous page, bounding the next cache sync
+            self._files_last_row = None
+            # db.get_files_revision() as of the loaded first page
+            self._files_rev = None
+            # (bytes_written, total_bytes) of the running download, None when idle
+            self._download_state = None
         
         # Load doctors
         self.doctor_map = {}
+        self._doctors_by_id = {}
+        # (doctor_mongo_id, patient_mongo_id) -> conversation id
+        self._conv_id_cache = {}
         self.load_doctors()
     
     def create_login_tab(self, parent):
         tab = ttk.Frame(parent)
         
-        container = tk.Frame(tab, bg=COLORS['bg_main'])
+        container = tk.Frame(tab, bg=COLORS.bg_main)
         container.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Login Card
-        login_card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        login_card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         login_card.pack(fill='x', pady=(0, 20))
         
         login_title = tk.Label(login_card, text="🔐 Doctor Authentication",
-                              font=('Segoe UI', 14, 'bold'),
-                              fg=COLORS['text'], bg=COLORS['bg_card'])
+                              font=FONTS.heading,
+                              fg=COLORS.text, bg=COLORS.bg_card)
         login_title.pack(pady=(15, 10))
         
-        login_form = tk.Frame(login_card, bg=COLORS['bg_card'])
+        login_form = tk.Frame(login_card, bg=COLORS.bg_card)
         login_form.pack(padx=30, pady=(0, 20))
         
-        tk.Label(login_form, text="Select Your Profile:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=0, column=0, sticky='w', pady=8)
+        tk.Label(login_form, text="Select Your Profile:", font=FONTS.label,
+                fg=COLORS.text, bg=COLORS.bg_card).grid(row=0, column=0, sticky='w', pady=8)
         self.doctor_combo = ttk.Combobox(login_form, state="readonly", style='Modern.TCombobox',
-                                        font=('Segoe UI', 11), width=30)
+                                        font=FONTS.body, width=30)
         self.doctor_combo.grid(row=0, column=1, sticky='ew', pady=8, padx=(10, 0))
         
         login_btn = ttk.Button(login_form, text="🔓 Login", 
@@ -991,21 +1743,21 @@ class DoctorWindow(tk.Toplevel):
         login_form.grid_columnconfigure(1, weight=1)
         
         # Appointments Card
-        appt_card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        appt_card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         appt_card.pack(fill='both', expand=True)
         
         appt_title = tk.Label(appt_card, text="📅 Today's Appointments",
-                             font=('Segoe UI', 14, 'bold'),
-                             fg=COLORS['text'], bg=COLORS['bg_card'])
+                             font=FONTS.heading,
+                             fg=COLORS.text, bg=COLORS.bg_card)
         appt_title.pack(pady=(15, 10))
         
         # Listbox with scrollbar
-        list_frame = tk.Frame(appt_card, bg=COLORS['bg_card'])
+        list_frame = tk.Frame(appt_card, bg=COLORS.bg_card)
         list_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
         
-        self.appt_listbox = tk.Listbox(list_frame, height=12, font=('Segoe UI', 10),
-                                      bg=COLORS['light'], fg=COLORS['text'],
-                                      selectbackground=COLORS['primary'])
+        self.appt_listbox = tk.Listbox(list_frame, height=12, font=FONTS.text,
+                                      bg=COLORS.light, fg=COLORS.text,
+                                      selectbackground=COLORS.primary)
         scrollbar_appt = ttk.Scrollbar(list_frame, orient='vertical', command=self.appt_listbox.yview)
         self.appt_listbox.configure(yscrollcommand=scrollbar_appt.set)
         
@@ -1021,23 +1773,23 @@ class DoctorWindow(tk.Toplevel):
 
     def create_chat_tab_doctor(self, parent):
         tab = ttk.Frame(parent)
-        container = tk.Frame(tab, bg=COLORS['bg_main'])
+        container = tk.Frame(tab, bg=COLORS.bg_main)
         container.pack(fill='both', expand=True, padx=20, pady=20)
 
-        card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         card.pack(fill='both', expand=True)
 
-        title = tk.Label(card, text="💬 Doctor-Patient Chat", font=('Segoe UI', 14, 'bold'),
-                         fg=COLORS['text'], bg=COLORS['bg_card'])
+        title = tk.Label(card, text="💬 Doctor-Patient Chat", font=FONTS.heading,
+                         fg=COLORS.text, bg=COLORS.bg_card)
         title.pack(pady=(15, 10))
 
-        form = tk.Frame(card, bg=COLORS['bg_card'])
+        form = tk.Frame(card, bg=COLORS.bg_card)
         form.pack(fill='x', padx=20, pady=(0, 10))
 
-        tk.Label(form, text="Patient:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=0, column=0, sticky='w', pady=5)
+        tk.Label(form, text="Patient:", font=FONTS.label,
+                fg=COLORS.text, bg=COLORS.bg_card).grid(row=0, column=0, sticky='w', pady=5)
         self.chat_d_patient_combo = ttk.Combobox(form, state='readonly', style='Modern.TCombobox',
-                                                 font=('Segoe UI', 11), width=40)
+                                                 font=FONTS.body, width=40)
         self.chat_d_patient_combo.grid(row=0, column=1, sticky='ew', pady=5, padx=(10, 20))
 
         load_pat_btn = ttk.Button(form, text="👥 Load Patients", style='Modern.TButton',
@@ -1050,20 +1802,23 @@ class DoctorWindow(tk.Toplevel):
 
         form.grid_columnconfigure(1, weight=1)
 
-        msg_frame = tk.Frame(card, bg=COLORS['bg_card'])
+        msg_frame = tk.Frame(card, bg=COLORS.bg_card)
         msg_frame.pack(fill='both', expand=True, padx=20, pady=(0, 10))
 
-        self.chat_d_text = Text(msg_frame, height=16, width=80, font=('Segoe UI', 10),
-                                relief='flat', bg=COLORS['light'], fg=COLORS['text'])
+        self.chat_d_text = tk.Text(msg_frame, height=16, width=80, font=FONTS.text,
+                                   relief='flat', bg=COLORS.light, fg=COLORS.text)
         msg_scroll = ttk.Scrollbar(msg_frame, orient='vertical', command=self.chat_d_text.yview)
         self.chat_d_text.configure(yscrollcommand=msg_scroll.set)
+        # Image lines: underlined, double-click to download the attachment
+        self.chat_d_text.tag_configure('chat_image', foreground=COLORS.primary, underline=True)
+        self.chat_d_text.tag_bind('chat_image', '<Double-Button-1>', self.doctor_chat_save_image)
         self.chat_d_text.pack(side='left', fill='both', expand=True)
         msg_scroll.pack(side='right', fill='y')
 
-        composer = tk.Frame(card, bg=COLORS['bg_card'])
+        composer = tk.Frame(card, bg=COLORS.bg_card)
         composer.pack(fill='x', padx=20, pady=(0, 15))
 
-        self.chat_d_entry = ttk.Entry(composer, style='Modern.TEntry', font=('Segoe UI', 11))
+        self.chat_d_entry = ttk.Entry(composer, style='Modern.TEntry', font=FONTS.body)
         self.chat_d_entry.pack(side='left', fill='x', expand=True, padx=(0, 10))
 
         img_btn = ttk.Button(composer, text="🖼️ Image", style='Warning.TButton',
@@ -1078,40 +1833,43 @@ class DoctorWindow(tk.Toplevel):
                                  command=self.doctor_chat_refresh_messages)
         refresh_btn.pack(pady=(0, 12))
 
-        # State
-        self._chat_d_patient_map = {}
-        self._chat_d_doctor_mongo_id = None
-        self._chat_d_patient_mongo_id = None
-        self._chat_d_conversation_id = None
-
         return tab
 
     def doctor_chat_load_patients(self):
         if not self.doctor_id:
             messagebox.showerror("Authentication Required", "Login as a doctor first.")
             return
-        try:
-            # ensure doctor mongo user
-            docs = [d for d in db.get_doctors() if d[0] == self.doctor_id]
-            if docs:
-                _, dfn, dln = docs[0]
-                self._chat_d_doctor_mongo_id = ensure_mongo_user_for_doctor(self.doctor_id, dfn, dln)
-            # load distinct patients for this doctor
-            pts = db.get_patients_for_doctor(self.doctor_id)
-            labels = []
-            self._chat_d_patient_map = {}
-            for p in pts:
-                label = f"{p[1]} {p[2]} (ID: {p[0]})"
-                labels.append(label)
-                self._chat_d_patient_map[label] = p
-            self.chat_d_patient_combo['values'] = labels
-            if labels:
-                self.chat_d_patient_combo.current(0)
-                messagebox.showinfo("Loaded", f"Loaded {len(labels)} patient(s) for chat.")
-            else:
-                messagebox.showinfo("No Patients", "No patients with appointments.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load patients: {e}")
+        run_async(self, self._load_doctor_chat_patients, self._on_doctor_chat_patients_loaded,
+                  self.doctor_id, self._doctors_by_id.get(self.doctor_id))
+
+    @staticmethod
+    def _load_doctor_chat_patients(doctor_id, doctor_names):
+        # Runs on the I/O pool: ensure the doctor's mongo user, load the distinct
+        # patients for this doctor and upsert all their mongo users in one batch
+        doctor_mongo_id = ensure_mongo_user_for_doctor(doctor_id, *doctor_names) if doctor_names else None
+        pts = db.get_patients_for_doctor(doctor_id)
+        return doctor_mongo_id, pts, ensure_mongo_users_bulk("patient", pts)
+
+    def _on_doctor_chat_patients_loaded(self, result, error):
+        if error is not None:
+            messagebox.showerror("Error", f"Could not load patients: {error}")
+            return
+        doctor_mongo_id, pts, patient_mongo_ids = result
+        if doctor_mongo_id:
+            self._chat_d_doctor_mongo_id = doctor_mongo_id
+        labels = []
+        self._chat_d_patient_map = {}
+        for p in pts:
+            label = f"{p[1]} {p[2]} (ID: {p[0]})"
+            labels.append(label)
+            self._chat_d_patient_map[label] = (p, patient_mongo_ids.get(p[0]))
+        self._tabs.ensure_built(self._chat_tab)
+        self.chat_d_patient_combo['values'] = labels
+        if labels:
+            self.chat_d_patient_combo.current(0)
+            messagebox.showinfo("Loaded", f"Loaded {len(labels)} patient(s) for chat.")
+        else:
+            messagebox.showinfo("No Patients", "No patients with appointments.")
 
     def doctor_chat_open_chat(self):
         if not self.doctor_id:
@@ -1121,136 +1879,230 @@ class DoctorWindow(tk.Toplevel):
         if not selection:
             messagebox.showerror("Input Error", "Select a patient.")
             return
-        try:
-            p = self._chat_d_patient_map.get(selection)
-            if not p:
-                return
-            patient_id, pfn, pln = p[0], p[1], p[2]
-            self._chat_d_patient_mongo_id = ensure_mongo_user_for_patient(patient_id, pfn, pln)
-            # ensure doctor mongo user (if not already)
-            if not self._chat_d_doctor_mongo_id:
-                docs = [d for d in db.get_doctors() if d[0] == self.doctor_id]
-                if docs:
-                    _, dfn, dln = docs[0]
-                    self._chat_d_doctor_mongo_id = ensure_mongo_user_for_doctor(self.doctor_id, dfn, dln)
-            if not (self._chat_d_doctor_mongo_id and self._chat_d_patient_mongo_id):
-                messagebox.showerror("Error", "Could not initialize chat users.")
-                return
-            conv_id = messaging.get_or_create_conversation(self._chat_d_doctor_mongo_id, self._chat_d_patient_mongo_id)
-            self._chat_d_conversation_id = conv_id
-            self.doctor_chat_refresh_messages()
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not open chat: {e}")
+        entry = self._chat_d_patient_map.get(selection)
+        if not entry:
+            return
+        p, patient_mongo_id = entry
+        run_async(self, self._resolve_doctor_chat, self._on_doctor_chat_resolved,
+                  self.doctor_id, self._doctors_by_id.get(self.doctor_id),
+                  self._chat_d_doctor_mongo_id, p[:3], patient_mongo_id, self._conv_id_cache)
+
+    @staticmethod
+    def _resolve_doctor_chat(doctor_id, doctor_names, doctor_mongo_id, patient, patient_mongo_id,
+                             conv_id_cache):
+        # Runs on the I/O pool: mongo users for both sides (usually already batched
+        # by doctor_chat_load_patients), then the conversation
+        if not patient_mongo_id:
+            patient_mongo_id = ensure_mongo_user_for_patient(*patient)
+        # ensure doctor mongo user (if not already)
+        if not doctor_mongo_id and doctor_names:
+            doctor_mongo_id = ensure_mongo_user_for_doctor(doctor_id, *doctor_names)
+        if not (doctor_mongo_id and patient_mongo_id):
+            return doctor_mongo_id, patient_mongo_id, None
+        key = (doctor_mongo_id, patient_mongo_id)
+        conv_id = conv_id_cache.get(key)
+        if conv_id is None:
+            conv_id = require_messaging().get_or_create_conversation(*key)
+        return doctor_mongo_id, patient_mongo_id, conv_id
+
+    def _on_doctor_chat_resolved(self, result, error):
+        if error is not None:
+            messagebox.showerror("Error", f"Could not open chat: {error}")
+            return
+        doctor_mongo_id, patient_mongo_id, conv_id = result
+        self._chat_d_doctor_mongo_id = doctor_mongo_id or self._chat_d_doctor_mongo_id
+        self._chat_d_patient_mongo_id = patient_mongo_id
+        if not conv_id:
+            messagebox.showerror("Error", "Could not initialize chat users.")
+            return
+        self._conv_id_cache[(doctor_mongo_id, patient_mongo_id)] = conv_id
+        if conv_id != self._chat_d_conversation_id:
+            # New conversation: show what was already loaded for it, if anything;
+            # otherwise the next refresh does a full render
+            history = self._chat_d_history.get(conv_id)
+            self._chat_d_last_msg_id = history[-1]['_id'] if history else None
+            if history:
+                self._render_messages_to_text(self.chat_d_text, history, self._chat_d_doctor_mongo_id)
+        self._chat_d_conversation_id = conv_id
+        self.doctor_chat_refresh_messages()
 
     def doctor_chat_refresh_messages(self):
-        try:
-            if not self._chat_d_conversation_id:
-                return
-            msgs = messaging.get_conversation_messages(self._chat_d_conversation_id, limit=200)
-            self._render_messages_to_text(self.chat_d_text, msgs, self._chat_d_doctor_mongo_id)
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load messages: {e}")
-
-    def _render_messages_to_text(self, text_widget: Text, messages: list, self_user_id: str):
+        # Coalesce bursts of refresh requests (open, several sends) into one reload
+        if self._chat_d_refresh_after is not None:
+            self.after_cancel(self._chat_d_refresh_after)
+        self._chat_d_refresh_after = self.after(50, self._do_doctor_chat_refresh)
+
+    def _do_doctor_chat_refresh(self):
+        self._chat_d_refresh_after = None
+        conv_id = self._chat_d_conversation_id
+        if not conv_id:
+            return
+        # Only messages newer than the last rendered one are fetched and appended
+        last_id = self._chat_d_last_msg_id
+        run_async(self,
+                  lambda: require_messaging().get_messages_since(conv_id, last_id, limit=200,
+                                                                 include_images=False),
+                  lambda msgs, error: self._on_doctor_messages_loaded(conv_id, last_id, msgs, error))
+
+    def _on_doctor_messages_loaded(self, conv_id, last_id, msgs, error):
+        if error is not None:
+            messagebox.showerror("Error", f"Could not load messages: {error}")
+            return
+        if conv_id != self._chat_d_conversation_id or last_id != self._chat_d_last_msg_id:
+            return  # chat switched or another refresh already rendered these
+        if last_id is None:
+            self._chat_d_history[conv_id] = list(msgs)
+        elif not msgs:
+            return
+        else:
+            self._chat_d_history[conv_id].extend(msgs)
+        self._render_messages_to_text(self.chat_d_text, msgs, self._chat_d_doctor_mongo_id,
+                                      append=last_id is not None)
+        if msgs:
+            self._chat_d_last_msg_id = msgs[-1]['_id']
+
+    def _render_messages_to_text(self, text_widget: tk.Text, messages: list, self_user_id: str,
+                                 append: bool = False):
         text_widget.config(state='normal')
-        text_widget.delete('1.0', tk.END)
+        if not append:
+            text_widget.delete('1.0', tk.END)
+        # Everything goes in with one insert call: text runs alternate with their
+        # tag lists, and consecutive untagged lines are joined into one run
+        chunks = []
+        plain = []
         for m in messages:
             ts = m.get('timestamp', '')
             sender = 'You' if m.get('sender_id') == self_user_id else 'Them'
             if m.get('message_type') == 'image':
                 filename = m.get('image_filename', 'image')
                 size = m.get('image_size', 0)
-                text_widget.insert(tk.END, f"[{ts}] {sender}: [Image] {filename} ({size} bytes)\n")
+                if plain:
+                    chunks += ["".join(plain), ()]
+                    plain = []
+                # Image payloads are not loaded with the history; the tag lets a
+                # double-click fetch this one on demand
+                chunks += [f"[{ts}] {sender}: [Image] {filename} ({size} bytes)\n",
+                           ('chat_image', f"img:{m['_id']}")]
             else:
-                text_widget.insert(tk.END, f"[{ts}] {sender}: {m.get('message_text','')}\n")
+                plain.append(f"[{ts}] {sender}: {m.get('message_text','')}\n")
+        if plain:
+            chunks += ["".join(plain), ()]
+        if chunks:
+            text_widget.insert(tk.END, *chunks)
         text_widget.see(tk.END)
         text_widget.config(state='disabled')
 
-    def doctor_chat_send_text(self):
-        msg = self.chat_d_entry.get().strip()
-        if not msg:
+    def doctor_chat_save_image(self, event=None):
+        message_id = next((t[4:] for t in self.chat_d_text.tag_names('current') if t.startswith('img:')), None)
+        if message_id:
+            run_async(self, lambda: require_messaging().get_message_image(message_id),
+                      self._on_chat_image_fetched)
+
+    def _on_chat_image_fetched(self, image, error):
+        if error is not None:
+            messagebox.showerror("Error", f"Could not save image: {error}")
+            return
+        if not image:
+            messagebox.showerror("Error", "Image not found.")
             return
         try:
-            if not self._chat_d_conversation_id:
-                messagebox.showerror("Error", "Open a chat first.")
+            file_path = _get_filedialog().asksaveasfilename(title="Save Image", initialfile=image['image_filename'])
+            if not file_path:
                 return
-            messaging.send_message(self._chat_d_doctor_mongo_id, self._chat_d_conversation_id, message_text=msg)
-            self.chat_d_entry.delete(0, tk.END)
-            self.doctor_chat_refresh_messages()
+            with open(file_path, 'wb') as f:
+                f.write(image['image_data'])
         except Exception as e:
-            messagebox.showerror("Error", f"Could not send message: {e}")
+            messagebox.showerror("Error", f"Could not save image: {e}")
+
+    def doctor_chat_send_text(self):
+        msg = self.chat_d_entry.get().strip()
+        if not msg:
+            return
+        if not self._chat_d_conversation_id:
+            messagebox.showerror("Error", "Open a chat first.")
+            return
+        sender_id, conv_id = self._chat_d_doctor_mongo_id, self._chat_d_conversation_id
+        run_async(self, lambda: require_messaging().send_message(sender_id, conv_id, message_text=msg),
+                  self._on_doctor_message_sent)
+
+    def _on_doctor_message_sent(self, message_id, error):
+        if error is not None or not message_id:
+            messagebox.showerror("Error", f"Could not send message: {error or 'send failed'}")
+            return
+        self.chat_d_entry.delete(0, tk.END)
+        self.doctor_chat_refresh_messages()
 
     def doctor_chat_send_image(self):
         try:
             if not self._chat_d_conversation_id:
                 messagebox.showerror("Error", "Open a chat first.")
                 return
-            filetypes = [("Images", "*.png *.jpg *.jpeg *.bmp *.gif *.tiff *.webp")]
-            file_path = filedialog.askopenfilename(title="Select Image", filetypes=filetypes)
+            file_path = _get_filedialog().askopenfilename(title="Select Image", filetypes=IMAGE_FILETYPES)
             if not file_path:
                 return
-            with open(file_path, 'rb') as f:
-                data = f.read()
-            basename = os.path.basename(file_path)
-            messaging.send_message(self._chat_d_doctor_mongo_id, self._chat_d_conversation_id,
-                                   message_text="", image_data=data, image_filename=basename)
-            self.doctor_chat_refresh_messages()
+            sender_id, conv_id = self._chat_d_doctor_mongo_id, self._chat_d_conversation_id
+            # Stream the file into GridFS on the I/O pool
+            run_async(self, lambda: require_messaging().send_image_file(sender_id, conv_id, file_path),
+                      self._on_doctor_image_sent)
         except Exception as e:
             messagebox.showerror("Error", f"Could not send image: {e}")
+
+    def _on_doctor_image_sent(self, message_id, error):
+        if error is not None or not message_id:
+            messagebox.showerror("Error", f"Could not send image: {error or 'upload failed'}")
+            return
+        self.doctor_chat_refresh_messages()
     
     def create_observation_tab(self, parent):
         tab = ttk.Frame(parent)
         
-        container = tk.Frame(tab, bg=COLORS['bg_main'])
+        container = tk.Frame(tab, bg=COLORS.bg_main)
         container.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Appointment Selection Card
-        select_card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        select_card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         select_card.pack(fill='x', pady=(0, 20))
         
         select_title = tk.Label(select_card, text="📋 Select Patient Appointment",
-                               font=('Segoe UI', 14, 'bold'),
-                               fg=COLORS['text'], bg=COLORS['bg_card'])
+                               font=FONTS.heading,
+                               fg=COLORS.text, bg=COLORS.bg_card)
         select_title.pack(pady=(15, 10))
         
-        select_form = tk.Frame(select_card, bg=COLORS['bg_card'])
+        select_form = tk.Frame(select_card, bg=COLORS.bg_card)
         select_form.pack(padx=30, pady=(0, 20))
         
-        tk.Label(select_form, text="Appointment:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=0, column=0, sticky='w', pady=5)
+        tk.Label(select_form, text="Appointment:", font=FONTS.label,
+                fg=COLORS.text, bg=COLORS.bg_card).grid(row=0, column=0, sticky='w', pady=5)
         self.appt_combo = ttk.Combobox(select_form, state="readonly", style='Modern.TCombobox',
-                                      font=('Segoe UI', 11), width=50)
+                                      font=FONTS.body, width=50)
         self.appt_combo.grid(row=0, column=1, sticky='ew', pady=5, padx=(10, 0))
         
         select_form.grid_columnconfigure(1, weight=1)
         
         # Medical Observation Card
-        obs_card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        obs_card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         obs_card.pack(fill='both', expand=True)
         
         obs_title = tk.Label(obs_card, text="🩺 Medical Observation & File Upload",
-                            font=('Segoe UI', 14, 'bold'),
-                            fg=COLORS['text'], bg=COLORS['bg_card'])
+                            font=FONTS.heading,
+                            fg=COLORS.text, bg=COLORS.bg_card)
         obs_title.pack(pady=(15, 10))
         
-        obs_form = tk.Frame(obs_card, bg=COLORS['bg_card'])
+        obs_form = tk.Frame(obs_card, bg=COLORS.bg_card)
         obs_form.pack(fill='both', expand=True, padx=30, pady=(0, 20))
         
         # Observation Type
-        tk.Label(obs_form, text="Observation Type:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=0, column=0, sticky='w', pady=8)
-        self.obs_type_entry = ttk.Entry(obs_form, style='Modern.TEntry', font=('Segoe UI', 11), width=30)
-        self.obs_type_entry.grid(row=0, column=1, sticky='ew', pady=8, padx=(10, 0))
+        self.obs_type_entry = _labeled_entry(obs_form, 0, "Observation Type:", width=30)
         
         # Description
-        tk.Label(obs_form, text="Description:", font=('Segoe UI', 11, 'bold'),
-                fg=COLORS['text'], bg=COLORS['bg_card']).grid(row=1, column=0, sticky='nw', pady=8)
+        tk.Label(obs_form, text="Description:", font=FONTS.label,
+                fg=COLORS.text, bg=COLORS.bg_card).grid(row=1, column=0, sticky='nw', pady=8)
         
-        text_frame = tk.Frame(obs_form, bg=COLORS['bg_card'])
+        text_frame = tk.Frame(obs_form, bg=COLORS.bg_card)
         text_frame.grid(row=1, column=1, sticky='ew', pady=8, padx=(10, 0))
         
-        self.obs_text = Text(text_frame, height=8, width=60, font=('Segoe UI', 10),
-                            relief='flat', bg=COLORS['light'], fg=COLORS['text'])
+        self.obs_text = tk.Text(text_frame, height=8, width=60, font=FONTS.text,
+                               relief='flat', bg=COLORS.light, fg=COLORS.text)
         scrollbar_obs = ttk.Scrollbar(text_frame, orient='vertical', command=self.obs_text.yview)
         self.obs_text.configure(yscrollcommand=scrollbar_obs.set)
         
@@ -1258,7 +2110,7 @@ class DoctorWindow(tk.Toplevel):
         scrollbar_obs.pack(side='right', fill='y')
         
         # Buttons
-        btn_frame = tk.Frame(obs_form, bg=COLORS['bg_card'])
+        btn_frame = tk.Frame(obs_form, bg=COLORS.bg_card)
         btn_frame.grid(row=2, column=1, sticky='ew', pady=15, padx=(10, 0))
         
         upload_btn = ttk.Button(btn_frame, text="📁 Upload File", 
@@ -1278,20 +2130,20 @@ class DoctorWindow(tk.Toplevel):
     def create_file_management_tab(self, parent):
         tab = ttk.Frame(parent)
         
-        container = tk.Frame(tab, bg=COLORS['bg_main'])
+        container = tk.Frame(tab, bg=COLORS.bg_main)
         container.pack(fill='both', expand=True, padx=20, pady=20)
         
         # File List Card
-        file_card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        file_card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         file_card.pack(fill='both', expand=True)
         
         file_title = tk.Label(file_card, text="📁 Uploaded Files Management",
-                             font=('Segoe UI', 14, 'bold'),
-                             fg=COLORS['text'], bg=COLORS['bg_card'])
+                             font=FONTS.heading,
+                             fg=COLORS.text, bg=COLORS.bg_card)
         file_title.pack(pady=(15, 10))
         
         # File list with scrollbar
-        list_frame = tk.Frame(file_card, bg=COLORS['bg_card'])
+        list_frame = tk.Frame(file_card, bg=COLORS.bg_card)
         list_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
         
         # Create treeview for file list
@@ -1317,7 +2169,8 @@ class DoctorWindow(tk.Toplevel):
         # Add scrollbars
         v_scrollbar_files = ttk.Scrollbar(list_frame, orient='vertical', command=self.file_tree.yview)
         h_scrollbar_files = ttk.Scrollbar(list_frame, orient='horizontal', command=self.file_tree.xview)
-        self.file_tree.configure(yscrollcommand=v_scrollbar_files.set, xscrollcommand=h_scrollbar_files.set)
+        self.file_tree.configure(yscrollcommand=lambda first, last: self._on_file_tree_scroll(v_scrollbar_files, first, last),
+                                 xscrollcommand=h_scrollbar_files.set)
         
         self.file_tree.grid(row=0, column=0, sticky='nsew')
         v_scrollbar_files.grid(row=0, column=1, sticky='ns')
@@ -1327,47 +2180,50 @@ class DoctorWindow(tk.Toplevel):
         list_frame.grid_columnconfigure(0, weight=1)
         
         # Button frame
-        btn_frame = tk.Frame(file_card, bg=COLORS['bg_card'])
+        btn_frame = tk.Frame(file_card, bg=COLORS.bg_card)
         btn_frame.pack(pady=(0, 15))
         
         refresh_files_btn = ttk.Button(btn_frame, text="🔄 Refresh Files", 
                                      style='Modern.TButton',
-                                     command=self.load_uploaded_files)
+                                     command=self.refresh_uploaded_files)
         refresh_files_btn.pack(side='left', padx=(0, 10))
         
-        download_btn = ttk.Button(btn_frame, text="⬇️ Download Selected", 
+        self.download_btn = ttk.Button(btn_frame, text="⬇️ Download Selected", 
                                 style='Success.TButton',
                                 command=self.download_selected_file)
-        download_btn.pack(side='left', padx=(0, 10))
+        self.download_btn.pack(side='left', padx=(0, 10))
         
         delete_btn = ttk.Button(btn_frame, text="🗑️ Delete Selected", 
                               style='Warning.TButton',
                               command=self.delete_selected_file)
         delete_btn.pack(side='left')
         
+        # Shown only while a download is being written to disk
+        self.download_progress = ttk.Progressbar(file_card, mode='determinate', length=300)
+        
         return tab
     
     def create_query_tab(self, parent):
         tab = ttk.Frame(parent)
         
-        container = tk.Frame(tab, bg=COLORS['bg_main'])
+        container = tk.Frame(tab, bg=COLORS.bg_main)
         container.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Query Input Card
-        query_card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        query_card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         query_card.pack(fill='x', pady=(0, 20))
         
         query_title = tk.Label(query_card, text="🔍 Database Research Query (Cypher MATCH/RETURN only)",
-                              font=('Segoe UI', 14, 'bold'),
-                              fg=COLORS['text'], bg=COLORS['bg_card'])
+                              font=FONTS.heading,
+                              fg=COLORS.text, bg=COLORS.bg_card)
         query_title.pack(pady=(15, 10))
         
         # Query text area
-        query_text_frame = tk.Frame(query_card, bg=COLORS['bg_card'])
+        query_text_frame = tk.Frame(query_card, bg=COLORS.bg_card)
         query_text_frame.pack(fill='x', padx=20, pady=(0, 15))
         
-        self.query_text = Text(query_text_frame, height=6, width=100, font=('Consolas', 10),
-                              relief='flat', bg=COLORS['light'], fg=COLORS['text'])
+        self.query_text = tk.Text(query_text_frame, height=6, width=100, font=('Consolas', 10),
+                                 relief='flat', bg=COLORS.light, fg=COLORS.text)
         scrollbar_query = ttk.Scrollbar(query_text_frame, orient='vertical', command=self.query_text.yview)
         self.query_text.configure(yscrollcommand=scrollbar_query.set)
         
@@ -1382,29 +2238,77 @@ class DoctorWindow(tk.Toplevel):
         )
         self.query_text.insert("1.0", sample_query)
         
-        run_btn = ttk.Button(query_card, text="▶️ Execute Query", 
+        # Values for $placeholders, sent as bound parameters so Neo4j reuses the plan
+        params_frame = tk.Frame(query_card, bg=COLORS.bg_card)
+        params_frame.pack(fill='x', padx=20, pady=(0, 10))
+        self.query_params_entry = _labeled_entry(params_frame, 0, "Parameters (JSON):", width=60, pady=0)
+        
+        self.query_run_btn = ttk.Button(query_card, text="▶️ Execute Query", 
                             style='Modern.TButton',
                             command=self.run_query)
-        run_btn.pack(pady=(0, 15))
+        self.query_run_btn.pack(pady=(0, 15))
         
         # Results Card
-        results_card = tk.Frame(container, bg=COLORS['bg_card'], relief='solid', bd=1)
+        results_card = tk.Frame(container, bg=COLORS.bg_card, relief='solid', bd=1)
         results_card.pack(fill='both', expand=True)
         
         results_title = tk.Label(results_card, text="📊 Query Results",
-                                font=('Segoe UI', 14, 'bold'),
-                                fg=COLORS['text'], bg=COLORS['bg_card'])
+                                font=FONTS.heading,
+                                fg=COLORS.text, bg=COLORS.bg_card)
         results_title.pack(pady=(15, 10))
         
-        self.query_result_frame = tk.Frame(results_card, bg=COLORS['bg_card'])
+        # Pager for queries without their own LIMIT (MAX_ROWS rows per page)
+        pager = tk.Frame(results_card, bg=COLORS.bg_card)
+        pager.pack(side='bottom', pady=(0, 15))
+        self.query_prev_btn = ttk.Button(pager, text="◀ Prev", style='Modern.TButton',
+                                         command=lambda: self._run_query_page(self._query_page - 1))
+        self.query_prev_btn.pack(side='left', padx=(0, 10))
+        self.query_page_label = tk.Label(pager, text="", font=FONTS.text,
+                                         fg=COLORS.text, bg=COLORS.bg_card)
+        self.query_page_label.pack(side='left')
+        self.query_next_btn = ttk.Button(pager, text="Next ▶", style='Modern.TButton',
+                                         command=lambda: self._run_query_page(self._query_page + 1))
+        self.query_next_btn.pack(side='left', padx=(10, 0))
+        self.query_prev_btn.state(['disabled'])
+        self.query_next_btn.state(['disabled'])
+        
+        self.query_result_frame = tk.Frame(results_card, bg=COLORS.bg_card)
         self.query_result_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
         
+        # Result widgets are built once; each query only reconfigures them
+        tree_frame = tk.Frame(self.query_result_frame, bg=COLORS.bg_card)
+        tree_frame.pack(fill='both', expand=True)
+        
+        self.query_tree = ttk.Treeview(tree_frame, columns=(), show="headings", height=15)
+        
+        # Add scrollbars; the vertical one scrolls the virtual row window
+        v_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical')
+        h_scrollbar = ttk.Scrollbar(tree_frame, orient='horizontal', command=self.query_tree.xview)
+        self.query_tree.configure(xscrollcommand=h_scrollbar.set)
+        
+        # Only the rows in view are inserted into the tree
+        self._query_rows_view = VirtualTreeRows(self.query_tree, v_scrollbar, [])
+        
+        self.query_tree.grid(row=0, column=0, sticky='nsew')
+        v_scrollbar.grid(row=0, column=1, sticky='ns')
+        h_scrollbar.grid(row=1, column=0, sticky='ew')
+        
+        tree_frame.grid_rowconfigure(0, weight=1)
+        tree_frame.grid_columnconfigure(0, weight=1)
+        
+        self._query_summary = tk.Label(self.query_result_frame, text="",
+                                       font=FONTS.text, fg=COLORS.success, bg=COLORS.bg_card)
+        self._query_summary.pack(pady=(10, 0))
+        
         return tab
     
     def load_doctors(self):
         try:
             rows = db.get_doctors()
             labels = []
+            self.doctor_map = {}
+            # id -> (first_name, last_name), so later lookups need no query
+            self._doctors_by_id = {r[0]: (r[1], r[2]) for r in rows}
             for r in rows:
                 label = f"Dr. {r[1]} {r[2]} (ID: {r[0]})"
                 labels.append(label)
@@ -1414,53 +2318,52 @@ class DoctorWindow(tk.Toplevel):
                 self.doctor_combo.current(0)
         except Exception as e:
             messagebox.showerror("Database Error", f"Could not load doctors:\n{e}")
-    
+
     def login_doctor(self):
         label = self.doctor_combo.get()
         if not label:
             messagebox.showerror("Input Error", "Please choose a doctor from the dropdown.")
             return
         self.doctor_id = self.doctor_map.get(label)
-        # Ensure Mongo user for this doctor
-        try:
-            docs = [d for d in db.get_doctors() if d[0] == self.doctor_id]
-            if docs:
-                _, dfn, dln = docs[0]
-                self._chat_d_doctor_mongo_id = ensure_mongo_user_for_doctor(self.doctor_id, dfn, dln)
-        except Exception:
-            pass
         self.load_doctor_appointments()
-        # Auto-load patients for chat after login
-        try:
-            self.doctor_chat_load_patients()
-        except Exception:
-            pass
+        # Auto-load patients for chat after login (also ensures the doctor's mongo user)
+        self.doctor_chat_load_patients()
         messagebox.showinfo("Login Successful", f"✅ Successfully logged in as {label}")
     
     def load_doctor_appointments(self):
         if not self.doctor_id:
             messagebox.showerror("Authentication Required", "Please select and login as a doctor first.")
             return
-        try:
-            rows = db.get_appointments_for_doctor(self.doctor_id)
-            
-            self.appt_listbox.delete(0, tk.END)
-            appt_labels = []
-            self.appointment_map = {}
-            
-            for r in rows:
-                label = f"📅 {r[1]} - {r[2]} {r[3]} (ID: {r[0]})"
-                appt_labels.append(label)
-                self.appointment_map[label] = r[0]
-                self.appt_listbox.insert(tk.END, label)
-            
-            # Update appointment combobox for observation tab
-            self.appt_combo["values"] = appt_labels
-            if appt_labels:
-                self.appt_combo.current(0)
-                
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Could not load appointments:\n{e}")
+        doctor_id = self.doctor_id
+        run_async(self, db.get_appointments_for_doctor,
+                  lambda rows, error: self._on_doctor_appointments_loaded(doctor_id, rows, error),
+                  doctor_id)
+
+    def _on_doctor_appointments_loaded(self, doctor_id, rows, error):
+        if error is not None:
+            messagebox.showerror("Database Error", f"Could not load appointments:\n{error}")
+            return
+        if doctor_id != self.doctor_id:
+            return  # logged in as someone else meanwhile
+        appt_labels = []
+        self.appointment_map = {}
+
+        for r in rows:
+            label = f"📅 {r[1]} - {r[2]} {r[3]} (ID: {r[0]})"
+            appt_labels.append(label)
+            self.appointment_map[label] = r[0]
+        if appt_labels == self._appt_labels_current:
+            return  # unchanged schedule: leave the widgets alone
+        _sync_listbox(self.appt_listbox, self._appt_labels_current, appt_labels)
+        self._appt_labels_current = appt_labels
+
+        # Update appointment combobox for observation tab
+        self._tabs.ensure_built(self._obs_tab)
+        self.appt_combo["values"] = appt_labels
+        if appt_labels and self.appt_combo.get() not in self.appointment_map:
+            self.appt_combo.current(0)
+        elif not appt_labels:
+            self.appt_combo.set("")
     
     def upload_file(self):
         """
@@ -1480,69 +2383,63 @@ class DoctorWindow(tk.Toplevel):
             messagebox.showerror("Authentication Required", "Please login as a doctor first.")
             return
         
-        # Define file type categories for the file dialog
-        file_types = [
-            ("All Files", "*.*"),                                    # Allow any file type
-            ("Images", "*.png *.jpg *.jpeg *.bmp *.gif *.tiff *.webp"),  # Common image formats
-            ("Documents", "*.pdf *.doc *.docx *.txt *.rtf *.odt"),  # Document formats
-            ("Medical Files", "*.dcm *.dicom *.nii *.nii.gz"),      # Medical imaging formats
-            ("Data Files", "*.csv *.xlsx *.xls *.json *.xml"),      # Data and spreadsheet formats
-            ("Archives", "*.zip *.rar *.7z *.tar *.gz"),            # Compressed files
-            ("Videos", "*.mp4 *.avi *.mov *.mkv *.wmv"),            # Video formats
-            ("Audio", "*.mp3 *.wav *.flac *.aac *.ogg")             # Audio formats
-        ]
-        
         # Open file selection dialog
-        file_path = filedialog.askopenfilename(
+        file_path = _get_filedialog().askopenfilename(
             title="Select File to Upload",
-            filetypes=file_types
+            filetypes=UPLOAD_FILETYPES
         )
         
         # If user cancels file selection, return without action
         if not file_path:
             return
         
-        try:
-            # Extract file information
-            basename = os.path.basename(file_path)                    # Get filename only
-            file_extension = os.path.splitext(basename)[1].lower()    # Get file extension
-            
-            # Store file directly in database
-            file_id = db.store_file(file_path)
-            
-            if file_id:
-                # Store file_id for later use when saving observation
-                self.uploaded_file_id = file_id
-                
-                # Determine file type for display purposes
-                file_type = self._get_file_type(file_extension)
-                
-                # Populate observation form with file information
-                self.obs_type_entry.delete(0, tk.END)
-                self.obs_type_entry.insert(0, f"File Upload - {file_type}")
-                
-                # Clear and populate observation text area with file details
-                self.obs_text.delete("1.0", tk.END)
-                file_info = f"File uploaded to database: {basename}\n"
-                file_info += f"File ID: {file_id}\n"
-                file_info += f"File type: {file_type}\n"
-                file_info += f"File size: {self._get_file_size(file_path)}\n"
-                file_info += f"Upload time: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-                file_info += f"Original path: {file_path}\n"
-                file_info += f"Status: Stored in database (no local copy)"
-                
-                self.obs_text.insert("1.0", file_info)
-                
-                # Show success message with file details
-                messagebox.showinfo("File Upload Successful", 
-                                   f"✅ File uploaded to database successfully!\n\nFile: {basename}\nFile ID: {file_id}\nType: {file_type}\nSize: {self._get_file_size(file_path)}\nStatus: Stored in database")
-            else:
-                messagebox.showerror("Upload Error", "Failed to store file in database.")
-                
-        except Exception as e:
+        # Store file directly in database; hashing and copying a large file
+        # happens on the I/O pool so the UI stays responsive
+        run_async(self, db.store_file,
+                  lambda file_id, error: self._on_file_uploaded(file_path, file_id, error),
+                  file_path)
+
+    def _on_file_uploaded(self, file_path, file_id, error):
+        if error is not None:
             # Handle any errors during file upload
-            messagebox.showerror("File Error", f"Could not upload file:\n{e}")
-    
+            messagebox.showerror("File Error", f"Could not upload file:\n{error}")
+            return
+        if not file_id:
+            messagebox.showerror("Upload Error", "Failed to store file in database.")
+            return
+
+        # Extract file information
+        basename = os.path.basename(file_path)                    # Get filename only
+        file_extension = os.path.splitext(basename)[1].lower()    # Get file extension
+
+        # Store file_id for later use when saving observation
+        self.uploaded_file_id = file_id
+
+        # Determine file type and size for display purposes
+        file_type = self._get_file_type(file_extension)
+        size_str = self._get_file_size(file_path)
+
+        # Populate observation form with file information
+        self._tabs.ensure_built(self._obs_tab)
+        self.obs_type_entry.delete(0, tk.END)
+        self.obs_type_entry.insert(0, f"File Upload - {file_type}")
+
+        # Clear and populate observation text area with file details
+        self.obs_text.delete("1.0", tk.END)
+        file_info = f"File uploaded to database: {basename}\n"
+        file_info += f"File ID: {file_id}\n"
+        file_info += f"File type: {file_type}\n"
+        file_info += f"File size: {size_str}\n"
+        file_info += f"Upload time: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        file_info += f"Original path: {file_path}\n"
+        file_info += f"Status: Stored in database (no local copy)"
+
+        self.obs_text.insert("1.0", file_info)
+
+        # Show success message with file details
+        messagebox.showinfo("File Upload Successful",
+                           f"✅ File uploaded to database successfully!\n\nFile: {basename}\nFile ID: {file_id}\nType: {file_type}\nSize: {size_str}\nStatus: Stored in database")
+
     def _get_file_type(self, extension):
         """
         Determine human-readable file type based on file extension.
@@ -1553,26 +2450,8 @@ class DoctorWindow(tk.Toplevel):
         Returns:
             str: Human-readable file type description
         """
-        file_types = {
-            # Image file types
-            '.png': 'Image (PNG)',
-            '.jpg': 'Image (JPEG)',
-            '.jpeg': 'Image (JPEG)',
-            '.bmp': 'Image (BMP)',
-            '.gif': 'Image (GIF)',
-            '.tiff': 'Image (TIFF)',
-            '.webp': 'Image (WebP)',
-            
-            # Document file types
-            '.pdf': 'Document (PDF)',
-            '.doc': 'Document (Word)',
-            '.docx': 'Document (Word)',
-            '.txt': 'Text File',
-            '.rtf': 'Rich Text',
-            '.odt': 'OpenDocument Text',
-        }
         # Return specific type if found, otherwise generic file type
-        return file_types.get(extension, f'File ({extension.upper()})')
+        return _FILE_TYPE_MAP.get(extension, f'File ({extension.upper()})')
     
     def _get_file_size(self, file_path):
         """
@@ -1585,18 +2464,8 @@ class DoctorWindow(tk.Toplevel):
             str: Human-readable file size (e.g., "1.5 MB", "256 KB")
         """
         try:
-            # Get file size in bytes
-            size = os.path.getsize(file_path)
-            
-            # Convert to appropriate unit
-            for unit in ['B', 'KB', 'MB', 'GB']:
-                if size < 1024.0:
-                    return f"{size:.1f} {unit}"
-                size /= 1024.0
-            
-            # For very large files (TB)
-            return f"{size:.1f} TB"
-        except:
+            return format_size(os.path.getsize(file_path))
+        except OSError:
             # Return unknown size if file access fails
             return "Unknown size"
     
@@ -1635,101 +2504,230 @@ class DoctorWindow(tk.Toplevel):
             messagebox.showerror("Database Error", f"Could not save observation:\n{e}")
     
     def run_query(self):
-        q = self.query_text.get("1.0", tk.END).strip()
+        q = self.query_text.get("1.0", tk.END).strip().rstrip(";").rstrip()
         if not q:
             messagebox.showerror("Input Error", "Please enter a SELECT query to execute.")
             return
+        params_text = self.query_params_entry.get().strip()
         try:
-            colnames, rows = safe_select(q)
-            
-            # Clear previous results
-            for child in self.query_result_frame.winfo_children():
-                child.destroy()
-            
-            if not colnames:
-                tk.Label(self.query_result_frame, text="Query executed but returned no columns.",
-                        font=('Segoe UI', 11), fg=COLORS['text'], bg=COLORS['bg_card']).pack(pady=20)
-                return
-            
-            # Create treeview for results
-            tree_frame = tk.Frame(self.query_result_frame, bg=COLORS['bg_card'])
-            tree_frame.pack(fill='both', expand=True)
-            
-            tree = ttk.Treeview(tree_frame, columns=colnames, show="headings", height=15)
-            
-            # Configure column headings and widths
-            for c in colnames:
-                tree.heading(c, text=c)
-                tree.column(c, width=150, anchor="w")
-            
-            # Insert data
-            for r in rows:
-                tree.insert("", tk.END, values=r)
+            params = json.loads(params_text) if params_text else {}
+        except ValueError as e:
+            messagebox.showerror("Input Error", f"Parameters must be a JSON object:\n{e}")
+            return
+        if not isinstance(params, dict):
+            messagebox.showerror("Input Error", "Parameters must be a JSON object, e.g. {\"date\": \"2024-01-15\"}.")
+            return
+        self._query_current = (q, params_text, params)
+        self._run_query_page(0)
+
+    def _run_query_page(self, page):
+        if self._query_current is None or page < 0:
+            return
+        q, params_text, params = self._query_current
+        key = (q, params_text, page)
+        cached = self._last_query_result
+        if cached and cached[0] == key and time.monotonic() - cached[1] < QUERY_CACHE_SECONDS:
+            self._show_query_page(q, page, cached[2], cached[3])
+            return
+        # Run on the I/O pool; the button stays disabled until the page arrives
+        self._query_seq += 1
+        seq = self._query_seq
+        self._set_query_busy(True)
+        run_async(self, self._fetch_query_page,
+                  lambda result, error: self._on_query_page_loaded(seq, key, page, result, error),
+                  q, params, page)
+
+    @staticmethod
+    def _fetch_query_page(q, params, page):
+        colnames, rows = safe_select(q, params, page=page)
+        # Stringify once; re-showing a cached page is then pure Tcl inserts
+        return colnames, [tuple(map(str, r)) for r in rows]
+
+    def _on_query_page_loaded(self, seq, key, page, result, error):
+        if seq != self._query_seq:
+            return  # superseded by a newer run
+        self._set_query_busy(False)
+        if error is not None:
+            self.query_page_label.config(text="")
+            messagebox.showerror("Query Error", f"Error executing query:\n{error}")
+            return
+        colnames, rows = result
+        self._last_query_result = (key, time.monotonic(), colnames, rows)
+        self._show_query_page(key[0], page, colnames, rows)
+
+    def _set_query_busy(self, busy):
+        self.query_run_btn.state(['disabled'] if busy else ['!disabled'])
+        if busy:
+            self.query_prev_btn.state(['disabled'])
+            self.query_next_btn.state(['disabled'])
+            self.query_page_label.config(text="⏳ Running query...")
+
+    def _show_query_page(self, q, page, colnames, rows):
+        try:
+            self._query_page = page
             
-            # Add scrollbars
-            v_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=tree.yview)
-            h_scrollbar = ttk.Scrollbar(tree_frame, orient='horizontal', command=tree.xview)
-            tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+            paged = _is_paged(_parameterize_cypher(_normalize_cypher(q))[0])
+            self.query_prev_btn.state(['!disabled'] if paged and page > 0 else ['disabled'])
+            self.query_next_btn.state(['!disabled'] if paged and len(rows) == MAX_ROWS else ['disabled'])
+            self.query_page_label.config(text=f"Page {page + 1}" if paged else "")
             
-            tree.grid(row=0, column=0, sticky='nsew')
-            v_scrollbar.grid(row=0, column=1, sticky='ns')
-            h_scrollbar.grid(row=1, column=0, sticky='ew')
+            # Results summary
+            if paged:
+                first = page * MAX_ROWS
+                summary_text = (f"📊 Showing rows {first + 1}–{first + len(rows)} "
+                                f"with {len(colnames)} columns")
+            else:
+                summary_text = f"📊 Query returned {len(rows)} rows with {len(colnames)} columns"
             
-            tree_frame.grid_rowconfigure(0, weight=1)
-            tree_frame.grid_columnconfigure(0, weight=1)
+            if colnames != self._last_colnames:
+                # New column set: reconfigure the existing tree in place
+                self._query_rows_view.set_rows([])
+                self.query_tree.configure(columns=colnames)
+                for c in colnames:
+                    self.query_tree.heading(c, text=c)
+                    self.query_tree.column(c, width=150, anchor="w")
+                self._last_colnames = colnames
+            self._query_rows_view.set_rows(rows)
             
-            # Results summary
-            summary = tk.Label(self.query_result_frame, 
-                              text=f"📊 Query returned {len(rows)} rows with {len(colnames)} columns",
-                              font=('Segoe UI', 10), fg=COLORS['success'], bg=COLORS['bg_card'])
-            summary.pack(pady=(10, 0))
+            if not colnames:
+                self._query_summary.config(text="Query executed but returned no columns.", fg=COLORS.text)
+            else:
+                self._query_summary.config(text=summary_text, fg=COLORS.success)
             
         except Exception as e:
             messagebox.showerror("Query Error", f"Error executing query:\n{e}")
     
+    def refresh_uploaded_files(self):
+        """Reload the file list unless no file was uploaded or deleted since it was loaded."""
+        if self._files_rev is None:
+            self.load_uploaded_files()
+            return
+        run_async(self, db.get_files_revision, self._on_files_revision_checked)
+
+    def _on_files_revision_checked(self, rev, error):
+        if error is None and rev == self._files_rev:
+            messagebox.showinfo("Files Loaded", "The file list is already up to date.")
+            return
+        self.load_uploaded_files()
+
     def load_uploaded_files(self):
-        """Load and display all uploaded files in the file management tab."""
-        try:
-            # Clear existing items
-            for item in self.file_tree.get_children():
-                self.file_tree.delete(item)
-            
-            files = db.list_files()
-            
-            for file_data in files:
-                file_id, filename, file_type, file_size, upload_date, observation_id = file_data
-                size_str = self._format_file_size(file_size)
-                date_str = upload_date if upload_date else 'Unknown'
-                self.file_tree.insert('', 'end', values=(
-                    file_id,
-                    filename,
-                    file_type,
-                    size_str,
-                    date_str,
-                    observation_id if observation_id else 'Not linked'
-                ))
-            
-            messagebox.showinfo("Files Loaded", f"Loaded {len(files)} files from database.")
-            
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Could not load files:\n{e}")
+        """Reload the file list from the first page; later pages load on scroll."""
+        self.file_tree.delete(*self.file_tree.get_children())
+        self._file_rows_by_id = {}
+        self._files_offset = 0
+        self._files_has_more = False
+        self._files_last_row = None
+        self._files_rev = None
+        # Any page still in flight belongs to the old list; always fetch anew
+        self._files_gen += 1
+        self._files_loading = False
+        # Paint the cached first page at once; the Neo4j page replaces it on arrival
+        cache = get_file_cache()
+        if cache is not None:
+            self._append_file_rows(cache.list_all(limit=FILE_PAGE_SIZE))
+        self._load_next_files_page(announce=True)
+
+    def _on_file_tree_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        # Fetch the next page once the view nears the bottom of what is loaded
+        if float(last) > 0.9 and self._files_has_more:
+            self._load_next_files_page()
+
+    def _load_next_files_page(self, announce=False):
+        if self._files_loading:
+            return
+        self._files_loading = True
+        gen, offset = self._files_gen, self._files_offset
+        run_async(self, self._fetch_files_page,
+                  lambda result, error: self._on_files_page_loaded(gen, offset, result, error, announce),
+                  offset)
+
+    @staticmethod
+    def _fetch_files_page(offset):
+        # Read the revision before the first page, so a change racing the
+        # listing makes the next refresh reload rather than be skipped
+        rev = db.get_files_revision() if offset == 0 else None
+        return rev, db.list_files(offset, FILE_PAGE_SIZE)
+
+    def _on_files_page_loaded(self, gen, offset, result, error, announce):
+        if gen != self._files_gen:
+            return  # list was reset while this page was in flight
+        self._files_loading = False
+        if error is not None:
+            messagebox.showerror("Database Error", f"Could not load files:\n{error}")
+            return
+        rev, files = result
+        if offset == 0:
+            self._files_rev = rev
+            # Swap out the rows painted from the local cache, keeping the selection
+            selected = self.file_tree.selection()
+            self.file_tree.delete(*self.file_tree.get_children())
+            self._file_rows_by_id = {}
+        page = self._append_file_rows(files)
+        if offset == 0:
+            self.file_tree.selection_set([iid for iid in selected if self.file_tree.exists(iid)])
+        # Paging is by file, not by row (a file may come back once per observation)
+        page_count = len({f[0] for f in files})
+        self._files_offset = offset + page_count
+        self._files_has_more = page_count == FILE_PAGE_SIZE
+        cache = get_file_cache()
+        if cache is not None:
+            try:
+                cache.sync_page(page, self._files_last_row, not self._files_has_more)
+            except Exception as e:
+                print(f"Warning: could not update file metadata cache: {e}")
+        if page:
+            self._files_last_row = page[-1]
+        if announce:
+            more = " Scroll down to load more." if self._files_has_more else ""
+            messagebox.showinfo("Files Loaded", f"Loaded {len(self._file_rows_by_id)} files from database.{more}")
+
+    def _append_file_rows(self, files):
+        """Append listing rows to the file tree; returns the rows actually added."""
+        added = []
+        for file_data in files:
+            if file_data[0] in self._file_rows_by_id:
+                continue  # file linked to several observations: keep the first row
+            self._file_rows_by_id[file_data[0]] = file_data
+            added.append(file_data)
+        # Sizes are integers from list_files, so the whole page is formatted in one pass
+        size_strs = format_sizes([f[3] for f in added])
+        iids, values = [], []
+        for file_data, size_str in zip(added, size_strs):
+            file_id, filename, file_type, file_size, upload_date, observation_id = file_data
+            date_str = upload_date if upload_date else 'Unknown'
+            iids.append(str(file_id))
+            values.append((
+                str(file_id),
+                str(filename),
+                str(file_type),
+                size_str,
+                str(date_str),
+                str(observation_id) if observation_id else 'Not linked'
+            ))
+        _tree_append_rows(self.file_tree, values, iids)
+        return added
+
+    def _selected_file_row(self):
+        selected_item = self.file_tree.selection()
+        return self._file_rows_by_id.get(int(selected_item[0])) if selected_item else None
+
+    def _selected_file_rows(self):
+        return [self._file_rows_by_id[int(iid)] for iid in self.file_tree.selection()
+                if int(iid) in self._file_rows_by_id]
     
     def download_selected_file(self):
         """Download the selected file from database to local disk."""
         try:
-            # Get selected item
-            selected_item = self.file_tree.selection()
-            if not selected_item:
+            # Get selected file
+            row = self._selected_file_row()
+            if not row:
                 messagebox.showerror("Selection Error", "Please select a file to download.")
                 return
-            
-            # Get file ID from selected item
-            item_values = self.file_tree.item(selected_item[0])['values']
-            file_id = item_values[0]
-            filename = item_values[1]
+            file_id, filename = row[0], row[1]
             
             # Ask user where to save the file
-            file_path = filedialog.asksaveasfilename(
+            file_path = _get_filedialog().asksaveasfilename(
                 title="Save File As",
                 initialvalue=filename,
                 defaultextension=os.path.splitext(filename)[1]
@@ -1738,55 +2736,89 @@ class DoctorWindow(tk.Toplevel):
             if not file_path:
                 return
             
-            # Download file from database
-            if db.save_file_to_disk(file_id, file_path):
-                messagebox.showinfo("Download Successful", f"File saved to:\n{file_path}")
-            else:
-                messagebox.showerror("Download Error", "Failed to download file from database.")
+            # Download on the I/O pool; the worker only records progress, and
+            # the Tk thread polls it into the progress bar
+            self._download_state = (0, 0)
+            self.download_btn.state(['disabled'])
+            self.download_progress.configure(value=0, maximum=1)
+            self.download_progress.pack(pady=(0, 15))
+            run_async(self, db.save_file_to_disk,
+                      lambda ok, error: self._on_file_downloaded(file_path, ok, error),
+                      file_id, file_path, self._record_download_progress)
+            self._poll_download_progress()
                 
         except Exception as e:
             messagebox.showerror("Download Error", f"Error downloading file:\n{e}")
+
+    def _record_download_progress(self, done, total):
+        # Called on the worker thread: a single attribute store, no Tk calls
+        self._download_state = (done, total)
+
+    def _poll_download_progress(self):
+        if self._download_state is None:
+            return
+        done, total = self._download_state
+        self.download_progress.configure(value=done, maximum=total or 1)
+        self.after(100, self._poll_download_progress)
+
+    def _on_file_downloaded(self, file_path, ok, error):
+        self._download_state = None
+        self.download_progress.pack_forget()
+        self.download_btn.state(['!disabled'])
+        if error is not None:
+            messagebox.showerror("Download Error", f"Error downloading file:\n{error}")
+        elif ok:
+            messagebox.showinfo("Download Successful", f"File saved to:\n{file_path}")
+        else:
+            messagebox.showerror("Download Error", "Failed to download file from database.")
     
     def delete_selected_file(self):
-        """Delete the selected file from database."""
+        """Delete the selected files from database."""
         try:
-            # Get selected item
-            selected_item = self.file_tree.selection()
-            if not selected_item:
+            # Get selected files
+            rows = self._selected_file_rows()
+            if not rows:
                 messagebox.showerror("Selection Error", "Please select a file to delete.")
                 return
             
-            # Get file information
-            item_values = self.file_tree.item(selected_item[0])['values']
-            file_id = item_values[0]
-            filename = item_values[1]
-            
-            # Confirm deletion
-            if messagebox.askyesno("Confirm Delete", 
-                                 f"Are you sure you want to delete this file?\n\nFile: {filename}\nID: {file_id}\n\nThis action cannot be undone."):
+            # Confirm deletion once for the whole selection
+            if len(rows) == 1:
+                file_id, filename = rows[0][0], rows[0][1]
+                prompt = f"Are you sure you want to delete this file?\n\nFile: {filename}\nID: {file_id}"
+            else:
+                prompt = f"Are you sure you want to delete these {len(rows)} files?"
+            if messagebox.askyesno("Confirm Delete", prompt + "\n\nThis action cannot be undone."):
                 
-                # Delete file from database
-                if db.delete_file(file_id):
-                    messagebox.showinfo("Delete Successful", f"File '{filename}' deleted successfully.")
-                    # Refresh the file list
-                    self.load_uploaded_files()
+                # Delete all selected files from database in one statement
+                deleted = db.delete_files([row[0] for row in rows])
+                if deleted:
+                    cache = get_file_cache()
+                    if cache is not None:
+                        cache.invalidate_many(deleted)
+                    # Drop just these rows instead of reloading the whole list;
+                    # the next page now starts that many files earlier
+                    self.file_tree.delete(*[str(file_id) for file_id in deleted])
+                    for file_id in deleted:
+                        del self._file_rows_by_id[file_id]
+                    # Rows painted from the local cache before the first page
+                    # arrives aren't counted in the offset
+                    self._files_offset = max(0, self._files_offset - len(deleted))
+                    if self._files_loading:
+                        # The page in flight was requested at the old offset:
+                        # drop it and request it again from the new one
+                        self._files_gen += 1
+                        self._files_loading = False
+                        self._load_next_files_page(announce=self._files_offset == 0)
+                    if len(rows) == 1:
+                        messagebox.showinfo("Delete Successful", f"File '{rows[0][1]}' deleted successfully.")
+                    else:
+                        messagebox.showinfo("Delete Successful", f"Deleted {len(deleted)} of {len(rows)} files.")
                 else:
                     messagebox.showerror("Delete Error", "Failed to delete file from database.")
                     
         except Exception as e:
             messagebox.showerror("Delete Error", f"Error deleting file:\n{e}")
     
-    def _format_file_size(self, size_bytes):
-        """Format file size in human-readable format."""
-        try:
-            for unit in ['B', 'KB', 'MB', 'GB']:
-                if size_bytes < 1024.0:
-                    return f"{size_bytes:.1f} {unit}"
-                size_bytes /= 1024.0
-            return f"{size_bytes:.1f} TB"
-        except:
-            return "Unknown"
-
 # =============================================================================
 # MAIN APPLICATION ENTRY POINT
 # =============================================================================
@@ -1824,8 +2856,14 @@ def main():
         destroying the application.
         """
         try:
-            # Close database connection
+            # Stop background work, then close the reused query session and connections
+            shutdown_io_pool()
+            _reset_select_session()
             db.disconnect()
+            if _messaging is not None:
+                _messaging.disconnect()
+            if _file_cache is not None:
+                _file_cache.close()
         except Exception:
             # Ignore errors during cleanup
             pass
@@ -27,11 +27,15 @@ compatibility with the GUI that expects integer IDs.
 # =============================================================================
 # IMPORT STATEMENTS
 # =============================================================================
-from neo4j import GraphDatabase, basic_auth
-from typing import Optional, List, Tuple
+from neo4j import READ_ACCESS, GraphDatabase, RoutingControl, basic_auth
+from neo4j.exceptions import AuthError, ServiceUnavailable
+from typing import Optional, Dict, List, Tuple
 import datetime
+import hashlib
+import time
 import mimetypes
 import os
+import threading
 
 
 # =============================================================================
@@ -47,29 +51,57 @@ class ClinicDatabaseNotebook:
     """
 
     def __init__(self, host: str = "bolt://localhost:7687", user: str = "neo4j",
-                 password: str = "clinicdatabase", database: str = "neo4j"):
+                 password: str = "clinicdatabase", database: str = "neo4j",
+                 max_connection_pool_size: int = 50, connection_acquisition_timeout: float = 60.0,
+                 max_connection_lifetime: float = 3600.0, connection_timeout: float = 30.0,
+                 blob_dir: Optional[str] = None):
         self.uri = host
         self.user = user
         self.password = password
         self.database = database
+        # Driver pool settings: connections are kept alive and reused by all
+        # GUI worker threads instead of being reopened under contention
+        self.pool_config = {
+            "max_connection_pool_size": max_connection_pool_size,
+            "connection_acquisition_timeout": connection_acquisition_timeout,
+            "max_connection_lifetime": max_connection_lifetime,
+            "connection_timeout": connection_timeout,
+            "keep_alive": True,
+        }
+        # Files over BLOB_INLINE_LIMIT are kept here rather than in the graph
+        self.blob_dir = blob_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), "file_blobs")
         self.driver = None
+        # Per-instance lookup cache, {key: (bucket, value)}; see _cached
+        self._lookup_cache = {}
+        self._lookup_lock = threading.Lock()
     
     # =============================================================================
     # CONNECTION MANAGEMENT
     # =============================================================================
     def connect(self) -> bool:
         try:
-            self.driver = GraphDatabase.driver(self.uri, auth=basic_auth(self.user, self.password))
+            self.driver = GraphDatabase.driver(self.uri, auth=basic_auth(self.user, self.password),
+                                               **self.pool_config)
             # test
             with self.driver.session(database=self.database) as session:
                 session.run("RETURN 1 as ok").single()
             print(f"Successfully connected to Neo4j database: {self.database}")
             # Ensure schema and counters exist
             self._ensure_constraints_and_counters()
+            self.ensure_indexes()
+            self._migrate_appointment_dates()
             return True
+        except AuthError as e:
+            print(f"Error connecting to Neo4j: authentication failed for user '{self.user}': {e}")
+        except ServiceUnavailable as e:
+            print(f"Error connecting to Neo4j: server not reachable at {self.uri}: {e}")
         except Exception as e:
             print(f"Error connecting to Neo4j: {e}")
-            return False
+        # Don't keep a half-open driver (and its pool) around after a failed connect
+        if self.driver is not None:
+            self.driver.close()
+            self.driver = None
+        return False
     
     def disconnect(self):
         if self.driver is not None:
@@ -80,424 +112,710 @@ class ClinicDatabaseNotebook:
     def create_database(self) -> bool:
         # Neo4j database assumed to exist; return True
         return True
+
+    def _run(self, query: str, read: bool = False, **params) -> list:
+        """
+        Run a single statement and return its records.
+
+        Uses driver.execute_query, which borrows a pooled session and runs the
+        statement in a retried managed transaction, instead of each helper
+        opening and closing a session of its own. Helpers that run several
+        statements together still open one session for all of them.
+
+        Pure reads pass read=True so a cluster can route them to a replica
+        instead of the leader.
+        """
+        records, _, _ = self.driver.execute_query(
+            query, parameters_=params, database_=self.database,
+            routing_=RoutingControl.READ if read else RoutingControl.WRITE
+        )
+        return records
     
     # =============================================================================
     # SCHEMA: CONSTRAINTS AND COUNTERS
     # =============================================================================
+    # Every domain label gets a uniqueness constraint on its integer id
+    ID_CONSTRAINT_LABELS = ("Clinic", "Department", "Doctor", "Patient", "Appointment",
+                            "Observation", "Diagnosis", "MedicalFile")
+
     def _ensure_constraints_and_counters(self):
-        cypher_statements = [
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Clinic) REQUIRE c.id IS UNIQUE",
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (d:Department) REQUIRE d.id IS UNIQUE",
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (d:Doctor) REQUIRE d.id IS UNIQUE",
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Patient) REQUIRE p.id IS UNIQUE",
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (a:Appointment) REQUIRE a.id IS UNIQUE",
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (o:Observation) REQUIRE o.id IS UNIQUE",
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (x:Diagnosis) REQUIRE x.id IS UNIQUE",
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (f:MedicalFile) REQUIRE f.id IS UNIQUE",
-        ]
         with self.driver.session(database=self.database) as session:
-            for stmt in cypher_statements:
-                session.run(stmt)
+            # One metadata read instead of a DDL round trip per label; on an
+            # already initialized database nothing is created
+            existing = {
+                (tuple(r["labels"] or ()), tuple(r["props"] or ()))
+                for r in session.run("SHOW CONSTRAINTS YIELD labelsOrTypes AS labels, properties AS props")
+            }
+            missing = [label for label in self.ID_CONSTRAINT_LABELS if ((label,), ("id",)) not in existing]
+            if missing:
+                # Schema changes can share a transaction (but not with data writes)
+                with session.begin_transaction() as tx:
+                    for label in missing:
+                        tx.run(f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE")
+                    tx.commit()
             # Initialize a single Counter node if not exists
             session.run(
                 "MERGE (ctr:Counter {name: 'global_ids'}) "
                 "ON CREATE SET ctr.clinic=1, ctr.department=1, ctr.doctor=1, ctr.patient=1, ctr.appointment=1, ctr.observation=1, ctr.diagnosis=1, ctr.medicalfile=1"
             )
 
-    def _next_id(self, label: str) -> int:
-        field = label.lower()
+    # Lookup indexes for non-id properties queried by the GUI, by index name
+    INDEX_STATEMENTS = {
+        # get_patient_by_name / get_appointments_for_patient look patients up by name
+        "patient_name": "CREATE INDEX patient_name IF NOT EXISTS FOR (p:Patient) ON (p.first_name, p.last_name)",
+        # Doctors are listed and searched (research tab) by name the same way
+        "doctor_name": "CREATE INDEX doctor_name IF NOT EXISTS FOR (d:Doctor) ON (d.first_name, d.last_name)",
+        # list_files pages through files ordered by upload date
+        "medical_file_upload_date":
+            "CREATE INDEX medical_file_upload_date IF NOT EXISTS FOR (mf:MedicalFile) ON (mf.upload_date)",
+        # Research queries commonly filter appointments by date or date range
+        # (dates are native date values, so ranges compare as dates)
+        "appointment_date": "CREATE INDEX appointment_date IF NOT EXISTS FOR (a:Appointment) ON (a.date)",
+    }
+
+    def ensure_indexes(self):
+        """Create lookup indexes for non-id properties queried by the GUI."""
         with self.driver.session(database=self.database) as session:
-            rec = session.run(
-                f"MATCH (ctr:Counter {{name:'global_ids'}}) "
-                f"WITH ctr, ctr.{field} AS current "
-                f"SET ctr.{field} = coalesce(current,1) + 1 "
-                f"RETURN coalesce(current,1) AS id"
-            ).single()
-            return int(rec["id"]) if rec else 1
+            # Like the constraints: one metadata read, DDL only for what is missing
+            existing = {r["name"] for r in session.run("SHOW INDEXES YIELD name")}
+            missing = [stmt for name, stmt in self.INDEX_STATEMENTS.items() if name not in existing]
+            if missing:
+                with session.begin_transaction() as tx:
+                    for stmt in missing:
+                        tx.run(stmt)
+                    tx.commit()
+
+    def _migrate_appointment_dates(self):
+        """Convert appointment dates stored as 'YYYY-MM-DD' strings to native dates (runs once)."""
+        try:
+            # toString(x) = x only holds for strings; the Counter flag skips the
+            # scan on every later connect
+            self._run(
+                "MATCH (ctr:Counter {name:'global_ids'}) WHERE ctr.appointment_dates_native IS NULL "
+                "CALL { MATCH (a:Appointment) WHERE toString(a.date) = a.date SET a.date = date(a.date) } "
+                "SET ctr.appointment_dates_native = true"
+            )
+        except Exception as e:
+            print(f"Warning: could not convert appointment dates: {e}")
+
+    def _next_id(self, label: str) -> int:
+        return self._next_ids(label, 1)[0]
+
+    # One fixed statement per counter field, built once: the text never varies
+    # between calls, so each label's plan stays in Neo4j's query cache
+    _NEXT_IDS_STATEMENTS = {
+        label: (
+            f"MATCH (ctr:Counter {{name:'global_ids'}}) "
+            f"WITH ctr, coalesce(ctr.{label.lower()},1) AS current "
+            f"SET ctr.{label.lower()} = current + $n "
+            f"RETURN current AS start"
+        )
+        for label in ID_CONSTRAINT_LABELS
+    }
+
+    def _next_ids(self, label: str, n: int) -> range:
+        """Reserve n consecutive ids for `label` with a single Counter update."""
+        records = self._run(self._NEXT_IDS_STATEMENTS[label], n=n)
+        start = int(records[0]["start"]) if records else 1
+        return range(start, start + n)
     
     # =============================================================================
     # SETUP AND SAMPLE DATA
     # =============================================================================
-    def create_all_tables(self):
-        # For Neo4j this means ensuring constraints; already done in connect
-        self._ensure_constraints_and_counters()
+    BATCH_SIZE = 1000
 
-    def insert_all_sample_data(self):
-        with self.driver.session(database=self.database) as session:
-            # Clinics
-            clinic1_id = self._next_id("Clinic")
-            clinic2_id = self._next_id("Clinic")
-            session.run(
-                "CREATE (c1:Clinic {id:$id1, name:$n1, address:$a1, phone:$p1, email:$e1})",
-                id1=clinic1_id, n1="Sunshine Health Center", a1="123 Wellness Ave", p1="+46701234567", e1="contact@sunshine.com"
-            )
-            session.run(
-                "CREATE (c2:Clinic {id:$id2, name:$n2, address:$a2, phone:$p2, email:$e2})",
-                id2=clinic2_id, n2="Green Valley Clinic", a2="456 Nature Rd", p2="+46707654321", e2="info@greenvalley.com"
-            )
+    def _run_batched(self, session, body: str, rows: List[dict], **params):
+        """
+        Run a per-row Cypher `body` (bound to `r`) for every dict in `rows`.
 
-            # Departments (attach to clinic1)
-            departments = [
-                "Cardiology","Pediatrics","Emergency","Internal medicine","Surgery",
-                "Obstetrics & Gynecology","Orthopedics","Neurology","Oncology","ENT",
-                "Psychiatry","Radiology","Ophtalmology","Laboratory","Dermatology",
-                "Rehabilitation","Nutrition","Medical records","Biomedical Engineering",
-                "Nephrology","Gastroenterology","Pulmonology","Urology","Plastic Surgery"
-            ]
-            dept_ids = []
-            for name in departments:
-                did = self._next_id("Department")
-                dept_ids.append(did)
-                session.run(
-                    "MATCH (c:Clinic {id:$cid}) "
-                    "CREATE (d:Department {id:$id, name:$name})<-[:HAS_DEPARTMENT]-(c)",
-                    cid=clinic1_id, id=did, name=name
-                )
-
-            # Doctors: 2 per department (use sample from previous data where possible)
-            doctor_names = [
-                ("Anna","Johnson"),("Michael","Chen"),("Reine","Bergström"),("Erik","Andersson"),
-                ("Sarah","Williams"),("James","Brown"),("Lisa","Garcia"),("Robert","Davis"),
-                ("Maria","Rodriguez"),("David","Miller"),("Jennifer","Wilson"),("Christopher","Moore"),
-                ("Amanda","Taylor"),("Daniel","Anderson"),("Jessica","Thomas"),("Datthew","Jackson"),
-                ("Ashley","White"),("Andrew","Harris"),("Samantha","Martin"),("Joshua","Thompson"),
-                ("Nicole","Garcia"),("Kevin","Martinez"),("Rachel","Robinson"),("Brian","Clark"),
-                ("Lauren","Rodriguez"),("Ryan","Lewis"),("Megan","Lee"),("Tyler","Walker"),
-                ("Stephanie","Hall"),("Nathan","Allen"),("Danielle","Young"),("Justin","King"),
-                ("Michelle","Wright"),("Brandon","Scott"),("Kimberly","Torres"),("Jacob","Nguyen"),
-                ("Angela","Hill"),("Zachary","Flores"),("Heather","Green"),("Aaron","Adams"),
-                ("Rebecca","Nelson"),("Kyle","Baker"),("Victoria","Carter"),("Ethan","Mitchell"),
-                ("Christina","Perez"),("Noah","Roberts"),("Kelly","Turner"),("Logan","Phillips"),
-                ("Amy","Campbell")
-            ]
-            doctor_ids = []
-            idx = 0
-            for did in dept_ids:
-                for _ in range(2):
-                    if idx >= len(doctor_names):
-                        break
-                    fn, ln = doctor_names[idx]
-                    idx += 1
-                    doc_id = self._next_id("Doctor")
-                    doctor_ids.append(doc_id)
-                    session.run(
-                        "MATCH (d:Department {id:$did}) "
-                        "CREATE (doc:Doctor {id:$id, first_name:$fn, last_name:$ln})<-[:HAS_DOCTOR]-(d)",
-                        did=did, id=doc_id, fn=fn, ln=ln
-                    )
+        Each chunk of BATCH_SIZE rows is sent as one UNWIND statement in its own
+        explicit transaction.
+        """
+        query = f"UNWIND $rows AS r {body}"
+        for start in range(0, len(rows), self.BATCH_SIZE):
+            with session.begin_transaction() as tx:
+                tx.run(query, rows=rows[start:start + self.BATCH_SIZE], **params)
+                tx.commit()
 
-            # Patients
-            p1 = self._next_id("Patient")
-            p2 = self._next_id("Patient")
-            session.run("CREATE (:Patient {id:$id, first_name:$fn, last_name:$ln})",
-                        id=p1, fn="Lars", ln="Nilsson")
-            session.run("CREATE (:Patient {id:$id, first_name:$fn, last_name:$ln})",
-                        id=p2, fn="Maria", ln="Garcia")
-
-            # Link example patients to first doctor
-            if doctor_ids:
-                session.run(
-                    "MATCH (doc:Doctor {id:$doc}), (p1:Patient {id:$p1}), (p2:Patient {id:$p2}) "
-                    "MERGE (doc)-[:TREATS]->(p1) "
-                    "MERGE (doc)-[:TREATS]->(p2)",
-                    doc=doctor_ids[0], p1=p1, p2=p2
-                )
-
-            # Appointments
-            a1 = self._next_id("Appointment")
-            a2 = self._next_id("Appointment")
-            a3 = self._next_id("Appointment")
-            a4 = self._next_id("Appointment")
-            dates = ["2024-01-15","2024-01-16","2024-01-17","2024-01-18"]
-            appts = [(a1, doctor_ids[0], p1, dates[0]), (a2, doctor_ids[1] if len(doctor_ids)>1 else doctor_ids[0], p2, dates[1]),
-                     (a3, doctor_ids[0], p1, dates[2]), (a4, doctor_ids[1] if len(doctor_ids)>1 else doctor_ids[0], p2, dates[3])]
-            for aid, didoc, pid, dt in appts:
-                session.run(
-                    "MATCH (doc:Doctor {id:$did}), (p:Patient {id:$pid}) "
-                    "CREATE (a:Appointment {id:$aid, date:$date}) "
-                    "MERGE (doc)-[:HAS_APPOINTMENT]->(a) "
-                    "MERGE (p)-[:HAS_APPOINTMENT]->(a)",
-                    did=didoc, pid=pid, aid=aid, date=dt
-                )
+    def create_all_tables(self):
+        # For Neo4j this means ensuring constraints; already done in connect
+        self._ensure_constraints_and_counters()
 
-            # Observations and Diagnoses for a1, a2, a3, a4
-            observations = [
-                ("Physical Examination", "Patient shows signs of elevated blood pressure and irregular heartbeat", a1),
-                ("Blood Test", "Complete blood count shows elevated white blood cell count", a1),
-                ("Physical Examination", "Child shows normal growth patterns and healthy vital signs", a2),
-                ("X-Ray", "Chest X-ray reveals clear lungs with no abnormalities", a2),
-                ("Physical Examination", "Follow-up examination shows improved blood pressure readings", a3),
-                ("Blood Test", "Follow-up blood work shows normal white blood cell count", a3),
-                ("Physical Examination", "Routine check-up shows excellent health status", a4)
-            ]
-            obs_ids = []
-            for t, desc, appt in observations:
-                oid = self._next_id("Observation")
-                obs_ids.append(oid)
-                session.run(
-                    "MATCH (a:Appointment {id:$aid}) "
-                    "CREATE (o:Observation {id:$id, type:$type, description:$desc})<-[:HAS_OBSERVATION]-(a)",
-                    aid=appt, id=oid, type=t, desc=desc
-                )
+    @staticmethod
+    def _write_sample_steps(tx, steps):
+        for body, rows, params in steps:
+            tx.run(f"UNWIND $rows AS r {body}", rows=rows, **params)
 
-            diagnoses = [
-                ("Hypertension - Stage 1", obs_ids[0]),
-                ("Possible infection - requires further monitoring", obs_ids[1]),
-                ("Healthy child - no medical concerns", obs_ids[2]),
-                ("Normal chest examination", obs_ids[3]),
-                ("Blood pressure under control with medication", obs_ids[4]),
-                ("Infection resolved - normal blood work", obs_ids[5]),
-                ("Excellent health - no medical issues", obs_ids[6])
-            ]
-            for desc, oid in diagnoses:
-                did = self._next_id("Diagnosis")
-                session.run(
-                    "MATCH (o:Observation {id:$oid}) "
-                    "CREATE (x:Diagnosis {id:$id, description:$desc})<-[:HAS_DIAGNOSIS]-(o)",
-                    oid=oid, id=did, desc=desc
-                )
+    def insert_all_sample_data(self):
+        # (cypher body bound to r, rows, extra params) for each entity type, in
+        # dependency order; ids are allocated up front, one Counter update per type
+        steps = []
+
+        # Clinics
+        clinic1_id, clinic2_id = self._next_ids("Clinic", 2)
+        clinic_rows = [
+            {"id": clinic1_id, "name": "Sunshine Health Center", "address": "123 Wellness Ave",
+             "phone": "+46701234567", "email": "contact@sunshine.com"},
+            {"id": clinic2_id, "name": "Green Valley Clinic", "address": "456 Nature Rd",
+             "phone": "+46707654321", "email": "info@greenvalley.com"},
+        ]
+        steps.append((
+            "CREATE (:Clinic {id:r.id, name:r.name, address:r.address, phone:r.phone, email:r.email})",
+            clinic_rows, {}
+        ))
+
+        # Departments (attach to clinic1)
+        departments = [
+            "Cardiology","Pediatrics","Emergency","Internal medicine","Surgery",
+            "Obstetrics & Gynecology","Orthopedics","Neurology","Oncology","ENT",
+            "Psychiatry","Radiology","Ophtalmology","Laboratory","Dermatology",
+            "Rehabilitation","Nutrition","Medical records","Biomedical Engineering",
+            "Nephrology","Gastroenterology","Pulmonology","Urology","Plastic Surgery"
+        ]
+        dept_rows = [{"id": i, "name": name}
+                     for i, name in zip(self._next_ids("Department", len(departments)), departments)]
+        dept_ids = [r["id"] for r in dept_rows]
+        steps.append((
+            "MATCH (c:Clinic {id:$cid}) "
+            "CREATE (d:Department {id:r.id, name:r.name})<-[:HAS_DEPARTMENT]-(c)",
+            dept_rows, {"cid": clinic1_id}
+        ))
+
+        # Doctors: 2 per department (use sample from previous data where possible)
+        doctor_names = [
+            ("Anna","Johnson"),("Michael","Chen"),("Reine","Bergström"),("Erik","Andersson"),
+            ("Sarah","Williams"),("James","Brown"),("Lisa","Garcia"),("Robert","Davis"),
+            ("Maria","Rodriguez"),("David","Miller"),("Jennifer","Wilson"),("Christopher","Moore"),
+            ("Amanda","Taylor"),("Daniel","Anderson"),("Jessica","Thomas"),("Datthew","Jackson"),
+            ("Ashley","White"),("Andrew","Harris"),("Samantha","Martin"),("Joshua","Thompson"),
+            ("Nicole","Garcia"),("Kevin","Martinez"),("Rachel","Robinson"),("Brian","Clark"),
+            ("Lauren","Rodriguez"),("Ryan","Lewis"),("Megan","Lee"),("Tyler","Walker"),
+            ("Stephanie","Hall"),("Nathan","Allen"),("Danielle","Young"),("Justin","King"),
+            ("Michelle","Wright"),("Brandon","Scott"),("Kimberly","Torres"),("Jacob","Nguyen"),
+            ("Angela","Hill"),("Zachary","Flores"),("Heather","Green"),("Aaron","Adams"),
+            ("Rebecca","Nelson"),("Kyle","Baker"),("Victoria","Carter"),("Ethan","Mitchell"),
+            ("Christina","Perez"),("Noah","Roberts"),("Kelly","Turner"),("Logan","Phillips"),
+            ("Amy","Campbell")
+        ]
+        doctor_depts = [did for did in dept_ids for _ in range(2)][:len(doctor_names)]
+        doctor_rows = [
+            {"did": did, "id": i, "fn": fn, "ln": ln}
+            for did, i, (fn, ln) in zip(doctor_depts, self._next_ids("Doctor", len(doctor_depts)), doctor_names)
+        ]
+        doctor_ids = [r["id"] for r in doctor_rows]
+        steps.append((
+            "MATCH (d:Department {id:r.did}) "
+            "CREATE (doc:Doctor {id:r.id, first_name:r.fn, last_name:r.ln})<-[:HAS_DOCTOR]-(d)",
+            doctor_rows, {}
+        ))
+
+        # Patients
+        p1, p2 = self._next_ids("Patient", 2)
+        steps.append((
+            "CREATE (:Patient {id:r.id, first_name:r.fn, last_name:r.ln})",
+            [{"id": p1, "fn": "Lars", "ln": "Nilsson"}, {"id": p2, "fn": "Maria", "ln": "Garcia"}], {}
+        ))
+
+        # Link example patients to first doctor
+        if doctor_ids:
+            steps.append((
+                "MATCH (doc:Doctor {id:r.doc}), (p:Patient {id:r.pid}) "
+                "CREATE (doc)-[:TREATS]->(p)",
+                [{"doc": doctor_ids[0], "pid": p1}, {"doc": doctor_ids[0], "pid": p2}], {}
+            ))
+
+        # Appointments
+        a1, a2, a3, a4 = self._next_ids("Appointment", 4)
+        dates = ["2024-01-15","2024-01-16","2024-01-17","2024-01-18"]
+        appts = [(a1, doctor_ids[0], p1, dates[0]), (a2, doctor_ids[1] if len(doctor_ids)>1 else doctor_ids[0], p2, dates[1]),
+                 (a3, doctor_ids[0], p1, dates[2]), (a4, doctor_ids[1] if len(doctor_ids)>1 else doctor_ids[0], p2, dates[3])]
+        steps.append((
+            "MATCH (doc:Doctor {id:r.did}), (p:Patient {id:r.pid}) "
+            "CREATE (doc)-[:HAS_APPOINTMENT]->(a:Appointment {id:r.aid, date:date(r.date)})<-[:HAS_APPOINTMENT]-(p)",
+            [{"aid": aid, "did": didoc, "pid": pid, "date": dt} for aid, didoc, pid, dt in appts], {}
+        ))
+
+        # Observations and Diagnoses for a1, a2, a3, a4
+        observations = [
+            ("Physical Examination", "Patient shows signs of elevated blood pressure and irregular heartbeat", a1),
+            ("Blood Test", "Complete blood count shows elevated white blood cell count", a1),
+            ("Physical Examination", "Child shows normal growth patterns and healthy vital signs", a2),
+            ("X-Ray", "Chest X-ray reveals clear lungs with no abnormalities", a2),
+            ("Physical Examination", "Follow-up examination shows improved blood pressure readings", a3),
+            ("Blood Test", "Follow-up blood work shows normal white blood cell count", a3),
+            ("Physical Examination", "Routine check-up shows excellent health status", a4)
+        ]
+        obs_rows = [{"id": i, "type": t, "desc": desc, "aid": appt}
+                    for i, (t, desc, appt) in zip(self._next_ids("Observation", len(observations)), observations)]
+        obs_ids = [r["id"] for r in obs_rows]
+        steps.append((
+            "MATCH (a:Appointment {id:r.aid}) "
+            "CREATE (o:Observation {id:r.id, type:r.type, description:r.desc})<-[:HAS_OBSERVATION]-(a)",
+            obs_rows, {}
+        ))
+
+        diagnoses = [
+            ("Hypertension - Stage 1", obs_ids[0]),
+            ("Possible infection - requires further monitoring", obs_ids[1]),
+            ("Healthy child - no medical concerns", obs_ids[2]),
+            ("Normal chest examination", obs_ids[3]),
+            ("Blood pressure under control with medication", obs_ids[4]),
+            ("Infection resolved - normal blood work", obs_ids[5]),
+            ("Excellent health - no medical issues", obs_ids[6])
+        ]
+        steps.append((
+            "MATCH (o:Observation {id:r.oid}) "
+            "CREATE (x:Diagnosis {id:r.id, description:r.desc})<-[:HAS_DIAGNOSIS]-(o)",
+            [{"id": i, "desc": desc, "oid": oid}
+             for i, (desc, oid) in zip(self._next_ids("Diagnosis", len(diagnoses)), diagnoses)], {}
+        ))
 
-            print("Sample data inserted into Neo4j.")
+        with self.driver.session(database=self.database) as session:
+            if sum(len(step[1]) for step in steps) <= self.BATCH_SIZE:
+                # Small enough for one transaction: all of it commits at once,
+                # and the driver retries the whole load on transient errors
+                session.execute_write(self._write_sample_steps, steps)
+            else:
+                for body, rows, params in steps:
+                    self._run_batched(session, body, rows, **params)
+        self.invalidate_department_cache()
+        print("Sample data inserted into Neo4j.")
     
     # =============================================================================
     # FILE STORAGE USING MedicalFile NODES
     # =============================================================================
+    # Files up to this size are stored inline in the MedicalFile node; larger
+    # ones go to blob_dir and the node keeps only blob_path (relative to it)
+    BLOB_INLINE_LIMIT = 1 << 20
+    BLOB_COPY_CHUNK_SIZE = 64 * 1024
+
+    def _blob_file(self, blob_path: str) -> str:
+        return os.path.join(self.blob_dir, blob_path)
+
+    def _write_blob(self, file_path: str, blob_path: str) -> str:
+        """Copy file_path into blob_dir in fixed-size chunks; returns its SHA-256."""
+        os.makedirs(self.blob_dir, exist_ok=True)
+        target = self._blob_file(blob_path)
+        digest = hashlib.sha256()
+        # Write under a temporary name so a failed copy never leaves a partial blob
+        with open(file_path, 'rb') as src, open(target + ".part", 'wb') as dst:
+            for chunk in iter(lambda: src.read(self.BLOB_COPY_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                dst.write(chunk)
+        os.replace(target + ".part", target)
+        return digest.hexdigest()
+
+    def _remove_blobs(self, blob_paths) -> None:
+        for blob_path in blob_paths:
+            if not blob_path:
+                continue
+            try:
+                os.remove(self._blob_file(blob_path))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Warning: could not remove file blob {blob_path}: {e}")
+
     def store_file(self, file_path: str, observation_id: int = None, description: str = None) -> Optional[int]:
+        blob_path = None
         try:
-            with open(file_path, 'rb') as f:
-                data = f.read()
             filename = os.path.basename(file_path)
-            file_size = len(data)
+            file_size = os.stat(file_path).st_size
             file_type, _ = mimetypes.guess_type(file_path)
             if not file_type:
                 file_type = os.path.splitext(filename)[1].lower()
             fid = self._next_id("MedicalFile")
-            with self.driver.session(database=self.database) as session:
-                session.run(
-                    "CREATE (mf:MedicalFile {id:$id, filename:$fn, file_type:$ft, file_size:$fs, file_data:$data, upload_date:$ud, description:$desc})",
-                    id=fid, fn=filename, ft=file_type, fs=file_size, data=data,
+            if file_size > self.BLOB_INLINE_LIMIT:
+                # Streamed to disk; the file is never held in memory as a whole
+                data = None
+                blob_path = f"{fid}{os.path.splitext(filename)[1].lower()}"
+                checksum = self._write_blob(file_path, blob_path)
+            else:
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+                checksum = hashlib.sha256(data).hexdigest()
+            def _create(tx):
+                tx.run(
+                    "CREATE (mf:MedicalFile {id:$id, filename:$fn, file_type:$ft, file_size:$fs, file_data:$data, "
+                    "blob_path:$blob, sha256:$sha, upload_date:$ud, description:$desc}) "
+                    "WITH mf OPTIONAL MATCH (ctr:Counter {name:'global_ids'}) "
+                    "SET ctr.files_rev = coalesce(ctr.files_rev, 0) + 1",
+                    id=fid, fn=filename, ft=file_type, fs=file_size, data=data, blob=blob_path, sha=checksum,
                     ud=datetime.datetime.now().isoformat(), desc=description
                 )
                 if observation_id is not None:
-                    session.run(
+                    tx.run(
                         "MATCH (o:Observation {id:$oid}), (mf:MedicalFile {id:$fid}) "
-                        "MERGE (o)-[:HAS_FILE]->(mf)",
+                        "CREATE (o)-[:HAS_FILE]->(mf)",
                         oid=observation_id, fid=fid
                     )
+            # Node and observation link commit together, so a failure in
+            # between can't leave an unlinked file behind
+            with self.driver.session(database=self.database) as session:
+                session.execute_write(_create)
             print(f"File '{filename}' stored successfully with ID: {fid}")
             return fid
         except Exception as e:
             print(f"Error storing file: {e}")
+            self._remove_blobs([blob_path])
+            return None
+
+    @staticmethod
+    def _check_digest(digest, expected: Optional[str], file_id: int) -> None:
+        # Files stored before checksums were recorded have no sha256 to check
+        if expected and digest.hexdigest() != expected:
+            raise ValueError(f"File {file_id} is corrupt: SHA-256 does not match the stored checksum")
+
+    def _read_file_data(self, file_id: int, data: Optional[bytes], blob_path: Optional[str],
+                        expected: Optional[str]) -> bytes:
+        if blob_path:
+            with open(self._blob_file(blob_path), 'rb') as f:
+                data = f.read()
+        data = data or b""
+        self._check_digest(hashlib.sha256(data), expected, file_id)
+        return data
+
+    def retrieve_file_metadata(self, file_id: int) -> Optional[dict]:
+        """Like retrieve_file, but without 'file_data' (the file bytes are never fetched)."""
+        try:
+            res = self._run(
+                "MATCH (mf:MedicalFile {id:$id}) "
+                "OPTIONAL MATCH (o:Observation)-[:HAS_FILE]->(mf) "
+                "RETURN mf.id AS file_id, mf.filename AS filename, mf.file_type AS file_type, "
+                "mf.file_size AS file_size, mf.upload_date AS upload_date, "
+                "o.id AS observation_id, mf.description AS description LIMIT 1",
+                read=True, id=file_id
+            )
+            return res[0].data() if res else None
+        except Exception as e:
+            print(f"Error retrieving file metadata: {e}")
             return None
 
     def retrieve_file(self, file_id: int) -> Optional[dict]:
         try:
-            with self.driver.session(database=self.database) as session:
-                rec = session.run(
-                    "MATCH (mf:MedicalFile {id:$id}) RETURN mf",
-                    id=file_id
-                ).single()
-                if not rec:
-                    return None
-                mf = rec["mf"]
-                # Find observation if linked
-                obs = session.run(
-                    "MATCH (o:Observation)-[:HAS_FILE]->(mf:MedicalFile {id:$id}) RETURN o.id AS oid",
-                    id=file_id
-                ).single()
-                return {
-                    'file_id': mf["id"],
-                    'filename': mf.get("filename"),
-                    'file_type': mf.get("file_type"),
-                    'file_size': mf.get("file_size"),
-                    'file_data': mf.get("file_data"),
-                    'upload_date': mf.get("upload_date"),
-                    'observation_id': (obs["oid"] if obs else None),
-                    'description': mf.get("description")
-                }
+            # Node and linked observation in one round trip
+            res = self._run(
+                "MATCH (mf:MedicalFile {id:$id}) "
+                "OPTIONAL MATCH (o:Observation)-[:HAS_FILE]->(mf) "
+                "RETURN mf, o.id AS oid LIMIT 1",
+                read=True, id=file_id
+            )
+            if not res:
+                return None
+            mf, oid = res[0]["mf"], res[0]["oid"]
+            return {
+                'file_id': mf["id"],
+                'filename': mf.get("filename"),
+                'file_type': mf.get("file_type"),
+                'file_size': mf.get("file_size"),
+                'file_data': self._read_file_data(mf["id"], mf.get("file_data"), mf.get("blob_path"),
+                                                  mf.get("sha256")),
+                'upload_date': mf.get("upload_date"),
+                'observation_id': oid,
+                'description': mf.get("description")
+            }
         except Exception as e:
             print(f"Error retrieving file: {e}")
             return None
     
-    def save_file_to_disk(self, file_id: int, output_path: str = None) -> bool:
+    DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+    def save_file_to_disk(self, file_id: int, output_path: str = None, progress=None) -> bool:
+        """
+        Write a stored file to disk in DOWNLOAD_CHUNK_SIZE pieces.
+
+        Only the filename and bytes are fetched (no node or observation lookup);
+        files kept in blob_dir are copied from there without loading them.
+        progress, if given, is called as progress(bytes_written, total_bytes)
+        after each chunk; it runs on the calling thread.
+        """
         try:
-            info = self.retrieve_file(file_id)
-            if not info:
+            records = self._run(
+                "MATCH (mf:MedicalFile {id:$id}) "
+                "RETURN mf.filename AS filename, mf.blob_path AS blob_path, mf.sha256 AS sha256, "
+                "CASE WHEN mf.blob_path IS NULL THEN mf.file_data END AS data",
+                read=True, id=file_id
+            )
+            if not records:
                 return False
+            rec = records[0]
             if not output_path:
-                output_path = info['filename'] or f"file_{file_id}"
-            with open(output_path, 'wb') as f:
-                f.write(info['file_data'] or b"")
+                output_path = rec["filename"] or f"file_{file_id}"
+            if rec["blob_path"]:
+                digest = self._copy_blob(rec["blob_path"], output_path, progress)
+            else:
+                data = memoryview(rec["data"] or b"")
+                digest = hashlib.sha256(data)
+                total = len(data)
+                with open(output_path, 'wb') as f:
+                    for start in range(0, total, self.DOWNLOAD_CHUNK_SIZE):
+                        end = min(start + self.DOWNLOAD_CHUNK_SIZE, total)
+                        f.write(data[start:end])
+                        if progress:
+                            progress(end, total)
+            try:
+                self._check_digest(digest, rec["sha256"], file_id)
+            except ValueError:
+                os.remove(output_path)
+                raise
             print(f"File saved to: {output_path}")
             return True
         except Exception as e:
             print(f"Error saving file to disk: {e}")
             return False
     
+    def _copy_blob(self, blob_path: str, output_path: str, progress=None):
+        """Copy a blob to output_path in chunks; returns the SHA-256 of what was copied."""
+        source = self._blob_file(blob_path)
+        total = os.stat(source).st_size
+        done = 0
+        digest = hashlib.sha256()
+        with open(source, 'rb') as src, open(output_path, 'wb') as dst:
+            for chunk in iter(lambda: src.read(self.DOWNLOAD_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                dst.write(chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+        return digest
+
     def get_files_by_observation(self, observation_id: int) -> List[dict]:
         try:
-            with self.driver.session(database=self.database) as session:
-                res = session.run(
-                    "MATCH (o:Observation {id:$oid})-[:HAS_FILE]->(mf:MedicalFile) "
-                    "RETURN mf ORDER BY mf.upload_date DESC",
-                    oid=observation_id
-                )
-            files = []
-            for r in res:
-                mf = r["mf"]
-            files.append({
-                    'file_id': mf["id"],
-                    'filename': mf.get("filename"),
-                    'file_type': mf.get("file_type"),
-                    'file_size': mf.get("file_size"),
-                    'upload_date': mf.get("upload_date"),
-                    'description': mf.get("description")
-            })
-            return files
+            # Project just the listed properties so file_data is never fetched;
+            # _run consumes the whole result before its session is released
+            res = self._run(
+                "MATCH (o:Observation {id:$oid})-[:HAS_FILE]->(mf:MedicalFile) "
+                "RETURN mf.id AS file_id, mf.filename AS filename, mf.file_type AS file_type, "
+                "mf.file_size AS file_size, mf.upload_date AS upload_date, mf.description AS description "
+                "ORDER BY upload_date DESC",
+                read=True, oid=observation_id
+            )
+            return [r.data() for r in res]
         except Exception as e:
             print(f"Error retrieving files for observation: {e}")
             return []
     
     def delete_file(self, file_id: int) -> bool:
         try:
-            with self.driver.session(database=self.database) as session:
-                result = session.run(
-                    "MATCH (mf:MedicalFile {id:$id}) DETACH DELETE mf RETURN 1",
-                    id=file_id
-                ).single()
-                return bool(result)
+            records = self._run(
+                "MATCH (mf:MedicalFile {id:$id}) WITH mf, mf.blob_path AS blob DETACH DELETE mf "
+                "WITH blob OPTIONAL MATCH (ctr:Counter {name:'global_ids'}) "
+                "SET ctr.files_rev = coalesce(ctr.files_rev, 0) + 1 RETURN blob",
+                id=file_id
+            )
+            self._remove_blobs(r["blob"] for r in records)
+            return bool(records)
         except Exception as e:
             print(f"Error deleting file: {e}")
             return False
+
+    def delete_files(self, file_ids: List[int]) -> List[int]:
+        """Delete several files in one statement; returns the ids actually deleted."""
+        try:
+            records = self._run(
+                "MATCH (mf:MedicalFile) WHERE mf.id IN $ids "
+                "WITH mf, mf.id AS id, mf.blob_path AS blob DETACH DELETE mf "
+                "WITH collect(id) AS deleted, collect(blob) AS blobs "
+                "OPTIONAL MATCH (ctr:Counter {name:'global_ids'}) "
+                "FOREACH (_ IN CASE WHEN size(deleted) > 0 THEN [1] ELSE [] END | "
+                "SET ctr.files_rev = coalesce(ctr.files_rev, 0) + 1) "
+                "RETURN deleted, blobs",
+                ids=list(file_ids)
+            )
+            if not records:
+                return []
+            self._remove_blobs(records[0]["blobs"])
+            return [int(i) for i in records[0]["deleted"]]
+        except Exception as e:
+            print(f"Error deleting files: {e}")
+            return []
+
+    def get_files_revision(self) -> int:
+        """Counter bumped by every file upload/delete; unchanged means list_files() is too."""
+        records = self._run(
+            "MATCH (ctr:Counter {name:'global_ids'}) RETURN coalesce(ctr.files_rev, 0) AS rev",
+            read=True
+        )
+        return int(records[0]["rev"]) if records else 0
     
     # =============================================================================
     # GUI-FACING QUERY/COMMAND HELPERS
     # =============================================================================
+    # Departments and their doctors rarely change, so lookups are cached in
+    # CACHE_TTL_SECONDS time buckets: a new bucket number is a cache miss.
+    CACHE_TTL_SECONDS = 300
+
+    def _cache_bucket(self) -> int:
+        return int(time.time() // self.CACHE_TTL_SECONDS)
+
+    def _cached(self, key, load):
+        # The lock is held across the load so concurrent misses from GUI worker
+        # threads wait for one query instead of each running their own
+        bucket = self._cache_bucket()
+        with self._lookup_lock:
+            hit = self._lookup_cache.get(key)
+            if hit is not None and hit[0] == bucket:
+                return hit[1]
+            value = load()
+            self._lookup_cache[key] = (bucket, value)
+            return value
+
+    def _load_departments(self) -> Tuple[Tuple[int, str], ...]:
+        res = self._run("MATCH (d:Department) RETURN d.id as id, d.name as name ORDER BY name", read=True)
+        return tuple((int(r["id"]), r["name"]) for r in res)
+
+    def _load_doctors_by_department(self, department_id: int) -> Tuple[Tuple[int, str, str], ...]:
+        res = self._run(
+            "MATCH (:Department {id:$id})-[:HAS_DOCTOR]->(doc:Doctor) "
+            "RETURN doc.id AS id, doc.first_name AS fn, doc.last_name AS ln ORDER BY fn, ln",
+            read=True, id=department_id
+        )
+        return tuple((int(r["id"]), r["fn"], r["ln"]) for r in res)
+
+    def _load_all_department_doctors(self) -> Dict[int, Tuple[Tuple[int, str, str], ...]]:
+        res = self._run(
+            "MATCH (dp:Department)-[:HAS_DOCTOR]->(doc:Doctor) "
+            "RETURN dp.id AS dept_id, doc.id AS id, doc.first_name AS fn, doc.last_name AS ln "
+            "ORDER BY fn, ln",
+            read=True
+        )
+        grouped = {}
+        for r in res:
+            grouped.setdefault(int(r["dept_id"]), []).append((int(r["id"]), r["fn"], r["ln"]))
+        return {dept_id: tuple(rows) for dept_id, rows in grouped.items()}
+
+    def _load_doctors(self) -> Tuple[Tuple[int, str, str], ...]:
+        res = self._run("MATCH (doc:Doctor) RETURN doc.id AS id, doc.first_name AS fn, doc.last_name AS ln ORDER BY fn, ln",
+                        read=True)
+        return tuple((int(r["id"]), r["fn"], r["ln"]) for r in res)
+
+    def invalidate_department_cache(self):
+        """Drop cached department/doctor lookups after writes to those nodes."""
+        with self._lookup_lock:
+            self._lookup_cache.clear()
+
     def get_departments(self) -> List[Tuple[int, str]]:
-        with self.driver.session(database=self.database) as session:
-            res = session.run("MATCH (d:Department) RETURN d.id as id, d.name as name ORDER BY name")
-            return [(int(r["id"]), r["name"]) for r in res]
+        return list(self._cached("departments", self._load_departments))
 
     def get_doctors_by_department(self, department_id: int) -> List[Tuple[int, str, str]]:
-        with self.driver.session(database=self.database) as session:
-            res = session.run(
-                "MATCH (:Department {id:$id})-[:HAS_DOCTOR]->(doc:Doctor) "
-                "RETURN doc.id AS id, doc.first_name AS fn, doc.last_name AS ln ORDER BY fn, ln",
-                id=department_id
-            )
-            return [(int(r["id"]), r["fn"], r["ln"]) for r in res]
+        return list(self._cached(("department_doctors", department_id),
+                                 lambda: self._load_doctors_by_department(department_id)))
+
+    def get_all_department_doctors(self) -> Dict[int, List[Tuple[int, str, str]]]:
+        """Doctors of every department in one query, keyed by department id."""
+        cached = self._cached("all_department_doctors", self._load_all_department_doctors)
+        return {dept_id: list(rows) for dept_id, rows in cached.items()}
 
     def get_doctors(self) -> List[Tuple[int, str, str]]:
-        with self.driver.session(database=self.database) as session:
-            res = session.run("MATCH (doc:Doctor) RETURN doc.id AS id, doc.first_name AS fn, doc.last_name AS ln ORDER BY fn, ln")
-            return [(int(r["id"]), r["fn"], r["ln"]) for r in res]
+        return list(self._cached("doctors", self._load_doctors))
 
     def get_patient_by_name(self, first_name: str, last_name: str) -> Optional[Tuple[int, str, str]]:
-        with self.driver.session(database=self.database) as session:
-            rec = session.run(
-                "MATCH (p:Patient {first_name:$fn, last_name:$ln}) RETURN p.id as id, p.first_name as fn, p.last_name as ln",
-                fn=first_name, ln=last_name
-            ).single()
-            if not rec:
-                return None
-            return (int(rec["id"]), rec["fn"], rec["ln"])
+        res = self._run(
+            "MATCH (p:Patient {first_name:$fn, last_name:$ln}) RETURN p.id as id, p.first_name as fn, p.last_name as ln",
+            read=True, fn=first_name, ln=last_name
+        )
+        if not res:
+            return None
+        rec = res[0]
+        return (int(rec["id"]), rec["fn"], rec["ln"])
 
     def create_patient(self, first_name: str, last_name: str, doctor_id: Optional[int] = None) -> int:
         pid = self._next_id("Patient")
-        with self.driver.session(database=self.database) as session:
-            session.run("CREATE (:Patient {id:$id, first_name:$fn, last_name:$ln})", id=pid, fn=first_name, ln=last_name)
-            if doctor_id is not None:
-                session.run(
-                    "MATCH (doc:Doctor {id:$did}), (p:Patient {id:$pid}) MERGE (doc)-[:TREATS]->(p)",
-                    did=doctor_id, pid=pid
-                )
+        # The patient is new, so its TREATS link is created outright in the same
+        # statement (no MERGE probe); with no doctor_id the OPTIONAL MATCH is empty
+        self._run(
+            "CREATE (p:Patient {id:$id, first_name:$fn, last_name:$ln}) "
+            "WITH p OPTIONAL MATCH (doc:Doctor {id:$did}) "
+            "FOREACH (_ IN CASE WHEN doc IS NULL THEN [] ELSE [1] END | CREATE (doc)-[:TREATS]->(p))",
+            id=pid, fn=first_name, ln=last_name, did=doctor_id
+        )
         return pid
 
     def create_appointment(self, doctor_id: int, date_str: str, patient_id: int) -> int:
         aid = self._next_id("Appointment")
-        with self.driver.session(database=self.database) as session:
-            session.run(
-                "MATCH (doc:Doctor {id:$did}), (p:Patient {id:$pid}) "
-                "CREATE (a:Appointment {id:$aid, date:$date}) "
-                "MERGE (doc)-[:HAS_APPOINTMENT]->(a) "
-                "MERGE (p)-[:HAS_APPOINTMENT]->(a)",
-                did=doctor_id, pid=patient_id, aid=aid, date=date_str
-            )
+        self._run(
+            "MATCH (doc:Doctor {id:$did}), (p:Patient {id:$pid}) "
+            "CREATE (doc)-[:HAS_APPOINTMENT]->(a:Appointment {id:$aid, date:date($date)})<-[:HAS_APPOINTMENT]-(p)",
+            did=doctor_id, pid=patient_id, aid=aid, date=date_str
+        )
         return aid
 
-    def get_appointments_for_patient(self, first_name: str, last_name: str) -> List[Tuple[int, str, str, str, str]]:
-        with self.driver.session(database=self.database) as session:
-            res = session.run(
-                "MATCH (p:Patient {first_name:$fn, last_name:$ln})-[:HAS_APPOINTMENT]->(a:Appointment)<-[:HAS_APPOINTMENT]-(d:Doctor) "
-                "MATCH (d)<-[:HAS_DOCTOR]-(dept:Department) "
-                "RETURN a.id AS aid, a.date AS date, d.first_name AS dfn, d.last_name AS dln, dept.name AS dept "
-                "ORDER BY date",
-                fn=first_name, ln=last_name
-            )
-            return [(int(r["aid"]), r["date"], r["dfn"], r["dln"], r["dept"]) for r in res]
-
-    def get_appointments_for_doctor(self, doctor_id: int) -> List[Tuple[int, str, str, str]]:
-        with self.driver.session(database=self.database) as session:
-            res = session.run(
-                "MATCH (d:Doctor {id:$did})-[:HAS_APPOINTMENT]->(a:Appointment)<-[:HAS_APPOINTMENT]-(p:Patient) "
-                "RETURN a.id AS aid, a.date AS date, p.first_name AS pfn, p.last_name AS pln ORDER BY date",
-                did=doctor_id
-            )
-            return [(int(r["aid"]), r["date"], r["pfn"], r["pln"]) for r in res]
+    def get_appointments_for_patient(self, first_name: str, last_name: str, skip: int = 0,
+                                     limit: Optional[int] = None) -> List[Tuple[int, str, str, str, str]]:
+        """Return appointments by date; pass skip/limit to fetch a single page."""
+        page = " SKIP $skip LIMIT $limit" if limit is not None else ""
+        res = self._run(
+            "MATCH (p:Patient {first_name:$fn, last_name:$ln})-[:HAS_APPOINTMENT]->(a:Appointment)"
+            "<-[:HAS_APPOINTMENT]-(d:Doctor)<-[:HAS_DOCTOR]-(dept:Department) "
+            "RETURN a.id AS aid, toString(a.date) AS date, d.first_name AS dfn, d.last_name AS dln, dept.name AS dept "
+            "ORDER BY a.date, aid" + page,
+            read=True, fn=first_name, ln=last_name, skip=skip, limit=limit
+        )
+        return [tuple(r) for r in res]
+
+    def get_appointments_for_doctor(self, doctor_id: int, skip: int = 0,
+                                    limit: Optional[int] = None) -> List[Tuple[int, str, str, str]]:
+        """Return appointments by date; pass skip/limit to fetch a single page."""
+        page = " SKIP $skip LIMIT $limit" if limit is not None else ""
+        res = self._run(
+            "MATCH (d:Doctor {id:$did})-[:HAS_APPOINTMENT]->(a:Appointment)<-[:HAS_APPOINTMENT]-(p:Patient) "
+            "RETURN a.id AS aid, toString(a.date) AS date, p.first_name AS pfn, p.last_name AS pln "
+            "ORDER BY a.date, aid" + page,
+            read=True, did=doctor_id, skip=skip, limit=limit
+        )
+        return [tuple(r) for r in res]
 
     def create_observation(self, appointment_id: int, obs_type: str, description: str) -> int:
         oid = self._next_id("Observation")
-        with self.driver.session(database=self.database) as session:
-            session.run(
-                "MATCH (a:Appointment {id:$aid}) "
-                "CREATE (o:Observation {id:$id, type:$type, description:$desc})<-[:HAS_OBSERVATION]-(a)",
-                aid=appointment_id, id=oid, type=obs_type, desc=description
-            )
+        self._run(
+            "MATCH (a:Appointment {id:$aid}) "
+            "CREATE (o:Observation {id:$id, type:$type, description:$desc})<-[:HAS_OBSERVATION]-(a)",
+            aid=appointment_id, id=oid, type=obs_type, desc=description
+        )
         return oid
 
     def link_file_to_observation(self, file_id: int, observation_id: int) -> None:
-        with self.driver.session(database=self.database) as session:
-            session.run(
-                "MATCH (o:Observation {id:$oid}), (f:MedicalFile {id:$fid}) MERGE (o)-[:HAS_FILE]->(f)",
-                oid=observation_id, fid=file_id
-            )
-
-    def list_files(self) -> List[Tuple[int, str, str, int, str, Optional[int]]]:
-        with self.driver.session(database=self.database) as session:
-            res = session.run(
-                "MATCH (mf:MedicalFile) "
-                "OPTIONAL MATCH (o:Observation)-[:HAS_FILE]->(mf) "
-                "RETURN mf.id AS id, mf.filename AS filename, mf.file_type AS file_type, mf.file_size AS file_size, mf.upload_date AS upload_date, o.id AS observation_id "
-                "ORDER BY upload_date DESC"
-            )
-            return [
-                (int(r["id"]), r["filename"], r["file_type"], int(r["file_size"] or 0), r["upload_date"], (int(r["observation_id"]) if r["observation_id"] is not None else None))
-                for r in res
-            ]
+        self._run(
+            "MATCH (o:Observation {id:$oid}), (f:MedicalFile {id:$fid}) MERGE (o)-[:HAS_FILE]->(f)",
+            oid=observation_id, fid=file_id
+        )
+
+    def list_files(self, skip: int = 0, limit: Optional[int] = None) -> List[Tuple[int, str, str, int, str, Optional[int]]]:
+        """Return files newest first; pass skip/limit to fetch a single page."""
+        page = " SKIP $skip LIMIT $limit" if limit is not None else ""
+        res = self._run(
+            "MATCH (mf:MedicalFile) "
+            "WITH mf ORDER BY mf.upload_date DESC, mf.id DESC" + page + " "
+            "OPTIONAL MATCH (o:Observation)-[:HAS_FILE]->(mf) "
+            "RETURN mf.id AS id, mf.filename AS filename, mf.file_type AS file_type, coalesce(mf.file_size, 0) AS file_size, mf.upload_date AS upload_date, o.id AS observation_id "
+            "ORDER BY upload_date DESC, id DESC",
+            read=True, skip=skip, limit=limit
+        )
+        # Records are tuples already in row order; copy them as-is rather
+        # than looking every field up by key
+        return [tuple(r) for r in res]
 
     def get_doctors_for_patient(self, patient_id: int) -> List[Tuple[int, str, str]]:
-        with self.driver.session(database=self.database) as session:
-            res = session.run(
-                "MATCH (p:Patient {id:$pid})-[:HAS_APPOINTMENT]->(:Appointment)<-[:HAS_APPOINTMENT]-(d:Doctor) "
-                "RETURN DISTINCT d.id AS id, d.first_name AS fn, d.last_name AS ln ORDER BY fn, ln",
-                pid=patient_id
-            )
-            return [(int(r["id"]), r["fn"], r["ln"]) for r in res]
+        res = self._run(
+            "MATCH (p:Patient {id:$pid})-[:HAS_APPOINTMENT]->(:Appointment)<-[:HAS_APPOINTMENT]-(d:Doctor) "
+            "RETURN DISTINCT d.id AS id, d.first_name AS fn, d.last_name AS ln ORDER BY fn, ln",
+            read=True, pid=patient_id
+        )
+        return [(int(r["id"]), r["fn"], r["ln"]) for r in res]
 
     def get_patients_for_doctor(self, doctor_id: int) -> List[Tuple[int, str, str]]:
-        with self.driver.session(database=self.database) as session:
-            res = session.run(
-                "MATCH (d:Doctor {id:$did})-[:HAS_APPOINTMENT]->(:Appointment)<-[:HAS_APPOINTMENT]-(p:Patient) "
-                "RETURN DISTINCT p.id AS id, p.first_name AS fn, p.last_name AS ln ORDER BY fn, ln",
-                did=doctor_id
-            )
-            return [(int(r["id"]), r["fn"], r["ln"]) for r in res]
+        res = self._run(
+            "MATCH (d:Doctor {id:$did})-[:HAS_APPOINTMENT]->(:Appointment)<-[:HAS_APPOINTMENT]-(p:Patient) "
+            "RETURN DISTINCT p.id AS id, p.first_name AS fn, p.last_name AS ln ORDER BY fn, ln",
+            read=True, did=doctor_id
+        )
+        return [(int(r["id"]), r["fn"], r["ln"]) for r in res]
 
 # =============================================================================
     # DEMO OUTPUT
 # =============================================================================
     def run_sample_queries(self):
-        with self.driver.session(database=self.database) as session:
+        with self.driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
             print("\n=== Clinics ===")
             for r in session.run("MATCH (c:Clinic) RETURN c.id as id, c.name as name ORDER BY id"):
                 print(r["id"], r["name"])
@@ -513,7 +831,8 @@ class ClinicDatabaseNotebook:
             print("\n=== Appointments (Patient - Doctor - Date) ===")
             q = (
                 "MATCH (p:Patient)-[:HAS_APPOINTMENT]->(a:Appointment)<-[:HAS_APPOINTMENT]-(d:Doctor) "
-                "RETURN p.first_name AS pfn, p.last_name AS pln, d.first_name AS dfn, d.last_name AS dln, a.date AS date ORDER BY date"
+                "RETURN p.first_name AS pfn, p.last_name AS pln, d.first_name AS dfn, d.last_name AS dln, toString(a.date) AS date "
+                "ORDER BY a.date"
             )
             for r in session.run(q):
                 print(f"Patient: {r['pfn']} {r['pln']} | Doctor: {r['dfn']} {r['dln']} | Date: {r['date']}")
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local File Metadata Cache for Clinic Management
+
+This module keeps a copy of the uploaded-file listing (the MedicalFile rows
+shown in the doctor's File Management tab) in a local SQLite database, so the
+tab can paint immediately while the Neo4j listing is fetched in the background.
+
+The cache only holds listing metadata, never file contents, and Neo4j stays
+the source of truth: every page fetched from Neo4j is written back with
+sync_page(), which also drops cached rows that no longer exist there.
+"""
+
+# =============================================================================
+# IMPORT STATEMENTS
+# =============================================================================
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Tuple
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Cache database next to this module (ignored by git)
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "file_meta.db")
+
+# (file_id, filename, file_type, file_size, upload_date, observation_id)
+FileRow = Tuple[int, str, str, int, Optional[str], Optional[int]]
+
+# Rows are kept in the same order as list_files(): newest upload first. Neo4j
+# sorts null upload dates first in a DESC order, so they come first here too
+_ORDER = "ORDER BY upload_date IS NOT NULL, upload_date DESC, file_id DESC"
+
+# A row ordered strictly after the row bound to the parameters (has_date,
+# has_date, upload_date or '', file_id) in _ORDER
+_AFTER = ("((upload_date IS NOT NULL) > ? OR ((upload_date IS NOT NULL) = ? "
+          "AND (COALESCE(upload_date, ''), file_id) < (?, ?)))")
+
+
+def _after_params(row: FileRow) -> list:
+    has_date = int(row[4] is not None)
+    return [has_date, has_date, row[4] or '', row[0]]
+
+# =============================================================================
+# METADATA CACHE CLASS
+# =============================================================================
+
+class MetadataCache:
+    """
+    SQLite-backed cache of the uploaded-file listing.
+
+    The connection runs in autocommit mode with WAL journaling and
+    synchronous=NORMAL, so readers never block on a writer and commits skip the
+    per-transaction fsync.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " file_id INTEGER PRIMARY KEY,"
+            " filename TEXT,"
+            " file_type TEXT,"
+            " file_size INTEGER,"
+            " upload_date TEXT,"
+            " observation_id INTEGER)"
+        )
+
+    def list_all(self, limit: Optional[int] = None) -> List[FileRow]:
+        """Return cached rows newest first, optionally only the first `limit`."""
+        if limit is None:
+            return self.conn.execute(f"SELECT * FROM files {_ORDER}").fetchall()
+        return self.conn.execute(f"SELECT * FROM files {_ORDER} LIMIT ?", (limit,)).fetchall()
+
+    def set_many(self, rows: Iterable[FileRow]) -> None:
+        """Insert or replace many rows in one transaction."""
+        with self._transaction():
+            self.conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def invalidate(self, file_id: int) -> None:
+        """Drop one file from the cache (e.g., after it was deleted)."""
+        self.conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+
+    def invalidate_many(self, file_ids: Iterable[int]) -> None:
+        """Drop several files from the cache in one transaction."""
+        with self._transaction():
+            self.conn.executemany("DELETE FROM files WHERE file_id = ?", [(i,) for i in file_ids])
+
+    def sync_page(self, rows: List[FileRow], after: Optional[FileRow], is_last: bool) -> None:
+        """
+        Make the cache match one page fetched from Neo4j.
+
+        Args:
+            rows (list): The page, in list_files() order
+            after (tuple, optional): Last row of the previous page (None for the
+                first page); the page covers everything ordered after it
+            is_last (bool): True if no further pages exist, so the page also
+                covers everything ordered after its own last row
+        """
+        clauses, params = [], []
+        if after is not None:
+            clauses.append(_AFTER)
+            params += _after_params(after)
+        if rows and not is_last:
+            clauses.append("NOT " + _AFTER)
+            params += _after_params(rows[-1])
+        ids = [r[0] for r in rows]
+        if ids:
+            clauses.append(f"file_id NOT IN ({','.join('?' * len(ids))})")
+            params += ids
+        where = " AND ".join(clauses) or "1"
+        with self._transaction():
+            # Cached rows in the page's range that Neo4j no longer returns are gone
+            self.conn.execute(f"DELETE FROM files WHERE {where}", params)
+            self.conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # The connection is in autocommit mode; group multi-row writes explicitly
+        self.conn.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
@@ -18,6 +18,7 @@ Requirements:
 - bson
 - datetime
 - base64
+- Pillow (optional; large chat images are sent uncompressed without it)
 """
 
 # =============================================================================
@@ -29,12 +30,15 @@ from pymongo import MongoClient
 from datetime import datetime, timezone
 import bcrypt
 import base64
+import io
 import os
 import mimetypes
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
+from gridfs import GridFSBucket
 import json
 from dotenv import load_dotenv, find_dotenv
+from functools import lru_cache
 
 # =============================================================================
 # MONGODB CONNECTION CONFIGURATION
@@ -54,6 +58,53 @@ MONGODB_CONFIG = {
     'database': 'clinic_messaging'
 }
 
+# Chat images larger than this are re-encoded (when Pillow is installed)
+COMPRESS_IMAGES_OVER = 512 * 1024
+# Longest side of a re-encoded chat image, in pixels
+MAX_IMAGE_DIMENSION = 2048
+
+@lru_cache(maxsize=None)
+def _load_pillow():
+    """Import Pillow on first use (None if it is not installed)."""
+    try:
+        from PIL import Image  # Optional: re-encodes large chat images before upload
+    except ImportError:
+        return None
+    return Image
+
+def _compress_image(file_path: str, original_size: int):
+    """
+    Re-encode a large image into a smaller payload.
+    
+    Opaque images become JPEG (quality 85), images with transparency become
+    optimized PNG, both scaled down to MAX_IMAGE_DIMENSION.
+    
+    Returns:
+        tuple: (bytes, mime_type), or None to upload the original file unchanged
+    """
+    if original_size <= COMPRESS_IMAGES_OVER:
+        return None
+    Image = _load_pillow()
+    if Image is None:
+        return None
+    try:
+        with Image.open(file_path) as img:
+            if getattr(img, "is_animated", False):
+                return None  # re-encoding would keep only the first frame
+            img.thumbnail((MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION))
+            buf = io.BytesIO()
+            if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+                img.save(buf, format="PNG", optimize=True)
+                mime_type = "image/png"
+            else:
+                img.convert("RGB").save(buf, format="JPEG", quality=85, optimize=True)
+                mime_type = "image/jpeg"
+    except Exception as e:
+        print(f"Warning: could not compress image, sending original: {e}")
+        return None
+    data = buf.getvalue()
+    return (data, mime_type) if len(data) < original_size else None
+
 # =============================================================================
 # MONGODB MESSAGING CLASS
 # =============================================================================
@@ -69,7 +120,9 @@ class MongoMessagingSystem:
     - Conversation thread management
     """
     
-    def __init__(self, host='localhost', port=27017, database='clinic_messaging'):
+    def __init__(self, host='localhost', port=27017, database='clinic_messaging',
+                 max_pool_size=10, min_pool_size=2, max_idle_time_ms=300_000,
+                 wait_queue_timeout_ms=2000, server_selection_timeout_ms=2000):
         """
         Initialize MongoDB connection and collections.
         
@@ -77,10 +130,23 @@ class MongoMessagingSystem:
             host (str): MongoDB host address
             port (int): MongoDB port number
             database (str): Database name
+            max_pool_size (int): Maximum pooled connections (small for a desktop app)
+            min_pool_size (int): Connections kept warm in the pool
+            max_idle_time_ms (int): Idle time before a pooled connection is closed
+            wait_queue_timeout_ms (int): Max wait for a free pooled connection
+            server_selection_timeout_ms (int): Max wait for a reachable server
         """
         self.host = host
         self.port = port
         self.database_name = database
+        self.pool_options = {
+            "maxPoolSize": max_pool_size,
+            "minPoolSize": min_pool_size,
+            "maxIdleTimeMS": max_idle_time_ms,
+            "waitQueueTimeoutMS": wait_queue_timeout_ms,
+            "serverSelectionTimeoutMS": server_selection_timeout_ms,
+            "retryWrites": True,
+        }
         self.client = None
         self.db = None
         
@@ -89,6 +155,7 @@ class MongoMessagingSystem:
         self.messages = None
         self.conversations = None
         self.user_sessions = None
+        self.image_bucket = None
         
     def connect(self) -> bool:
         """
@@ -98,7 +165,8 @@ class MongoMessagingSystem:
             bool: True if connection successful, False otherwise
         """
         try:
-            self.client = MongoClient(f"mongodb://{self.host}:{self.port}/?directConnection=true")
+            self.client = MongoClient(f"mongodb://{self.host}:{self.port}/?directConnection=true",
+                                      **self.pool_options)
             self.db = self.client[self.database_name]
             
             # Initialize collections
@@ -106,6 +174,8 @@ class MongoMessagingSystem:
             self.messages = self.db['messages']
             self.conversations = self.db['conversations']
             self.user_sessions = self.db['user_sessions']
+            # Large chat images are streamed into GridFS instead of inlined
+            self.image_bucket = GridFSBucket(self.db, bucket_name='chat_images')
             
             # Test connection
             self.client.admin.command('ping')
@@ -132,9 +202,11 @@ class MongoMessagingSystem:
             # User indexes
             self.users.create_index("username", unique=True)
             self.users.create_index("user_id")
+            self.users.create_index([("user_id", 1), ("user_type", 1)])
             
             # Message indexes
             self.messages.create_index([("conversation_id", 1), ("timestamp", -1)])
+            self.messages.create_index([("conversation_id", 1), ("_id", 1)])
             self.messages.create_index("sender_id")
             
             # Conversation indexes
@@ -386,27 +458,91 @@ class MongoMessagingSystem:
                     "image_size": len(image_data)
                 })
             
-            # Insert message
-            result = self.messages.insert_one(message_doc)
+            return self._insert_message(message_doc)
             
-            # Update conversation last activity
-            self.conversations.update_one(
-                {"_id": ObjectId(conversation_id)},
-                {
-                    "$set": {"last_activity": datetime.now(timezone.utc)},
-                    "$inc": {"message_count": 1}
-                }
-            )
+        except Exception as e:
+            print(f"Error sending message: {e}")
+            return None
+    
+    def send_image_file(self, sender_id: str, conversation_id: str, file_path: str) -> Optional[str]:
+        """
+        Send an image message, streaming the file into GridFS.
+        
+        The file is uploaded from its handle in chunks, so memory use does not
+        grow with the image size; the message references it by image_file_id.
+        Images over COMPRESS_IMAGES_OVER are re-encoded first when Pillow is
+        available; the extension then follows the new format and the original
+        filename and size are kept in the GridFS metadata.
+        
+        Args:
+            sender_id (str): Sender's user ID
+            conversation_id (str): Conversation ID
+            file_path (str): Path of the image to send
             
-            print(f"Message sent successfully: {result.inserted_id}")
-            return str(result.inserted_id)
+        Returns:
+            str: Message ObjectId if successful, None if failed
+        """
+        try:
+            image_filename = os.path.basename(file_path)
+            mime_type, _ = mimetypes.guess_type(image_filename)
+            if not mime_type or not mime_type.startswith('image/'):
+                mime_type = 'image/jpeg'  # Default
+            
+            image_size = os.path.getsize(file_path)
+            compressed = _compress_image(file_path, image_size)
+            if compressed:
+                data, mime_type = compressed
+                original_filename = image_filename
+                image_filename = os.path.splitext(original_filename)[0] + (
+                    ".png" if mime_type == "image/png" else ".jpg")
+                file_id = self.image_bucket.upload_from_stream(
+                    image_filename, io.BytesIO(data),
+                    metadata={"content_type": mime_type, "original_filename": original_filename,
+                              "original_size": image_size}
+                )
+                image_size = len(data)
+            else:
+                with open(file_path, 'rb') as f:
+                    file_id = self.image_bucket.upload_from_stream(
+                        image_filename, f, metadata={"content_type": mime_type}
+                    )
+            
+            return self._insert_message({
+                "conversation_id": conversation_id,
+                "sender_id": sender_id,
+                "message_text": "",
+                "timestamp": datetime.now(timezone.utc),
+                "message_type": "image",
+                "is_read": False,
+                "image_file_id": file_id,
+                "image_filename": image_filename,
+                "image_mime_type": mime_type,
+                "image_size": image_size
+            })
             
         except Exception as e:
-            print(f"Error sending message: {e}")
+            print(f"Error sending image: {e}")
             return None
     
+    def _insert_message(self, message_doc: Dict) -> str:
+        """Insert a message document and bump its conversation's activity."""
+        result = self.messages.insert_one(message_doc)
+        
+        # Update conversation last activity
+        self.conversations.update_one(
+            {"_id": ObjectId(message_doc["conversation_id"])},
+            {
+                "$set": {"last_activity": datetime.now(timezone.utc)},
+                "$inc": {"message_count": 1}
+            }
+        )
+        
+        print(f"Message sent successfully: {result.inserted_id}")
+        return str(result.inserted_id)
+    
     def get_conversation_messages(self, conversation_id: str, limit: int = 50, 
-                                skip: int = 0) -> List[Dict]:
+                                skip: int = 0, before_id: Optional[str] = None,
+                                include_images: bool = True) -> List[Dict]:
         """
         Retrieve messages from a conversation.
         
@@ -414,14 +550,28 @@ class MongoMessagingSystem:
             conversation_id (str): Conversation ID
             limit (int): Maximum number of messages to retrieve
             skip (int): Number of messages to skip
+            before_id (str, optional): Only return messages older than this message
+                ID (cursor-based paging towards the start of the conversation)
+            include_images (bool): When False the base64 image payload is left out;
+                fetch it on demand with get_message_image()
             
         Returns:
             list: List of message documents
         """
         try:
-            messages = list(self.messages.find(
-                {"conversation_id": conversation_id}
-            ).sort("timestamp", -1).skip(skip).limit(limit))
+            projection = None if include_images else {"image_data": 0}
+            if before_id is not None:
+                cursor = self.messages.find(
+                    {"conversation_id": conversation_id, "_id": {"$lt": ObjectId(before_id)}},
+                    projection
+                ).sort("_id", -1)
+            else:
+                cursor = self.messages.find(
+                    {"conversation_id": conversation_id}, projection
+                ).sort("timestamp", -1)
+            # batch_size == limit: the whole page arrives in the first reply
+            # instead of a 101-document first batch plus a getMore
+            messages = list(cursor.skip(skip).limit(limit).batch_size(limit))
             
             # Convert ObjectIds to strings and format timestamps
             for message in messages:
@@ -434,6 +584,75 @@ class MongoMessagingSystem:
             print(f"Error retrieving messages: {e}")
             return []
     
+    def get_messages_since(self, conversation_id: str, after_id: Optional[str] = None,
+                           limit: int = 200, include_images: bool = True) -> List[Dict]:
+        """
+        Retrieve messages posted to a conversation after a known message.
+        
+        Args:
+            conversation_id (str): Conversation ID
+            after_id (str, optional): ID of the newest message already seen; when
+                None the latest `limit` messages are returned
+            limit (int): Maximum number of messages to retrieve
+            include_images (bool): When False the base64 image payload is left out
+            
+        Returns:
+            list: List of message documents in chronological order
+        """
+        if after_id is None:
+            return self.get_conversation_messages(conversation_id, limit=limit,
+                                                  include_images=include_images)
+        try:
+            messages = list(self.messages.find(
+                {"conversation_id": conversation_id, "_id": {"$gt": ObjectId(after_id)}},
+                None if include_images else {"image_data": 0}
+            ).sort("_id", 1).limit(limit).batch_size(limit))
+            
+            for message in messages:
+                message['_id'] = str(message['_id'])
+                message['timestamp'] = message['timestamp'].isoformat()
+            
+            return messages
+            
+        except Exception as e:
+            print(f"Error retrieving messages: {e}")
+            return []
+    
+    def get_message_image(self, message_id: str) -> Optional[Dict]:
+        """
+        Fetch the image attachment of a single message.
+        
+        Args:
+            message_id (str): Message ID
+            
+        Returns:
+            dict: image_filename, image_mime_type and decoded image_data bytes,
+                or None if the message has no image
+        """
+        try:
+            message = self.messages.find_one(
+                {"_id": ObjectId(message_id), "message_type": "image"},
+                {"image_data": 1, "image_file_id": 1, "image_filename": 1, "image_mime_type": 1}
+            )
+            if not message:
+                return None
+            if message.get("image_file_id") is not None:
+                # Stored in GridFS by send_image_file
+                data = self.image_bucket.open_download_stream(message["image_file_id"]).read()
+            elif message.get("image_data"):
+                data = base64.b64decode(message["image_data"])
+            else:
+                return None
+            return {
+                "image_filename": message.get("image_filename", "image"),
+                "image_mime_type": message.get("image_mime_type"),
+                "image_data": data
+            }
+            
+        except Exception as e:
+            print(f"Error retrieving image: {e}")
+            return None
+    
     def get_user_conversations(self, user_id: str) -> List[Dict]:
         """
         Get all conversations for a user.
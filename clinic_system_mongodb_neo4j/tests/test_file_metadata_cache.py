@@ -0,0 +1,55 @@
+"""Tests for the local SQLite file listing cache."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from file_metadata_cache import MetadataCache
+
+
+def _row(file_id, upload_date):
+    return (file_id, f"file{file_id}.txt", "text/plain", 10, upload_date, None)
+
+
+class MetadataCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = MetadataCache(os.path.join(self.tmpdir, "file_meta.db"))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_null_upload_dates_sort_first_like_neo4j(self):
+        rows = [_row(1, "2024-01-01"), _row(2, None), _row(3, "2024-02-01"), _row(4, None)]
+        self.cache.set_many(rows)
+        # Neo4j: ORDER BY upload_date DESC, id DESC puts nulls first
+        self.assertEqual([r[0] for r in self.cache.list_all()], [4, 2, 3, 1])
+        self.assertEqual([r[0] for r in self.cache.list_all(limit=2)], [4, 2])
+
+    def test_sync_page_prunes_only_rows_in_the_page_range(self):
+        # Neo4j order: 5 (null), 4 (null), 3, 2, 1; file 4 was deleted there
+        self.cache.set_many([_row(5, None), _row(4, None), _row(3, "2024-03-01"),
+                             _row(2, "2024-02-01"), _row(1, "2024-01-01")])
+        self.cache.sync_page([_row(5, None), _row(3, "2024-03-01")], None, is_last=False)
+        self.assertEqual([r[0] for r in self.cache.list_all()], [5, 3, 2, 1])
+
+    def test_sync_page_after_null_dated_row(self):
+        # Second page starts after the null-dated file 5; file 3 is gone there
+        self.cache.set_many([_row(5, None), _row(3, "2024-03-01"), _row(2, "2024-02-01")])
+        self.cache.sync_page([_row(2, "2024-02-01")], _row(5, None), is_last=True)
+        self.assertEqual([r[0] for r in self.cache.list_all()], [5, 2])
+
+    def test_invalidate_many(self):
+        self.cache.set_many([_row(1, "2024-01-01"), _row(2, "2024-01-02"), _row(3, None)])
+        self.cache.invalidate_many([1, 3])
+        self.assertEqual([r[0] for r in self.cache.list_all()], [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
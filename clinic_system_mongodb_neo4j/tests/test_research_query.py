@@ -0,0 +1,91 @@
+"""Tests for the research-tab Cypher helpers in clinic_v2_enhanced."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import clinic_v2_enhanced as gui
+except ImportError as e:  # neo4j / pymongo / tkinter not installed
+    gui = None
+    _IMPORT_ERROR = str(e)
+else:
+    _IMPORT_ERROR = ""
+
+
+def _template(query):
+    """The query text as safe_select sends it, before paging."""
+    return gui._parameterize_cypher(gui._normalize_cypher(query))[0]
+
+
+@unittest.skipIf(gui is None, f"clinic_v2_enhanced not importable: {_IMPORT_ERROR}")
+class ApplyPageTest(unittest.TestCase):
+
+    def test_unlimited_query_is_paged(self):
+        q, params = gui._apply_page(_template("MATCH (n) RETURN n"), 2)
+        self.assertTrue(q.endswith("SKIP $_page_skip LIMIT $_page_limit"))
+        self.assertEqual(params, {"_page_skip": 2 * gui.MAX_ROWS, "_page_limit": gui.MAX_ROWS})
+
+    def test_trailing_limit_runs_as_is(self):
+        q = _template("MATCH (n) RETURN n LIMIT 5")
+        self.assertEqual(gui._apply_page(q, 0), (q, {}))
+
+    def test_trailing_skip_runs_as_is(self):
+        q = _template("MATCH (n) RETURN n.x + 1 AS y SKIP 5")
+        self.assertFalse(gui._is_paged(q))
+        self.assertEqual(gui._apply_page(q, 0), (q, {}))
+
+    def test_union_runs_as_is(self):
+        q = _template("MATCH (a:Doctor) RETURN a.id AS id UNION MATCH (b:Patient) RETURN b.id AS id")
+        self.assertFalse(gui._is_paged(q))
+        self.assertEqual(gui._apply_page(q, 0), (q, {}))
+
+    def test_union_inside_string_literal_is_still_paged(self):
+        self.assertTrue(gui._is_paged(_template("MATCH (n) WHERE n.name = 'union' RETURN n")))
+
+
+@unittest.skipIf(gui is None, f"clinic_v2_enhanced not importable: {_IMPORT_ERROR}")
+class NormalizeCypherTest(unittest.TestCase):
+
+    def test_collapses_whitespace_and_line_comments(self):
+        self.assertEqual(gui._normalize_cypher("MATCH (n)  // all nodes\n\tRETURN n"), "MATCH (n) RETURN n")
+
+    def test_strips_block_comment_containing_slashes(self):
+        self.assertEqual(gui._normalize_cypher("MATCH (n) /* see http://x */ RETURN n"), "MATCH (n) RETURN n")
+
+    def test_multiline_block_comment(self):
+        self.assertEqual(gui._normalize_cypher("MATCH (n)\n/* one\n   two */\nRETURN n"), "MATCH (n) RETURN n")
+
+    def test_comment_markers_inside_strings_are_kept(self):
+        q = "MATCH (n) WHERE n.url = 'http://x/*y*/' RETURN n"
+        self.assertEqual(gui._normalize_cypher(q), q)
+
+
+@unittest.skipIf(gui is None, f"clinic_v2_enhanced not importable: {_IMPORT_ERROR}")
+class IndexHintTest(unittest.TestCase):
+
+    def test_hints_anded_range_predicate(self):
+        q = _template("MATCH (a:Appointment) WHERE a.date >= date('2024-01-01') AND a.id > 0 RETURN a")
+        self.assertIn("USING INDEX a:Appointment(date) WHERE", gui._add_index_hint(q))
+
+    def test_allows_is_not_null(self):
+        q = _template("MATCH (a:Appointment) WHERE a.id = 3 AND a.date IS NOT NULL RETURN a")
+        self.assertIn("USING INDEX a:Appointment(id)", gui._add_index_hint(q))
+
+    def test_no_hint_under_or(self):
+        q = _template("MATCH (a:Appointment) WHERE a.id = 3 OR a.date > date('2024-01-01') RETURN a")
+        self.assertEqual(gui._add_index_hint(q), q)
+
+    def test_no_hint_under_not(self):
+        q = _template("MATCH (a:Appointment) WHERE NOT a.id = 3 RETURN a")
+        self.assertEqual(gui._add_index_hint(q), q)
+
+    def test_no_hint_for_unindexed_property(self):
+        q = _template("MATCH (p:Patient) WHERE p.first_name = 'Lars' RETURN p")
+        self.assertEqual(gui._add_index_hint(q), q)
+
+
+if __name__ == "__main__":
+    unittest.main()